@@ -1,9 +1,150 @@
-from src.nlp_core import get_intent, generate_response
-from src.k8s_client import execute_command, KubeconfigError, CommandExecutionError
+import argparse
+import sys
+import threading
 
-def main():
+# Heavy dependencies (google.generativeai, kubernetes, pydantic) are imported on first use,
+# so the prompt, --help and exit paths start without loading them.
+
+def _warm_up() -> None:
+    """Imports the query pipeline and opens the Kubernetes client; errors resurface on the first query."""
+    try:
+        import src.async_pipeline  # noqa: F401 (also imports nlp_core)
+        from src.k8s_client import get_kubernetes_client
+        get_kubernetes_client()
+    except Exception:
+        pass
+
+def start_warm_up() -> threading.Thread:
+    """Starts the first-query warm-up in the background while the user types."""
+    thread = threading.Thread(target=_warm_up, name="kubeai-warmup", daemon=True)
+    thread.start()
+    return thread
+
+def new_session():
+    """Returns the ConversationState of a new REPL session, bounded by the conversation settings."""
+    import os
+    from src.models import ConversationState
+    from src.settings import get_settings
+    settings = get_settings()
+    return ConversationState(session_id=os.urandom(8).hex(), max_turns=settings.conversation_max_turns,
+                             max_tokens=settings.conversation_token_budget)
+
+def _fetch(user_input: str, intent, state):
+    """
+    Runs the command for an intent. Returns (data, snapshot): snapshot is set when a
+    "what changed" query was answered from the session's stored pod snapshot, and data
+    then holds only the changed pods.
+    """
+    from src.nlp_core import wants_changes
+    from src.k8s_client import execute_command, execute_command_stream, snapshot_key
+    from src.pod_diff import pod_changes, remember_pods
+    if state is not None and wants_changes(user_input):
+        changes = pod_changes(state, intent)
+        if changes is not None:
+            snapshot, data = changes
+            return data, snapshot
+    if state is not None and snapshot_key(intent) is not None:
+        # Collected (not streamed) so the result's resourceVersion can seed the session snapshot
+        data = execute_command(intent)
+        remember_pods(state, intent, data)
+        return data, None
+    # Fetches the first page; later pages are fetched while printing
+    return execute_command_stream(intent), None
+
+def _fetch_plan(user_input: str, plan, state):
+    """
+    Runs every step of a plan and returns a (data, snapshot) pair per step. A single step
+    goes through _fetch; several steps are merged and run concurrently by the planner.
+    """
+    if len(plan.steps) == 1:
+        return [_fetch(user_input, plan.steps[0], state)]
+    from src.planner import execute_plan
+    from src.pod_diff import remember_pods
+    results = execute_plan(plan)
+    if state is not None:
+        for step, data in zip(plan.steps, results):
+            remember_pods(state, step, data)
+    return [(data, None) for data in results]
+
+def _resolve_plan(user_input: str, plan, state):
+    """Fills in follow-up steps from the session (see conversation.resolve_follow_up) and prints the plan."""
+    from src.models import PlanModel
+    from src.conversation import resolve_follow_up
+    if state is not None:
+        plan = PlanModel(steps=[resolve_follow_up(state, user_input, step) for step in plan.steps])
+    for step in plan.steps:
+        print(f"Recognized intent: {step.intent}")
+        print(f"Entities: {step.entities}")
+    return plan
+
+def _response_stream(data, snapshot, explain: bool):
+    from src.nlp_core import generate_response_stream
+    from src.pod_diff import no_changes_line
+    if snapshot is not None and not data:
+        yield no_changes_line(snapshot) + "\n"
+        return
+    yield from generate_response_stream(data, explain=explain)
+
+def answer(user_input: str, state=None) -> None:
+    """
+    Runs one query and prints the result. A query asking for several things is answered
+    from one execution plan (one intent call, merged API calls). With a session state,
+    follow-up queries ("what images do those use?") are resolved against the earlier
+    turns, and pod status results are remembered so a later "what changed" query only
+    fetches and summarizes the changes.
+    """
+    from src.nlp_core import get_plan, wants_explanation
+    from src.k8s_client import prefetch_pods, KubeconfigError, CommandExecutionError
+    from src.conversation import conversation_context, is_follow_up, record_turn
+    # Start the likely pod list while the intent is being recognized. A follow-up takes its
+    # namespace from the session, so a guess from its text would be thrown away
+    if state is None or not is_follow_up(user_input):
+        prefetch_pods(user_input)
+    try:
+        plan = get_plan(user_input, context=conversation_context(state, user_input))
+        plan = _resolve_plan(user_input, plan, state)
+    except Exception as e:
+        print(f"[NLP Error] Could not recognize intent: {e}")
+        return
+    try:
+        results = _fetch_plan(user_input, plan, state)
+    except KubeconfigError as e:
+        print(f"[Kubeconfig Error] {e}")
+        return
+    except CommandExecutionError as e:
+        print(f"[Command Error] {e}")
+        return
+    except Exception as e:
+        print(f"[Command Error] Unexpected error: {e}")
+        return
+    if state is not None:
+        for step, (data, _) in zip(plan.steps, results):
+            record_turn(state, user_input, step, data)
+    try:
+        print("\n--- Response ---")
+        for step, (data, snapshot) in zip(plan.steps, results):
+            if len(plan.steps) > 1:
+                print(f"[{step.intent}]")
+            stream = _response_stream(data, snapshot, explain=wants_explanation(user_input))
+            try:
+                for chunk in stream:
+                    print(chunk, end="", flush=True)
+            except KeyboardInterrupt:
+                # Ctrl-C cancels the current response, not the session
+                stream.close()
+                print("\n[Cancelled]")
+                break
+        print("---------------\n")
+    except CommandExecutionError as e:
+        print(f"[Command Error] {e}")
+    except Exception as e:
+        print(f"[Response Error] Could not generate response: {e}")
+
+def main(profile: bool = False):
     print("Welcome to KubeAI CLI!")
     print("Type your query, or 'exit' to quit.")
+    start_warm_up()
+    state = None
     while True:
         try:
             user_input = input("kubeai> ").strip()
@@ -12,34 +153,155 @@ def main():
                 break
             if not user_input:
                 continue
-            try:
-                intent = get_intent(user_input)
-                print(f"Recognized intent: {intent.intent}")
-                print(f"Entities: {intent.entities}")
-            except Exception as e:
-                print(f"[NLP Error] Could not recognize intent: {e}")
+            from src import tracing
+            state = state or new_session()
+            with tracing.span("query") as root:
+                answer(user_input, state)
+            if profile:
+                print(tracing.format_profile(root) + "\n")
+        except (KeyboardInterrupt, EOFError):
+            print("\nExiting KubeAI CLI.")
+            break
+
+async def answer_async(user_input: str, profile: bool = False, state=None) -> None:
+    """Runs one query through the async pipeline and prints the result."""
+    from src import tracing
+    with tracing.span("query") as root:
+        await _answer_async(user_input, state)
+    if profile:
+        print(tracing.format_profile(root) + "\n")
+
+async def _answer_async(user_input: str, state=None) -> None:
+    import asyncio
+    from src.nlp_core import wants_changes, wants_explanation
+    from src.k8s_client import prefetch_pods, KubeconfigError, CommandExecutionError
+    from src.async_pipeline import (
+        get_plan_async, execute_command_async, execute_plan_async, generate_response_stream_async,
+    )
+    from src.pod_diff import no_changes_line, pod_changes, remember_pods
+    from src.conversation import conversation_context, is_follow_up, record_turn
+    if state is None or not is_follow_up(user_input):
+        prefetch_pods(user_input)
+    try:
+        plan = await get_plan_async(user_input, context=conversation_context(state, user_input))
+        plan = _resolve_plan(user_input, plan, state)
+    except Exception as e:
+        print(f"[NLP Error] Could not recognize intent: {e}")
+        return
+    snapshot = None
+    try:
+        changes = None
+        if len(plan.steps) == 1 and state is not None and wants_changes(user_input):
+            changes = await asyncio.to_thread(pod_changes, state, plan.steps[0])
+        if changes is not None:
+            snapshot, data = changes
+            results = [data]
+        else:
+            if len(plan.steps) == 1:
+                results = [await execute_command_async(plan.steps[0])]
+            else:
+                results = await execute_plan_async(plan)
+            if state is not None:
+                for step, data in zip(plan.steps, results):
+                    remember_pods(state, step, data)
+    except KubeconfigError as e:
+        print(f"[Kubeconfig Error] {e}")
+        return
+    except CommandExecutionError as e:
+        print(f"[Command Error] {e}")
+        return
+    except Exception as e:
+        print(f"[Command Error] Unexpected error: {e}")
+        return
+    if state is not None:
+        for step, data in zip(plan.steps, results):
+            record_turn(state, user_input, step, data)
+    try:
+        print("\n--- Response ---")
+        for step, data in zip(plan.steps, results):
+            if len(plan.steps) > 1:
+                print(f"[{step.intent}]")
+            if snapshot is not None and not data:
+                print(no_changes_line(snapshot))
                 continue
+            async for chunk in generate_response_stream_async(data, explain=wants_explanation(user_input)):
+                print(chunk, end="", flush=True)
+        print("---------------\n")
+    except Exception as e:
+        print(f"[Response Error] Could not generate response: {e}")
+
+def main_async(profile: bool = False):
+    """
+    REPL driver for the async pipeline. Each query runs as a task on one event loop;
+    Ctrl-C cancels the running query and returns to the prompt.
+    """
+    print("Welcome to KubeAI CLI!")
+    print("Type your query, or 'exit' to quit.")
+    import asyncio
+    start_warm_up()
+    loop = asyncio.new_event_loop()
+    state = None
+    try:
+        while True:
             try:
-                data = execute_command(intent)
-            except KubeconfigError as e:
-                print(f"[Kubeconfig Error] {e}")
-                continue
-            except CommandExecutionError as e:
-                print(f"[Command Error] {e}")
-                continue
-            except Exception as e:
-                print(f"[Command Error] Unexpected error: {e}")
+                user_input = input("kubeai> ").strip()
+            except (KeyboardInterrupt, EOFError):
+                print("\nExiting KubeAI CLI.")
+                break
+            if user_input.lower() in ("exit", "quit"):  # Exit commands
+                print("Goodbye!")
+                break
+            if not user_input:
                 continue
+            state = state or new_session()
+            task = loop.create_task(answer_async(user_input, profile=profile, state=state))
             try:
-                response = generate_response(data)
-                print("\n--- Response ---")
-                print(response)
-                print("---------------\n")
-            except Exception as e:
-                print(f"[Response Error] Could not generate response: {e}")
-        except (KeyboardInterrupt, EOFError):
-            print("\nExiting KubeAI CLI.")
-            break
+                loop.run_until_complete(task)
+            except KeyboardInterrupt:
+                task.cancel()
+                try:
+                    loop.run_until_complete(task)
+                except asyncio.CancelledError:
+                    pass
+                print("\n[Cancelled]")
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="kubeai", description="Natural language Kubernetes CLI.")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="run queries through the asyncio pipeline (per-stage timeouts, Ctrl-C cancels a query)")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="run the queries in FILE ('-' for stdin), one per line, and print JSON lines")
+    parser.add_argument("--concurrency", type=int, default=4, help="queries run at the same time in batch mode")
+    parser.add_argument("--profile", action="store_true", help="print a per-stage latency breakdown after each query")
+    parser.add_argument("--daemon", action="store_true",
+                        help="serve queries on a Unix socket for `python -m src.daemon_client`")
+    parser.add_argument("--socket", help="daemon socket path (default: $KUBEAI_DAEMON_SOCKET or a per-user path)")
+    parser.add_argument("--no-summary", dest="summarize", action="store_false",
+                        help="in batch mode, output the raw results instead of summaries")
+    return parser.parse_args(argv)
+
+def main_batch(path: str, concurrency: int, summarize: bool) -> int:
+    """Runs a batch file (or stdin) and returns the process exit code."""
+    from src.batch import read_queries, run_batch
+    if path == "-":
+        queries = read_queries(sys.stdin)
+    else:
+        with open(path) as f:
+            queries = read_queries(f)
+    failures = run_batch(queries, sys.stdout, concurrency=concurrency, summarize=summarize)
+    return 1 if failures else 0
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    args = parse_args()
+    if args.daemon:
+        from src.daemon import run_daemon
+        run_daemon(args.socket)
+    elif args.batch:
+        sys.exit(main_batch(args.batch, args.concurrency, args.summarize))
+    elif args.use_async:
+        main_async(profile=args.profile)
+    else:
+        main(profile=args.profile)
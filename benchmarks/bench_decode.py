@@ -0,0 +1,48 @@
+"""
+Compares the default kubernetes client deserialization path against the raw JSON
+decode path (KUBEAI_RAW_DECODE) for pod list responses.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_decode.py [POD_COUNT ...]
+"""
+import sys
+import time
+from kubernetes import client
+from benchmarks.fake_k8s import FakeKubernetesAPI
+from src.k8s_client import (
+    _json_loads, _list_raw, _pod_record_from_item, _pod_record_from_raw, _pod_status_from_record,
+)
+
+DEFAULT_COUNTS = (1000, 10000, 50000)
+
+def _model_path(api, namespace):
+    return [_pod_status_from_record(_pod_record_from_item(item))
+            for item in api.list_namespaced_pod(namespace=namespace).items]
+
+def _raw_path(api, namespace):
+    page = _list_raw(api.list_namespaced_pod, namespace=namespace)
+    return [_pod_status_from_record(_pod_record_from_raw(pod)) for pod in page["items"]]
+
+def _time(func, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main(counts):
+    print(f"JSON decoder: {_json_loads.__module__}.{_json_loads.__name__}")
+    print(f"{'pods':>8} {'model (s)':>10} {'raw (s)':>10} {'speedup':>8}")
+    for count in counts:
+        with FakeKubernetesAPI({"bench": count}) as server:
+            api = client.CoreV1Api(client.ApiClient(server.configuration()))
+            repeat = 1 if count > 10000 else 3
+            model_time, model_result = _time(_model_path, api, "bench", repeat=repeat)
+            raw_time, raw_result = _time(_raw_path, api, "bench", repeat=repeat)
+            assert model_result == raw_result, "raw decode path diverged from model path"
+            print(f"{count:>8} {model_time:>10.3f} {raw_time:>10.3f} {model_time / raw_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS)
@@ -0,0 +1,59 @@
+"""
+Measures app.py startup with `python -X importtime` and fails when the import time
+of `app` exceeds a budget or when heavy dependencies are loaded before the first query.
+
+Usage:
+    python benchmarks/bench_startup.py [BUDGET_MS]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time allowed for `import app` (median of several runs)
+DEFAULT_BUDGET_MS = 100.0
+
+# Modules that must only be imported on first use
+HEAVY_MODULES = ("google.generativeai", "kubernetes", "pydantic")
+
+def import_profile(args=("-c", "import app")):
+    """Runs python -X importtime with args from the repo root; returns {module: cumulative_us}."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        profile[name] = int(cumulative_us)
+    return profile
+
+def heavy_imports(profile):
+    """Returns the heavy modules (or their submodules) present in an import profile."""
+    return sorted({heavy for heavy in HEAVY_MODULES for name in profile
+                   if name == heavy or name.startswith(heavy + ".")})
+
+def app_import_ms(runs=5):
+    """Median cumulative import time of `app` in milliseconds."""
+    return statistics.median(import_profile()["app"] / 1000 for _ in range(runs))
+
+def main(argv):
+    budget = float(argv[0]) if argv else DEFAULT_BUDGET_MS
+    failures = []
+    elapsed = app_import_ms()
+    print(f"import app: {elapsed:.1f} ms (budget {budget:.0f} ms)")
+    if elapsed > budget:
+        failures.append(f"import app took {elapsed:.1f} ms, over the {budget:.0f} ms budget")
+    for label, args in (("import app", ("-c", "import app")), ("app.py --help", ("app.py", "--help"))):
+        loaded = heavy_imports(import_profile(args))
+        print(f"{label}: heavy modules loaded: {', '.join(loaded) or 'none'}")
+        if loaded:
+            failures.append(f"{label} loaded {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
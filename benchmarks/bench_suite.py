@@ -0,0 +1,216 @@
+"""
+Offline end-to-end benchmark suite: runs the query pipeline against a fake Kubernetes
+API server (benchmarks/fake_k8s.py) and a fake Gemini backend (benchmarks/fake_llm.py)
+with configurable size and latency, and reports p50/p95/p99 latency, throughput and
+peak RSS per scenario. Each scenario runs in a fresh interpreter, so peak RSS and
+caches are not shared between scenarios.
+
+Results can be saved as JSON and compared against an earlier run; the prompt size and
+API request counts are deterministic, so handler and prompt building regressions show
+up even when timings are noisy.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_suite.py [--scenario NAME ...] [--pods N]
+        [--output results.json] [--compare baseline.json] [--threshold 0.2]
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+from unittest.mock import patch
+
+SCENARIOS = ("execute_command", "get_intent", "generate_response", "pipeline")
+
+# Queries used by the scenarios; the fake Gemini resolves intent prompts to get_pod_status in 'bench'
+INTENT_QUERY = "which workloads in namespace bench are unhealthy right now"
+PIPELINE_QUERY = "explain the pod status in namespace bench"
+
+# Metrics compared against a baseline; higher is worse for all of them
+COMPARED_METRICS = ("p50_ms", "p95_ms", "p99_ms", "peak_rss_mb", "llm_prompt_tokens", "k8s_requests")
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Linearly interpolated percentile (0-100) of samples."""
+    ordered = sorted(samples)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+def _scenario_op(name: str, fake_llm) -> Callable[[], Any]:
+    """Prepares a scenario and returns the operation timed on every iteration."""
+    from src.k8s_client import execute_command
+    from src.models import IntentModel
+    from src.nlp_core import generate_response, get_intent
+    from src.settings import configure
+    intent = IntentModel(**fake_llm.intent)
+    if name == "execute_command":
+        return lambda: execute_command(intent)
+    if name == "get_intent":
+        # Every call goes to the LLM: no local classifier, no intent cache
+        configure(local_intent_enabled=False)
+        return lambda: get_intent(INTENT_QUERY)
+    if name == "generate_response":
+        data = execute_command(intent)
+        return lambda: generate_response(data, explain=True)
+    if name == "pipeline":
+        import app
+
+        def run_query():
+            with contextlib.redirect_stdout(io.StringIO()):
+                app.answer(PIPELINE_QUERY)
+        return run_query
+    raise ValueError(f"Unknown scenario: {name} (expected one of {', '.join(SCENARIOS)})")
+
+@contextlib.contextmanager
+def _kubeconfig(path: str):
+    """Points KUBECONFIG at path; the kubernetes package reads the variable once, on import."""
+    from kubernetes.config import kube_config
+    with patch.dict(os.environ, {"KUBECONFIG": path}), \
+            patch.object(kube_config, "KUBE_CONFIG_DEFAULT_LOCATION", path):
+        yield
+
+def run_scenario(name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs one scenario in this process and returns its result record."""
+    from benchmarks.fake_k8s import FakeKubernetesAPI
+    from benchmarks.fake_llm import FakeGemini
+    from src.k8s_client import reset_kubernetes_client
+    from src.settings import configure, reset_settings
+    with tempfile.TemporaryDirectory() as tmp, \
+            FakeKubernetesAPI({"bench": options["pods"]}, latency=options["k8s_latency"]) as server, \
+            _kubeconfig(server.write_kubeconfig(os.path.join(tmp, "kubeconfig"))), \
+            FakeGemini(latency=options["llm_latency"], tokens_per_sec=options["tokens_per_sec"],
+                       output_tokens=options["output_tokens"]) as fake_llm:
+        try:
+            reset_settings()
+            reset_kubernetes_client()
+            # Measure the uncached path: every iteration fetches, classifies and summarizes
+            configure(result_cache_ttl=0, intent_cache_size=0)
+            op = _scenario_op(name, fake_llm)
+            for _ in range(options["warmup"]):
+                op()
+            requests, llm_calls, prompt_tokens = server.requests, fake_llm.calls, len(fake_llm.prompt_tokens)
+            samples = []
+            started = time.perf_counter()
+            for _ in range(options["iterations"]):
+                op_start = time.perf_counter()
+                op()
+                samples.append((time.perf_counter() - op_start) * 1000)
+            elapsed = time.perf_counter() - started
+            iterations = len(samples)
+            return {
+                "iterations": iterations,
+                "p50_ms": round(percentile(samples, 50), 2),
+                "p95_ms": round(percentile(samples, 95), 2),
+                "p99_ms": round(percentile(samples, 99), 2),
+                "mean_ms": round(sum(samples) / iterations, 2),
+                "throughput_per_s": round(iterations / elapsed, 2),
+                "peak_rss_mb": round(peak_rss_mb(), 1),
+                "k8s_requests": round((server.requests - requests) / iterations, 2),
+                "llm_calls": round((fake_llm.calls - llm_calls) / iterations, 2),
+                "llm_prompt_tokens": round(sum(fake_llm.prompt_tokens[prompt_tokens:]) / iterations, 1),
+            }
+        finally:
+            reset_kubernetes_client()
+            reset_settings()
+
+def run_suite(scenarios: List[str], options: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs each scenario in a fresh interpreter and returns the full results document."""
+    results = {
+        "options": options,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": {},
+    }
+    context = multiprocessing.get_context("spawn")
+    for name in scenarios:
+        with context.Pool(1) as pool:
+            results["scenarios"][name] = pool.apply(run_scenario, (name, options))
+    return results
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Returns a description of every compared metric that grew by more than threshold (e.g. 0.2 = 20%)."""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) and new - old > 1e-9:
+                change = f"+{(new - old) / old * 100:.0f}%" if old else "new"
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change})")
+    return regressions
+
+def format_results(results: Dict[str, Any]) -> str:
+    lines = [f"{'scenario':<18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>8} {'rss MiB':>8} "
+             f"{'k8s req':>7} {'llm tok':>8}"]
+    for name, r in results["scenarios"].items():
+        lines.append(f"{name:<18} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+                     f"{r['throughput_per_s']:>8.1f} {r['peak_rss_mb']:>8.1f} {r['k8s_requests']:>7.1f} "
+                     f"{r['llm_prompt_tokens']:>8.0f}")
+    return "\n".join(lines)
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline kubeai pipeline benchmarks.")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument("--pods", type=int, default=500, help="pods served by the fake API server")
+    parser.add_argument("--iterations", type=int, default=20, help="timed iterations per scenario")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed iterations per scenario")
+    parser.add_argument("--k8s-latency", type=float, default=0.02, help="fake API server latency per request (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="fake Gemini time to first token (s)")
+    parser.add_argument("--tokens-per-sec", type=float, default=400.0, help="fake Gemini output token rate")
+    parser.add_argument("--output-tokens", type=int, default=120, help="fake Gemini summary length in tokens")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a results file from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed growth before a metric counts as a regression")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    options = {
+        "pods": args.pods,
+        "iterations": max(1, args.iterations),
+        "warmup": max(0, args.warmup),
+        "k8s_latency": args.k8s_latency,
+        "llm_latency": args.llm_latency,
+        "tokens_per_sec": args.tokens_per_sec,
+        "output_tokens": args.output_tokens,
+    }
+    results = run_suite(args.scenario or list(SCENARIOS), options)
+    print(format_results(results))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if not args.compare:
+        return 0
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    if baseline.get("options") != options:
+        print("WARNING: baseline was recorded with different options; timings are not comparable")
+    regressions = compare(baseline, results, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if not regressions:
+        print(f"No regressions against {args.compare} (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Local stand-in for the Kubernetes API server used by the benchmarks.
+Serves synthetic pod lists over HTTP so the real kubernetes client code paths
+(request, response decoding, model deserialization) can be measured offline.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlparse
+from kubernetes import client
+
+PHASES = ("Running", "Running", "Running", "Pending", "Succeeded", "Failed")
+
+def make_pod(index: int, namespace: str) -> Dict[str, Any]:
+    """Returns a synthetic pod JSON object shaped like a real API server response."""
+    name = f"app-{index // 3}-{index:06d}"
+    containers = [
+        {
+            "name": "app",
+            "image": f"registry.example.com/team/app:{index % 7}.0.{index % 3}",
+            "ports": [{"containerPort": 8080, "protocol": "TCP"}],
+            "env": [{"name": "LOG_LEVEL", "value": "info"}, {"name": "REPLICA", "value": str(index)}],
+            "resources": {"limits": {"cpu": "500m", "memory": "256Mi"}, "requests": {"cpu": "100m", "memory": "128Mi"}},
+            "imagePullPolicy": "IfNotPresent",
+        },
+        {
+            "name": "sidecar",
+            "image": "registry.example.com/infra/proxy:1.4.2",
+            "resources": {"requests": {"cpu": "10m", "memory": "32Mi"}},
+        },
+    ]
+    return {
+        "metadata": {
+            "name": name,
+            "namespace": namespace,
+            "uid": f"00000000-0000-0000-0000-{index:012d}",
+            "resourceVersion": str(1000 + index),
+            "creationTimestamp": "2024-01-01T00:00:00Z",
+            "labels": {"app": f"app-{index % 50}", "tier": "backend"},
+            "annotations": {"kubernetes.io/psp": "restricted"},
+        },
+        "spec": {"containers": containers, "nodeName": f"node-{index % 20}", "restartPolicy": "Always"},
+        "status": {
+            "phase": PHASES[index % len(PHASES)],
+            "podIP": f"10.0.{(index // 250) % 250}.{index % 250}",
+            "startTime": "2024-01-01T00:00:05Z",
+            "conditions": [{"type": "Ready", "status": "True", "lastTransitionTime": "2024-01-01T00:00:10Z"}],
+            "containerStatuses": [
+                {"name": c["name"], "image": c["image"], "imageID": "", "ready": True,
+                 "restartCount": index % 5 if c["name"] == "app" else 0, "started": True,
+                 "state": {"running": {"startedAt": "2024-01-01T00:00:06Z"}}}
+                for c in containers
+            ],
+        },
+    }
+
+def make_pod_list(pods: List[Dict[str, Any]], continue_token: str = None) -> Dict[str, Any]:
+    """Wraps pod objects into a V1PodList JSON body."""
+    metadata = {"resourceVersion": "999999"}
+    if continue_token:
+        metadata["continue"] = continue_token
+    return {"kind": "PodList", "apiVersion": "v1", "metadata": metadata, "items": pods}
+
+class FakeKubernetesAPI:
+    """
+    Serves GET /api/v1/namespaces/<ns>/pods for synthetic namespaces, honouring limit/continue.
+    latency (seconds) is added to every response to stand in for a remote API server.
+    Usage:
+        with FakeKubernetesAPI({"bench": 10000}) as server:
+            api = client.CoreV1Api(client.ApiClient(server.configuration()))
+    """
+    def __init__(self, pod_counts: Dict[str, int], latency: float = 0.0):
+        self.pods = {ns: [make_pod(i, ns) for i in range(count)] for ns, count in pod_counts.items()}
+        self.latency = latency
+        self.requests = 0
+        self._bodies: Dict[tuple, bytes] = {}
+        self._server = None
+        self._thread = None
+
+    def configuration(self) -> client.Configuration:
+        """Returns a kubernetes client Configuration pointing at this server."""
+        configuration = client.Configuration()
+        configuration.host = f"http://127.0.0.1:{self._server.server_address[1]}"
+        return configuration
+
+    def write_kubeconfig(self, path: str) -> str:
+        """
+        Writes a kubeconfig pointing at this server to path and returns path, so the app's
+        own client setup (KUBECONFIG, get_kubernetes_client) can be benchmarked unchanged.
+        """
+        kubeconfig = {
+            "apiVersion": "v1",
+            "kind": "Config",
+            "clusters": [{"name": "bench", "cluster": {"server": self.configuration().host}}],
+            "users": [{"name": "bench", "user": {}}],
+            "contexts": [{"name": "bench", "context": {"cluster": "bench", "user": "bench"}}],
+            "current-context": "bench",
+        }
+        with open(path, "w") as f:
+            json.dump(kubeconfig, f)  # JSON is valid YAML
+        return path
+
+    def _body(self, path: str, query: Dict[str, List[str]]) -> bytes:
+        parts = path.strip("/").split("/")
+        if len(parts) != 5 or parts[:3] != ["api", "v1", "namespaces"] or parts[4] != "pods":
+            return None
+        pods = self.pods.get(parts[3], [])
+        offset = int(query.get("continue", ["0"])[0])
+        limit = int(query.get("limit", [str(len(pods) or 1)])[0])
+        key = (parts[3], offset, limit)
+        if key not in self._bodies:
+            # Encode once so repeated requests measure the client, not the fake server
+            end = offset + limit
+            page = make_pod_list(pods[offset:end], str(end) if end < len(pods) else None)
+            self._bodies[key] = json.dumps(page).encode()
+        return self._bodies[key]
+
+    def __enter__(self) -> "FakeKubernetesAPI":
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                api.requests += 1
+                if api.latency:
+                    time.sleep(api.latency)
+                url = urlparse(self.path)
+                body = api._body(url.path, parse_qs(url.query))
+                if body is None:
+                    self.send_response(404)
+                    body = b'{"kind":"Status","code":404}'
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,110 @@
+"""
+Local stand-in for the Gemini API used by the benchmarks.
+Installed as the LLM backend (src/llm_backend.py) with a model that answers after a
+fixed latency and then emits tokens at a fixed rate, so prompt building and response
+handling can be measured offline and reproducibly.
+"""
+import contextlib
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from src.llm_backend import LLMBackend, use_backend
+from src.payload import CHARS_PER_TOKEN, estimate_tokens
+
+DEFAULT_INTENT = {"intent": "get_pod_status", "entities": [{"type": "namespace", "value": "bench"}]}
+
+class _Usage:
+    def __init__(self, prompt_token_count: int, candidates_token_count: int):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+class _Chunk:
+    def __init__(self, text: str, usage: Optional[_Usage] = None):
+        self.text = text
+        self.usage_metadata = usage
+
+class FakeGemini(LLMBackend):
+    """
+    Configurable fake Gemini backend, installed with `with FakeGemini(...):`.
+    Intent prompts are answered with intent as JSON; every other prompt gets a summary
+    of output_tokens tokens. Streamed responses arrive in chunks of chunk_tokens tokens.
+    Attributes:
+        latency (float): Seconds before the first token (time to first chunk).
+        tokens_per_sec (float): Output token rate after the first token (0 means instant).
+        output_tokens (int): Length of summary responses in tokens.
+        chunk_tokens (int): Tokens per streamed chunk.
+        intent (Dict[str, Any]): Intent JSON returned for intent prompts.
+        calls (int): Number of calls served.
+        prompt_tokens (List[int]): Estimated prompt size of every call, in tokens.
+        models (List[str]): Model requested by every call.
+    """
+    def __init__(self, latency: float = 0.5, tokens_per_sec: float = 100.0, output_tokens: int = 120,
+                 chunk_tokens: int = 16, intent: Optional[Dict[str, Any]] = None):
+        self.latency = latency
+        self.tokens_per_sec = tokens_per_sec
+        self.output_tokens = output_tokens
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.intent = intent or DEFAULT_INTENT
+        self.calls = 0
+        self.prompt_tokens: List[int] = []
+        self.models: List[str] = []
+        self._lock = threading.Lock()
+        self._installed = None
+
+    def _answer(self, model: str, prompt: str) -> List[str]:
+        """Records the call and returns the response split into chunks."""
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens.append(estimate_tokens(prompt))
+            self.models.append(model)
+        if "User query:" in prompt:
+            return [json.dumps(self.intent)]
+        word = "x" * (CHARS_PER_TOKEN - 1) + " "  # one token
+        chunk = word * self.chunk_tokens
+        full, rest = divmod(self.output_tokens, self.chunk_tokens)
+        return [chunk] * full + ([word * rest] if rest else [])
+
+    def _delay(self, chunk: str) -> float:
+        return estimate_tokens(chunk) / self.tokens_per_sec if self.tokens_per_sec else 0.0
+
+    def _usage(self, prompt: str, chunks: List[str]) -> _Usage:
+        return _Usage(estimate_tokens(prompt), sum(estimate_tokens(c) for c in chunks))
+
+    def generate(self, model: str, prompt: str, stream: bool = False, timeout: Optional[float] = None):
+        chunks = self._answer(model, prompt)
+        time.sleep(self.latency)
+        if stream:
+            return self._stream(chunks)
+        time.sleep(sum(self._delay(c) for c in chunks[1:]))
+        return _Chunk("".join(chunks), self._usage(prompt, chunks))
+
+    def _stream(self, chunks: List[str]):
+        for index, chunk in enumerate(chunks):
+            if index:
+                time.sleep(self._delay(chunk))
+            yield _Chunk(chunk)
+
+    async def generate_async(self, model: str, prompt: str, stream: bool = False, timeout: Optional[float] = None):
+        chunks = self._answer(model, prompt)
+        await asyncio.sleep(self.latency)
+        if stream:
+            return self._stream_async(chunks)
+        await asyncio.sleep(sum(self._delay(c) for c in chunks[1:]))
+        return _Chunk("".join(chunks), self._usage(prompt, chunks))
+
+    async def _stream_async(self, chunks: List[str]):
+        for index, chunk in enumerate(chunks):
+            if index:
+                await asyncio.sleep(self._delay(chunk))
+            yield _Chunk(chunk)
+
+    def __enter__(self) -> "FakeGemini":
+        self._installed = contextlib.ExitStack()
+        self._installed.enter_context(use_backend(self))
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._installed.close()
+        self._installed = None
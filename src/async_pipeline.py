@@ -0,0 +1,151 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, List, Optional, Sequence, TypeVar
+from pydantic import BaseModel
+from src import llm_backend, nlp_core, tracing
+from src.k8s_client import execute_command
+from src.models import IntentModel, PlanModel
+from src.planner import execute_plan
+from src.results import split_errors
+from src.settings import get_settings
+
+T = TypeVar("T")
+
+class StageTimeoutError(TimeoutError):
+    """
+    Raised when a pipeline stage does not finish within its configured timeout.
+    Attributes:
+        stage (str): The stage that timed out ('intent', 'command' or 'summary').
+        timeout (float): The timeout in seconds.
+    """
+    def __init__(self, stage: str, timeout: float):
+        super().__init__(f"{stage} stage timed out after {timeout:g}s")
+        self.stage = stage
+        self.timeout = timeout
+
+async def _with_timeout(stage: str, awaitable: Awaitable[T], timeout: Optional[float]) -> T:
+    """
+    Awaits with a stage timeout; a timeout of None or 0 waits indefinitely.
+    Only the stage budget running out raises StageTimeoutError: a TimeoutError raised inside
+    the stage (a socket or read timeout) is passed on as is.
+    """
+    if not timeout:
+        return await awaitable
+    # Not wait_for: asyncio.TimeoutError is TimeoutError, so its own timeout could not be told apart
+    task = asyncio.ensure_future(awaitable)
+    try:
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if not done:
+        task.cancel()
+        await asyncio.wait({task})
+        raise StageTimeoutError(stage, timeout)
+    return task.result()
+
+async def get_intent_async(query: str, timeout: Optional[float] = None, context: Optional[str] = None) -> IntentModel:
+    """
+    Async variant of nlp_core.get_intent: the first step of get_plan_async.
+    """
+    return (await get_plan_async(query, timeout, context)).steps[0]
+
+async def get_plan_async(query: str, timeout: Optional[float] = None, context: Optional[str] = None) -> PlanModel:
+    """
+    Async variant of nlp_core.get_plan.
+    The local classifier and intent cache answer inline; Gemini is called with
+    llm_backend.generate_async, so other queries keep running while it classifies.
+    timeout defaults to the intent_timeout setting; context is passed as in get_intent.
+    Raises ValueError on API or validation errors, StageTimeoutError on timeout.
+    """
+    with tracing.span("intent") as intent_span:
+        intent, cache = nlp_core.resolve_intent_locally(query, use_cache=not context)
+        if intent is not None:
+            return nlp_core.as_plan(intent)
+        intent_span.set_attribute("source", "gemini")
+        timeout = get_settings().intent_timeout if timeout is None else timeout
+        prompt = nlp_core.intent_prompt(query, context)
+        try:
+            with tracing.span("llm.call", model=llm_backend.model_for(llm_backend.TASK_INTENT)) as llm_span:
+                response = await _with_timeout(
+                    "intent", llm_backend.generate_async(llm_backend.TASK_INTENT, prompt), timeout)
+                nlp_core.record_llm_usage(llm_span, prompt, response.text, response)
+            plan = nlp_core.parse_plan_response(response.text)
+        except StageTimeoutError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Failed to get intent from Gemini: {e}")
+        if cache is not None:
+            cache.put(query, nlp_core.cache_value(plan))
+        return plan
+
+async def execute_command_async(intent: IntentModel, timeout: Optional[float] = None) -> Sequence[BaseModel]:
+    """
+    Async variant of k8s_client.execute_command.
+    The blocking Kubernetes client runs in a worker thread; on timeout or cancellation
+    the caller is released immediately and the thread's result is discarded.
+    timeout defaults to the command_timeout setting.
+    Raises the same errors as execute_command, or StageTimeoutError on timeout.
+    """
+    timeout = get_settings().command_timeout if timeout is None else timeout
+    return await _with_timeout("command", asyncio.to_thread(execute_command, intent), timeout)
+
+async def execute_plan_async(plan: PlanModel, timeout: Optional[float] = None) -> List[Sequence[BaseModel]]:
+    """
+    Async variant of planner.execute_plan; the whole plan shares one command timeout
+    (default: command_timeout setting).
+    """
+    timeout = get_settings().command_timeout if timeout is None else timeout
+    return await _with_timeout("command", asyncio.to_thread(execute_plan, plan), timeout)
+
+async def generate_response_stream_async(data: Sequence[BaseModel], explain: bool = False,
+                                         timeout: Optional[float] = None) -> AsyncIterator[str]:
+    """
+    Async variant of nlp_core.generate_response_stream for a materialized result list.
+    Yields text chunks to be printed as-is. Gemini summaries are streamed with
+    llm_backend.generate_async(stream=True); timeout (default: summary_timeout setting)
+    bounds the wait for the first chunk and between chunks.
+    Raises ValueError on API errors, StageTimeoutError on timeout.
+    """
+    timeout = get_settings().summary_timeout if timeout is None else timeout
+    data, errors = split_errors(data)
+    local = "No resources found." if errors and not data else nlp_core.local_response(data, explain)
+    if local is not None:
+        yield local + "\n"
+    else:
+        ends_with_newline = True
+        prompt = nlp_core.summary_prompt(data)
+        # Not a context manager: the span would otherwise become current for the consumer between yields
+        llm_span = tracing.start_span("llm.call", model=llm_backend.model_for(llm_backend.TASK_SUMMARY), stream=True)
+        received = []
+        try:
+            response = await _with_timeout(
+                "summary", llm_backend.generate_async(llm_backend.TASK_SUMMARY, prompt, stream=True), timeout)
+            chunks = response.__aiter__()
+            while True:
+                try:
+                    chunk = await _with_timeout("summary", chunks.__anext__(), timeout)
+                except StopAsyncIteration:
+                    break
+                if chunk.text:
+                    if not received:
+                        llm_span.set_attribute("first_chunk_ms", round(llm_span.elapsed_ms(), 1))
+                    received.append(chunk.text)
+                    ends_with_newline = chunk.text.endswith("\n")
+                    yield chunk.text
+        except StageTimeoutError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Failed to generate summary from Gemini: {e}")
+        finally:
+            nlp_core.record_llm_usage(llm_span, prompt, "".join(received))
+            llm_span.end()
+        if not ends_with_newline:
+            yield "\n"
+    for error in errors:
+        yield nlp_core.namespace_error_line(error) + "\n"
+
+async def generate_response_async(data: Sequence[BaseModel], explain: bool = False,
+                                  timeout: Optional[float] = None) -> str:
+    """Async variant of nlp_core.generate_response; collects generate_response_stream_async."""
+    chunks = [chunk async for chunk in generate_response_stream_async(data, explain=explain, timeout=timeout)]
+    return "".join(chunks).rstrip("\n")
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Sequence, TextIO, Tuple
+from pydantic import BaseModel
+from src import tracing
+from src.async_pipeline import get_plan_async, execute_command_async, execute_plan_async, generate_response_async
+from src.k8s_client import request_priority
+from src.models import IntentModel, PlanModel
+from src.nlp_core import wants_explanation
+from src.request_limits import BATCH
+from src.results import dump_results
+
+def read_queries(stream: TextIO) -> List[str]:
+    """Reads one query per line, skipping blank lines and '#' comments."""
+    queries = []
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            queries.append(line)
+    return queries
+
+def intent_key(intent: IntentModel) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    """Identifies an intent by name plus its (order-independent) entities, e.g. namespace and selectors."""
+    return intent.intent, tuple(sorted((e.type, e.value) for e in intent.entities))
+
+def _ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+async def _execute(plan: PlanModel) -> List[Sequence[BaseModel]]:
+    """Runs a plan and returns one result per step; a single step skips the planner."""
+    if len(plan.steps) == 1:
+        return [await execute_command_async(plan.steps[0])]
+    return await execute_plan_async(plan)
+
+class BatchRunner:
+    """
+    Runs many queries through the async pipeline with bounded concurrency.
+    Queries that resolve to the same intents and entities share one Kubernetes call,
+    and each step one summary per explain flag, so each distinct (intent, namespace)
+    pair hits the API once. A multi-intent query runs every step of its plan.
+    Attributes:
+        concurrency (int): Max queries processed at the same time.
+        summarize (bool): Summarize results; when False the raw models are returned instead.
+    """
+    def __init__(self, concurrency: int = 4, summarize: bool = True):
+        self.concurrency = max(1, concurrency)
+        self.summarize = summarize
+        self._commands: Dict[Any, asyncio.Task] = {}
+        self._summaries: Dict[Any, asyncio.Task] = {}
+
+    def _shared(self, tasks: Dict[Any, asyncio.Task], key: Any, factory: Callable[[], Awaitable]) -> Tuple[asyncio.Task, bool]:
+        """Returns (task, reused) for key, starting factory() only for the first caller."""
+        task = tasks.get(key)
+        if task is not None:
+            return task, True
+        task = tasks[key] = asyncio.ensure_future(factory())
+        return task, False
+
+    async def run_query(self, index: int, query: str) -> Dict[str, Any]:
+        """Runs one query and returns its JSON-serializable result record."""
+        with tracing.span("query", index=index):
+            return await self._run_query(index, query)
+
+    async def _run_query(self, index: int, query: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        record: Dict[str, Any] = {"index": index, "query": query, "timings_ms": {}}
+        timings = record["timings_ms"]
+        stage = "intent"
+        try:
+            stage_start = time.perf_counter()
+            plan = await get_plan_async(query)
+            timings["intent"] = _ms(stage_start)
+            # A single step is reported in the record itself, several steps under "steps"
+            outputs = [record] if len(plan.steps) == 1 else [{} for _ in plan.steps]
+            if len(outputs) > 1:
+                record["steps"] = outputs
+            for output, step in zip(outputs, plan.steps):
+                output["intent"] = step.intent
+                output["entities"] = [e.model_dump() for e in step.entities]
+            stage = "command"
+            stage_start = time.perf_counter()
+            keys = [intent_key(step) for step in plan.steps]
+            task, record["deduplicated"] = self._shared(self._commands, tuple(keys), lambda: _execute(plan))
+            # shield: a cancelled query must not cancel a call other queries are waiting on
+            results: List[Sequence[BaseModel]] = await asyncio.shield(task)
+            timings["command"] = _ms(stage_start)
+            for output, data in zip(outputs, results):
+                output["count"] = len(data)
+            if self.summarize:
+                stage = "summary"
+                stage_start = time.perf_counter()
+                explain = wants_explanation(query)
+                tasks = [self._shared(self._summaries, (key, explain),
+                                      lambda data=data: generate_response_async(data, explain=explain))[0]
+                         for key, data in zip(keys, results)]
+                responses = await asyncio.shield(asyncio.gather(*tasks))
+                for output, response in zip(outputs, responses):
+                    output["response"] = response
+                timings["summary"] = _ms(stage_start)
+            else:
+                for output, data in zip(outputs, results):
+                    output["data"] = dump_results(data)
+        except Exception as e:
+            record["error"] = {"stage": stage, "type": type(e).__name__, "message": str(e)}
+        timings["total"] = _ms(started)
+        return record
+
+    async def run(self, queries: Iterable[str], emit: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Runs all queries and emits one record per query, in input order.
+        API requests run at batch priority, so interactive users of the same process go first.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(index: int, query: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.run_query(index, query)
+
+        # Tasks copy the current context when created, so they inherit the batch priority
+        with request_priority(BATCH):
+            tasks = [asyncio.ensure_future(bounded(i, q)) for i, q in enumerate(queries)]
+        try:
+            for task in tasks:
+                emit(await task)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+def run_batch(queries: List[str], out: TextIO, concurrency: int = 4, summarize: bool = True) -> int:
+    """
+    Runs queries and writes one JSON object per line to out.
+    Returns the number of queries that failed.
+    """
+    failures = 0
+
+    def emit(record: Dict[str, Any]) -> None:
+        nonlocal failures
+        failures += "error" in record
+        out.write(json.dumps(record, default=str) + "\n")
+        out.flush()
+
+    asyncio.run(BatchRunner(concurrency=concurrency, summarize=summarize).run(queries, emit))
+    return failures
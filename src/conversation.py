@@ -0,0 +1,132 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Sequence
+from src.models import ConversationState, EntityModel, IntentModel, PodChangeModel
+from src.nlp_core import wants_changes
+from src.payload import estimate_tokens
+from src.render import phase_counts_line
+from src.results import PodTable, pod_rows
+
+# Queries that refer back to an earlier answer ("those pods", "same namespace", "their images").
+# "there" is left out and "their" needs a noun: "are there failing pods?" is a new question
+_FOLLOW_UP_RE = re.compile(
+    r"\b(those|these|them|same|that namespace|this namespace|previous|above|again"
+    r"|their\s+(?:pods?|images?|containers?|status(?:es)?|restarts?|namespaces?|labels?))\b", re.IGNORECASE)
+
+# Entity types a follow-up inherits from the last pod query when it names none of its own
+SCOPE_ENTITY_TYPES = ("namespace", "all_namespaces")
+SELECTOR_ENTITY_TYPES = ("label_selector", "field_selector")
+
+# Queries are stored truncated; the intent and entities carry what a follow-up needs
+MAX_QUERY_CHARS = 80
+
+# Distinct '<intent> <scope>' entries kept in the digest of older turns
+MAX_DIGEST_ENTRIES = 5
+
+def is_follow_up(query: str) -> bool:
+    """Returns True when a query refers back to an earlier answer of the session."""
+    return bool(_FOLLOW_UP_RE.search(query)) or wants_changes(query)
+
+def _scope(entities: Sequence[EntityModel]) -> str:
+    """Compact scope of a turn, e.g. 'prod', 'prod,staging' or '*'."""
+    if any(e.type == "all_namespaces" for e in entities):
+        return "*"
+    return ",".join(e.value for e in entities if e.type == "namespace") or "default"
+
+def result_summary(data: Optional[Sequence[Any]]) -> Optional[str]:
+    """One-line reference to a command result, such as '12 pods: 1 Failed, 11 Running'."""
+    if data is None or not isinstance(data, Sequence):
+        return None
+    if data and isinstance(data[0], PodChangeModel):
+        return f"{len(data)} changed pods"
+    if isinstance(data, PodTable) and data.kind.model_fields.get("status") is not None:
+        return phase_counts_line(pod_rows(data))
+    return f"{len(data)} items"
+
+def _turn_tokens(turn: Dict[str, Any]) -> int:
+    return estimate_tokens(json.dumps(turn, separators=(",", ":")))
+
+def _fold(state: ConversationState, turn: Dict[str, Any]) -> None:
+    """Rolls a turn out of history into the digest."""
+    entities = [EntityModel(**e) for e in turn.get("entities", [])]
+    key = f"{turn.get('intent')} {_scope(entities)}"
+    state.digest[key] = state.digest.get(key, 0) + 1
+    if len(state.digest) > MAX_DIGEST_ENTRIES:
+        # Drop the least frequent entry; ties go to the oldest
+        del state.digest[min(state.digest, key=state.digest.get)]
+
+def compact(state: ConversationState) -> None:
+    """
+    Folds the oldest turns into the digest until history is within max_turns and
+    max_tokens. The latest turn is always kept.
+    """
+    history = state.history
+    tokens = sum(_turn_tokens(turn) for turn in history)
+    while len(history) > 1 and (len(history) > state.max_turns or tokens > state.max_tokens):
+        turn = history.pop(0)
+        tokens -= _turn_tokens(turn)
+        _fold(state, turn)
+
+def record_turn(state: ConversationState, query: str, intent: IntentModel,
+                data: Optional[Sequence[Any]] = None) -> None:
+    """
+    Adds a turn to the session: a compact entry in history (no response text), and for
+    pod queries the resolved namespace and selectors as slots for later follow-ups.
+    """
+    entities = [e.model_dump() for e in intent.entities if e.type != "resource_type"]
+    turn: Dict[str, Any] = {"query": query[:MAX_QUERY_CHARS], "intent": intent.intent, "entities": entities}
+    summary = result_summary(data)
+    if summary is not None:
+        turn["result"] = summary
+    state.history.append(turn)
+    slots = {"intent": intent.intent, "namespace": _scope(intent.entities)}
+    for entity_type in SELECTOR_ENTITY_TYPES:
+        values = [e.value for e in intent.entities if e.type == entity_type]
+        if values:
+            slots[entity_type] = ",".join(values)
+    if summary is not None:
+        slots["result"] = summary
+    state.slots = slots
+    compact(state)
+
+def resolve_follow_up(state: ConversationState, query: str, intent: IntentModel) -> IntentModel:
+    """
+    Fills in the scope of a follow-up query from the session slots: a follow-up without
+    a namespace gets the last one, and one without selectors also inherits the last
+    selectors ("those pods" is the previous result set). Other intents are returned as-is.
+    """
+    if not state.slots or not is_follow_up(query):
+        return intent
+    types = {e.type for e in intent.entities}
+    if types & set(SCOPE_ENTITY_TYPES):
+        return intent
+    entities: List[EntityModel] = list(intent.entities)
+    namespace = state.slots.get("namespace", "default")
+    if namespace == "*":
+        entities.append(EntityModel(type="all_namespaces", value="true"))
+    else:
+        entities.extend(EntityModel(type="namespace", value=ns) for ns in namespace.split(","))
+    if not types & set(SELECTOR_ENTITY_TYPES):
+        for entity_type in SELECTOR_ENTITY_TYPES:
+            if entity_type in state.slots:
+                # Selector lists are joined with ',' which is also the selector AND syntax
+                entities.append(EntityModel(type=entity_type, value=state.slots[entity_type]))
+    return IntentModel(intent=intent.intent, entities=entities)
+
+def conversation_context(state: Optional[ConversationState], query: str) -> Optional[str]:
+    """
+    Returns the context block added to the intent prompt for a follow-up query, or None.
+    Its size is bounded by the digest cap and the session's max_turns/max_tokens, so
+    the prompt does not grow with the length of the session.
+    """
+    if state is None or not state.history or not is_follow_up(query):
+        return None
+    lines = []
+    if state.digest:
+        lines.append("Earlier: " + "; ".join(f"{key} x{count}" for key, count in state.digest.items()))
+    for turn in state.history:
+        entities = " ".join(f"{e['type']}={e['value']}" for e in turn["entities"])
+        result = f" -> {turn['result']}" if "result" in turn else ""
+        lines.append(f"- '{turn['query']}': {turn['intent']} {entities}".rstrip() + result)
+    lines.append("Current: " + ", ".join(f"{k}={v}" for k, v in state.slots.items()))
+    return "\n".join(lines)
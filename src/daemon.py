@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import stat
+from typing import Any, Dict, Optional
+from src.batch import BatchRunner
+from src.daemon_client import default_socket_path
+from src.k8s_client import get_kubernetes_client
+
+def _remove_stale_socket(path: str) -> None:
+    """
+    Removes a socket file left behind by a daemon that is no longer running.
+    Raises RuntimeError if another daemon is still listening on path, or if path is not a socket.
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError(f"{path} exists and is not a socket; refusing to replace it")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            os.unlink(path)
+            return
+    raise RuntimeError(f"A kubeai daemon is already listening on {path}")
+
+async def handle_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Answers one daemon request: {"query": str, "summarize": bool} runs a query and
+    returns its result record (see BatchRunner.run_query); {"op": "ping"} checks liveness.
+    """
+    if request.get("op") == "ping":
+        return {"ok": True, "pid": os.getpid()}
+    query = request.get("query")
+    if not isinstance(query, str) or not query.strip():
+        return {"error": {"stage": "request", "type": "ValueError", "message": "Request needs a non-empty 'query'"}}
+    runner = BatchRunner(summarize=bool(request.get("summarize", True)))
+    return await runner.run_query(0, query.strip())
+
+async def _handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Serves newline-delimited JSON requests on one client connection."""
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+            except ValueError as e:
+                reply = {"error": {"stage": "request", "type": "ValueError", "message": f"Invalid request: {e}"}}
+            else:
+                reply = await handle_request(request)
+            writer.write(json.dumps(reply, default=str).encode() + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+def warm_up() -> None:
+    """Loads kubeconfig and opens the shared client up front; failures are reported per query later."""
+    try:
+        get_kubernetes_client()
+    except Exception as e:
+        print(f"[Warm-up Error] {e}")
+
+async def start_daemon(path: Optional[str] = None) -> asyncio.AbstractServer:
+    """Starts listening on a Unix socket that only the current user can access."""
+    path = path or default_socket_path()
+    _remove_stale_socket(path)
+    old_umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(_handle_connection, path=path)
+    finally:
+        os.umask(old_umask)
+    return server
+
+async def serve(path: Optional[str] = None, warm: bool = True) -> None:
+    """Runs the daemon until cancelled, keeping clients, caches and connections warm between queries."""
+    path = path or default_socket_path()
+    server = await start_daemon(path)
+    # SIGTERM stops the daemon like Ctrl-C, so the socket file is removed
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    if warm:
+        await asyncio.to_thread(warm_up)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
+
+def run_daemon(path: Optional[str] = None) -> None:
+    """Blocking entry point for `python app.py --daemon`; Ctrl-C stops the daemon."""
+    path = path or default_socket_path()
+    print(f"kubeai daemon listening on {path} (Ctrl-C to stop)")
+    try:
+        asyncio.run(serve(path))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\nkubeai daemon stopped.")
@@ -0,0 +1,72 @@
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import Any, Dict, Optional
+
+# Thin client for the kubeai daemon (src/daemon.py), e.g.:
+#   python -m src.daemon_client "list pods in kube-system"
+# Only the standard library is imported, so a one-shot query does not pay for
+# loading google.generativeai, kubernetes or pydantic.
+
+def default_socket_path() -> str:
+    """Returns KUBEAI_DAEMON_SOCKET, or a per-user socket in the runtime directory."""
+    path = os.environ.get("KUBEAI_DAEMON_SOCKET")
+    if path:
+        return path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "kubeai.sock")
+    return f"/tmp/kubeai-{os.getuid()}.sock"
+
+def request_daemon(request: Dict[str, Any], path: Optional[str] = None, timeout: float = 120.0) -> Dict[str, Any]:
+    """
+    Sends one JSON request to the daemon and returns its JSON reply.
+    Raises OSError (e.g., ConnectionRefusedError, FileNotFoundError) if the daemon is not running.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path or default_socket_path())
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile("rb") as reply:
+            line = reply.readline()
+    if not line:
+        raise ConnectionError("kubeai daemon closed the connection without a reply")
+    return json.loads(line)
+
+def query_daemon(query: str, path: Optional[str] = None, summarize: bool = True, timeout: float = 120.0) -> Dict[str, Any]:
+    """Runs one query on the daemon and returns its result record (see src/batch.py)."""
+    return request_daemon({"query": query, "summarize": summarize}, path=path, timeout=timeout)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="kubeai-query", description="Send one query to a running kubeai daemon.")
+    parser.add_argument("query", nargs="+", help="natural language query")
+    parser.add_argument("--socket", help="daemon socket path (default: %(default)s)", default=default_socket_path())
+    parser.add_argument("--json", action="store_true", help="print the full JSON result record")
+    parser.add_argument("--no-summary", dest="summarize", action="store_false", help="return raw results")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for the reply")
+    args = parser.parse_args(argv)
+    try:
+        record = query_daemon(" ".join(args.query), path=args.socket, summarize=args.summarize, timeout=args.timeout)
+    except OSError as e:
+        print(f"[Daemon Error] Could not reach kubeai daemon at {args.socket}: {e}", file=sys.stderr)
+        print("Start it with: python app.py --daemon", file=sys.stderr)
+        return 2
+    if args.json:
+        print(json.dumps(record))
+    elif "error" in record:
+        print(f"[{record['error']['stage'].capitalize()} Error] {record['error']['message']}", file=sys.stderr)
+    else:
+        steps = record.get("steps", [record])
+        for step in steps:
+            if len(steps) > 1:
+                print(f"[{step['intent']}]")
+            if "response" in step:
+                print(step["response"])
+            else:
+                print(json.dumps(step.get("data", []), indent=2))
+    return 1 if "error" in record else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
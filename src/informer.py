@@ -0,0 +1,145 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+
+# Seconds to wait before re-watching after an unexpected watch failure
+WATCH_RETRY_DELAY = 1.0
+
+def _pod_key(pod: Any) -> str:
+    """Index key for a pod: '<namespace>/<name>'."""
+    return f"{pod.metadata.namespace}/{pod.metadata.name}"
+
+class PodInformer:
+    """
+    Keeps an in-memory index of the pods in one namespace (or all namespaces).
+    Performs a single list call and then follows a watch stream,
+    resuming from the last seen resourceVersion, so reads never hit the API server.
+    Attributes:
+        api: CoreV1Api used for the list and watch calls.
+        namespace (Optional[str]): Namespace being mirrored; None mirrors all namespaces.
+        resource_version (Optional[str]): Last resourceVersion applied to the index.
+    """
+    def __init__(self, api: Any, namespace: Optional[str], watch_timeout: int = 300):
+        self.api = api
+        self.namespace = namespace
+        self.watch_timeout = watch_timeout
+        self.resource_version: Optional[str] = None
+        self._index: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watch: Optional[watch.Watch] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, background: bool = True) -> "PodInformer":
+        """
+        Performs the initial list (errors propagate to the caller) and,
+        if background is True, starts the watch thread.
+        """
+        self._relist()
+        if background:
+            self._thread = threading.Thread(
+                target=self._run, name=f"pod-informer-{self.namespace or 'all'}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the watch thread; the index keeps its last state."""
+        self._stop.set()
+        if self._watch is not None:
+            self._watch.stop()
+
+    def list_pods(self) -> List[Any]:
+        """Returns a snapshot of the indexed pods ordered by namespace/name."""
+        with self._lock:
+            return [self._index[key] for key in sorted(self._index)]
+
+    def get_pod(self, name: str, namespace: Optional[str] = None) -> Optional[Any]:
+        """Returns the indexed pod with the given name, or None."""
+        with self._lock:
+            return self._index.get(f"{namespace or self.namespace}/{name}")
+
+    def _list_call(self) -> Tuple[Callable, Dict[str, Any]]:
+        """Returns the list function and its scoping kwargs for this informer."""
+        if self.namespace is None:
+            return self.api.list_pod_for_all_namespaces, {}
+        return self.api.list_namespaced_pod, {"namespace": self.namespace}
+
+    def _relist(self) -> None:
+        """Replaces the index with a fresh list and records its resourceVersion."""
+        list_func, kwargs = self._list_call()
+        pod_list = list_func(**kwargs)
+        index = {_pod_key(pod): pod for pod in pod_list.items}
+        with self._lock:
+            self._index = index
+            self.resource_version = pod_list.metadata.resource_version
+
+    def _apply_event(self, event: Dict[str, Any]) -> None:
+        """Applies one watch event (ADDED/MODIFIED/DELETED/BOOKMARK) to the index."""
+        # The raw object carries the resourceVersion for every event type; a BOOKMARK's
+        # object is not deserialized into a pod
+        resource_version = (event.get("raw_object") or {}).get("metadata", {}).get("resourceVersion")
+        with self._lock:
+            if event["type"] in ("ADDED", "MODIFIED"):
+                self._index[_pod_key(event["object"])] = event["object"]
+            elif event["type"] == "DELETED":
+                self._index.pop(_pod_key(event["object"]), None)
+            if resource_version:
+                self.resource_version = resource_version
+
+    def _watch_once(self) -> None:
+        """Follows one watch stream from the current resourceVersion until it ends."""
+        list_func, kwargs = self._list_call()
+        self._watch = watch.Watch()
+        for event in self._watch.stream(
+                list_func,
+                **kwargs,
+                resource_version=self.resource_version,
+                timeout_seconds=self.watch_timeout,
+                allow_watch_bookmarks=True):
+            self._apply_event(event)
+            if self._stop.is_set():
+                break
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._watch_once()
+            except ApiException as e:
+                if e.status == 410:
+                    # resourceVersion too old: rebuild the index from a fresh list
+                    try:
+                        self._relist()
+                        continue
+                    except Exception:
+                        pass
+                self._stop.wait(WATCH_RETRY_DELAY)
+            except Exception:
+                self._stop.wait(WATCH_RETRY_DELAY)
+
+# Process-wide informers, one per namespace (None for all namespaces)
+_informers_lock = threading.Lock()
+_informers: Dict[Optional[str], PodInformer] = {}
+
+def get_pod_informer(api: Any, namespace: Optional[str], watch_timeout: int = 300) -> PodInformer:
+    """
+    Returns the running PodInformer for namespace (None for all namespaces), starting one on first use.
+    An informer bound to a different api (e.g. after a kubeconfig reload) is replaced.
+    """
+    with _informers_lock:
+        informer = _informers.get(namespace)
+        if informer is not None and informer.api is api:
+            return informer
+        if informer is not None:
+            informer.stop()
+        informer = PodInformer(api, namespace, watch_timeout=watch_timeout).start()
+        _informers[namespace] = informer
+        return informer
+
+def stop_all_informers() -> None:
+    """Stops and forgets every running PodInformer."""
+    with _informers_lock:
+        informers = list(_informers.values())
+        _informers.clear()
+    for informer in informers:
+        informer.stop()
@@ -0,0 +1,127 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional, Union
+from src.models import IntentModel, PlanModel
+
+# Gemini answers a query with one intent or, for multi-intent queries, a plan
+CachedIntent = Union[IntentModel, PlanModel]
+
+_PUNCTUATION = "?!.,;:'\"`()[]"
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes a query for cache lookups: collapses whitespace, lowercases and strips
+    surrounding punctuation from each word.
+    Selector-like words (containing '=') keep their case, since label values are case-sensitive.
+    """
+    words = []
+    for word in query.split():
+        word = word.strip(_PUNCTUATION)
+        if not word:
+            continue
+        words.append(word if "=" in word else word.lower())
+    return " ".join(words)
+
+def cache_version(prompt: str, intents: Iterable[str]) -> str:
+    """Fingerprints the prompt template and supported intent set; entries from other versions are stale."""
+    digest = hashlib.sha256(prompt.encode())
+    digest.update("\0".join(sorted(intents)).encode())
+    return digest.hexdigest()[:16]
+
+class IntentCache:
+    """
+    LRU cache of normalized query -> IntentModel (or PlanModel), optionally persisted to sqlite.
+    Entries are tagged with a version (see cache_version); entries written under a
+    different prompt template or intent set are ignored and purged on open.
+    Attributes:
+        version (str): Version tag of the current prompt/intents.
+        max_entries (int): Max entries kept in memory.
+        path (Optional[str]): sqlite file for persistence across runs, or None for memory only.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups not found in the cache.
+    """
+    def __init__(self, version: str, max_entries: int = 512, path: Optional[str] = None):
+        self.version = version
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, CachedIntent]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS intents (query TEXT PRIMARY KEY, version TEXT NOT NULL, intent TEXT NOT NULL)")
+            self._db.execute("DELETE FROM intents WHERE version != ?", (version,))
+            self._db.commit()
+
+    def get(self, query: str) -> Optional[CachedIntent]:
+        """Returns the cached IntentModel or PlanModel for query, or None."""
+        key = normalize_query(query)
+        with self._lock:
+            intent = self._entries.get(key)
+            if intent is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT intent FROM intents WHERE query = ? AND version = ?", (key, self.version)).fetchone()
+                if row is not None:
+                    model = PlanModel if row[0].startswith('{"steps"') else IntentModel
+                    intent = model.model_validate_json(row[0])
+                    self._store(key, intent)
+            if intent is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return intent.model_copy(deep=True)
+
+    def put(self, query: str, intent: CachedIntent) -> None:
+        """Caches intent for query in memory and, if configured, on disk."""
+        key = normalize_query(query)
+        with self._lock:
+            self._store(key, intent.model_copy(deep=True))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO intents (query, version, intent) VALUES (?, ?, ?)",
+                    (key, self.version, intent.model_dump_json()))
+                self._db.commit()
+
+    def _store(self, key: str, intent: CachedIntent) -> None:
+        self._entries[key] = intent
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def close(self) -> None:
+        """Closes the sqlite store, if any."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+_cache_lock = threading.Lock()
+_cache: Optional[IntentCache] = None
+
+def get_intent_cache(version: str, max_entries: int = 512, path: Optional[str] = None) -> IntentCache:
+    """
+    Returns the process-wide IntentCache, replacing it when the version,
+    size or path changes (e.g., after the prompt template was edited).
+    """
+    global _cache
+    with _cache_lock:
+        current = _cache
+        if current is None or (current.version, current.max_entries, current.path) != (version, max_entries, path):
+            if current is not None:
+                current.close()
+            _cache = IntentCache(version, max_entries=max_entries, path=path)
+        return _cache
+
+def reset_intent_cache() -> None:
+    """Closes and forgets the process-wide IntentCache."""
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
@@ -0,0 +1,212 @@
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+from src.models import IntentModel, EntityModel
+
+# Keyword weights per supported intent
+INTENT_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "get_pod_images": {
+        "image": 3, "images": 3, "registry": 2, "registries": 2, "tag": 1, "tags": 1,
+        "version": 1, "versions": 1, "digest": 1,
+    },
+    "get_pod_status": {
+        "status": 3, "statuses": 3, "state": 2, "health": 2, "healthy": 2, "unhealthy": 2,
+        "restarts": 2, "restarting": 2, "crashing": 2, "failing": 1, "failed": 1, "pending": 1,
+        "list": 0.5, "show": 0.5, "get": 0.5, "display": 0.5, "running": 0.5, "up": 0.5,
+    },
+}
+
+# Words that tie a query to the pod resource; without one the query is left to Gemini
+RESOURCE_WORDS = {"pod", "pods", "container", "containers", "image", "images", "workload", "workloads"}
+
+# Words that point to resources or actions the supported intents do not cover
+VETO_WORDS = {
+    "node", "nodes", "deployment", "deployments", "service", "services", "svc", "log", "logs",
+    "event", "events", "secret", "secrets", "configmap", "configmaps", "ingress", "cpu", "memory",
+    "why", "explain", "delete", "scale", "describe", "previous", "before", "changed", "compare",
+    # Negations flip the scope of a namespace or filter, which the entity patterns cannot express
+    "not", "except", "excluding", "without",
+}
+
+# Filler words that carry no intent signal but are expected in well-formed queries
+FILLER_WORDS = {
+    "a", "all", "an", "and", "any", "are", "around", "at", "can", "cluster", "currently", "do", "does",
+    "each", "every", "for", "from", "give", "i", "in", "is", "me", "my", "namespace", "namespaces",
+    "now", "of", "on", "please", "see", "the", "their", "there", "these", "they", "those", "to",
+    "use", "used", "uses", "using", "what", "whats", "which", "with", "you", "right", "across",
+    "label", "labels", "labeled", "labelled", "selector", "how", "many", "being",
+}
+
+# Namespace names that are really English words caught by the "in <name>" pattern
+NAMESPACE_STOPWORDS = {
+    "the", "my", "a", "an", "this", "that", "cluster", "use", "total", "there", "which", "it",
+    "json", "yaml", "yml", "text", "table", "wide", "order", "detail", "details", "full", "short", "brief",
+    "summary", "general", "particular", "sorted", "alphabetical", "addition", "case",
+    "yesterday", "today", "now", "last", "past", "recent", "hour", "hours", "minute", "minutes",
+    "day", "days", "week", "weeks", "here", "them", "each", "any", "k8s", "kubernetes",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9._/:=-]*")
+_NAME = r"[a-z0-9](?:[-a-z0-9]*[a-z0-9])?"
+# Entity patterns run on the original text (label values are case-sensitive)
+_ALL_NAMESPACES_RE = re.compile(
+    r"\b(?:all|every|across)\s+(?:the\s+)?namespaces\b|\bcluster[- ]wide\b|(?:^|\s)-a(?:\s|$)|--all-namespaces\b",
+    re.IGNORECASE)
+_NAMESPACE_LIST_RE = re.compile(
+    rf"\b(?:in|from)\s+(?:the\s+)?(?:namespaces?\s+)?({_NAME}(?:\s*(?:,|and|&)\s*{_NAME})*)(?:\s+namespaces?)?\b",
+    re.IGNORECASE)
+_NAMESPACE_FLAG_RE = re.compile(rf"(?:^|\s)(?:-n|--namespace|namespace|ns)[\s=]+({_NAME})\b", re.IGNORECASE)
+_PHASE = r"(failed|failing|pending|running|succeeded|completed|unknown)"
+# "<phase> pods" or "pods (that) are <phase>"
+_PHASE_RE = re.compile(
+    rf"\b(?:{_PHASE}\s+(?:pods?|containers?)|(?:pods?|containers?)\s+(?:that\s+|which\s+)?(?:are|is)\s+"
+    rf"(?:currently\s+|still\s+)?{_PHASE})\b",
+    re.IGNORECASE)
+_DNS_LABEL_RE = re.compile(r"[a-z0-9](?:[-a-z0-9]{0,61}[a-z0-9])?")
+_NODE_RE = re.compile(rf"\bon\s+(?:the\s+)?node\s+({_NAME}(?:\.{_NAME})*)\b", re.IGNORECASE)
+_LABEL_RE = re.compile(r"\b([A-Za-z0-9][-A-Za-z0-9_./]*!?=[-A-Za-z0-9_.]+)\b")
+
+# Selector keys the API server only supports as field selectors
+FIELD_SELECTOR_PREFIXES = ("status.", "spec.", "metadata.name", "metadata.namespace")
+
+# Keyword weight from which a word counts as asking for its intent (verbs like "list" do not)
+STRONG_KEYWORD_WEIGHT = 1
+
+# Margin credited to queries that name pods but no intent keyword
+BARE_QUERY_MARGIN = 0.9
+
+PHASES = {"failed": "Failed", "failing": "Failed", "pending": "Pending", "running": "Running",
+          "succeeded": "Succeeded", "completed": "Succeeded", "unknown": "Unknown"}
+
+class LocalIntentClassifier:
+    """
+    Rule and keyword based first-stage intent classifier.
+    Resolves common queries (e.g., "list pods in kube-system") locally in well under a millisecond.
+    Returns None when it is not confident, so the caller can fall back to Gemini.
+    Attributes:
+        threshold (float): Minimum confidence (0-1) needed to return an intent.
+        hits (int): Queries resolved locally.
+        misses (int): Queries left to the fallback.
+    """
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def classify(self, query: str, threshold: Optional[float] = None) -> Optional[IntentModel]:
+        """Returns an IntentModel when confidence reaches the threshold, otherwise None."""
+        intent, entities, confidence = self.score(query)
+        confident = intent is not None and confidence >= (self.threshold if threshold is None else threshold)
+        with self._lock:
+            if confident:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return IntentModel(intent=intent, entities=entities) if confident else None
+
+    def score(self, query: str) -> Tuple[Optional[str], List[EntityModel], float]:
+        """
+        Scores a query without updating counters.
+        Returns (intent, entities, confidence); intent is None when the query is out of scope.
+        """
+        text = query.strip().rstrip("?.!")
+        entities, entity_tokens = _extract_entities(text)
+        if entities is None:
+            return None, [], 0.0
+        tokens = _TOKEN_RE.findall(text.lower())
+        free_tokens = [t for t in tokens if t not in entity_tokens]
+        if not tokens or not RESOURCE_WORDS.intersection(tokens) or VETO_WORDS.intersection(free_tokens):
+            return None, [], 0.0
+        if any(t in PHASES for t in free_tokens):
+            # A phase word outside the phase patterns ("failing in prod") would lose its filter
+            return None, [], 0.0
+        strong = [i for i, weights in INTENT_KEYWORDS.items() if any(weights.get(t, 0) >= STRONG_KEYWORD_WEIGHT for t in tokens)]
+        if len(strong) > 1:
+            # Asks for several things ("status and images"): a plan for Gemini
+            return None, [], 0.0
+        scores = {intent: sum(weights.get(t, 0) for t in tokens) for intent, weights in INTENT_KEYWORDS.items()}
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        (best, best_score), (_, second_score) = ranked[0], ranked[1]
+        if best_score == 0:
+            # A bare pod query ("pods in prod") defaults to a status listing, with less certainty
+            best, margin = "get_pod_status", BARE_QUERY_MARGIN
+        else:
+            margin = (best_score - second_score) / best_score
+        known = sum(1 for t in tokens if _is_known(t, entity_tokens))
+        confidence = margin * known / len(tokens)
+        if not entities:
+            entities = [EntityModel(type="resource_type", value="pods")]
+        return best, entities, confidence
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit/miss counters."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def reset_stats(self) -> None:
+        """Zeroes the hit/miss counters."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+def _is_known(token: str, entity_tokens: set) -> bool:
+    if token in entity_tokens or token in FILLER_WORDS or token in RESOURCE_WORDS:
+        return True
+    return any(token in weights for weights in INTENT_KEYWORDS.values())
+
+def _is_query_word(name: str) -> bool:
+    """True for words of the query itself ("and their images", "in ns ..."), which are no namespace names."""
+    if name in FILLER_WORDS or name in RESOURCE_WORDS or name in {"ns", "namespace"}:
+        return True
+    return any(name in weights for weights in INTENT_KEYWORDS.values())
+
+def _extract_entities(text: str) -> Tuple[Optional[List[EntityModel]], set]:
+    """
+    Extracts namespace and selector entities from a query.
+    Returns (entities, lowercased tokens consumed by entities); entities is None when a
+    namespace-like phrase could not be interpreted safely.
+    """
+    entities: List[EntityModel] = []
+    consumed = set()
+    if _ALL_NAMESPACES_RE.search(text):
+        entities.append(EntityModel(type="all_namespaces", value="true"))
+        consumed.update({"-a", "--all-namespaces", "cluster-wide", "wide"})
+    else:
+        names = []
+        # "-n prod" / "namespace prod" is read by the flag pattern only, not also as "in ns ..."
+        for match in _NAMESPACE_LIST_RE.finditer(_NAMESPACE_FLAG_RE.sub(" ", text)):
+            names.extend(n.lower() for n in re.split(r"\s*(?:,|\band\b|&)\s*", match.group(1), flags=re.IGNORECASE) if n)
+        names.extend(m.group(1).lower() for m in _NAMESPACE_FLAG_RE.finditer(text))
+        seen = set()
+        for name in names:
+            if name in NAMESPACE_STOPWORDS or _is_query_word(name):
+                return None, consumed
+            if name not in seen:
+                seen.add(name)
+                entities.append(EntityModel(type="namespace", value=name))
+                # Only a valid namespace name counts towards confidence
+                if _DNS_LABEL_RE.fullmatch(name):
+                    consumed.add(name)
+        consumed.update({"-n", "--namespace", "ns"})
+    for match in _PHASE_RE.finditer(text):
+        phase = (match.group(1) or match.group(2)).lower()
+        entities.append(EntityModel(type="field_selector", value=f"status.phase={PHASES[phase]}"))
+        consumed.add(phase)
+    for match in _NODE_RE.finditer(text):
+        node = match.group(1).lower()
+        entities.append(EntityModel(type="field_selector", value=f"spec.nodeName={node}"))
+        consumed.update({"node", node})
+    for match in _LABEL_RE.finditer(text):
+        selector = match.group(1)
+        # A literal field selector ("status.phase=Failed") is a valid label key too, and would match nothing
+        is_field = selector.split("=", 1)[0].rstrip("!").startswith(FIELD_SELECTOR_PREFIXES)
+        entities.append(EntityModel(type="field_selector" if is_field else "label_selector", value=selector))
+        consumed.add(selector.lower())
+    return entities, consumed
+
+_default_classifier = LocalIntentClassifier()
+
+def get_local_classifier() -> LocalIntentClassifier:
+    """Returns the process-wide LocalIntentClassifier."""
+    return _default_classifier
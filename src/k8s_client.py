@@ -1,9 +1,35 @@
-from kubernetes import client, config
+import contextlib
+import functools
+import itertools
+import json
+import os
+import queue
+import socket
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from kubernetes import client, config, watch
 from kubernetes.config.config_exception import ConfigException
-from src.models import IntentModel, EntityModel, PodStatusModel, PodImageModel
+from src.models import IntentModel, EntityModel, PodStatusModel, PodImageModel, NamespaceErrorModel, PodSnapshotModel
+from src.results import PodRow, PodTable, row_model
+from src import tracing
+from src.settings import get_settings
+from src.informer import get_pod_informer
+from src.prefetch import PrefetchSlot, guess_entities
+from src.request_limits import INTERACTIVE, PRIORITIES, SingleFlight, TokenBucket
+from src.snapshot_cache import SnapshotCache, get_snapshot_cache, reset_snapshot_cache
 from pydantic import BaseModel
 from kubernetes.client.rest import ApiException
-from typing import List, Type
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import HTTPError
+
+try:
+    # Optional: orjson decodes large pod lists several times faster than the stdlib
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 class KubeconfigError(Exception):
     """Raised when the Kubernetes configuration cannot be loaded."""
@@ -13,47 +39,214 @@ class CommandExecutionError(Exception):
     """Raised when a command execution fails due to API or input error."""
     pass
 
+# TCP keep-alive timings (seconds) for API server connections, matching client-go
+KEEPALIVE_IDLE = 30
+KEEPALIVE_INTERVAL = 15
+KEEPALIVE_COUNT = 9
+
+def _keepalive_socket_options() -> List[Tuple[int, int, int]]:
+    """
+    Returns urllib3 socket options enabling TCP keep-alive on top of urllib3's defaults.
+    Options the platform does not define are skipped.
+    """
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    for name, value in (("TCP_KEEPIDLE", KEEPALIVE_IDLE),
+                        ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL),
+                        ("TCP_KEEPCNT", KEEPALIVE_COUNT)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
 class KubernetesClient:
     """
     Manages Kubernetes API client initialization using local kubeconfig.
-    Provides access to CoreV1Api and AppsV1Api clients.
+    Provides access to CoreV1Api and AppsV1Api clients, which share a single
+    ApiClient (and therefore one urllib3 connection pool).
     """
-    def __init__(self):
+    def __init__(self, pool_maxsize: Optional[int] = None, tcp_keepalive: Optional[bool] = None):
+        settings = get_settings()
+        configuration = client.Configuration()
         try:
-            config.load_kube_config()
+            with tracing.span("kubeconfig.load"):
+                config.load_kube_config(client_configuration=configuration)
         except ConfigException as e:
             raise KubeconfigError(f"Failed to load kubeconfig: {e}")
+        configuration.connection_pool_maxsize = pool_maxsize or settings.pool_maxsize
+        keepalive = settings.tcp_keepalive if tcp_keepalive is None else tcp_keepalive
+        if keepalive:
+            configuration.socket_options = _keepalive_socket_options()
+        self.api_client = client.ApiClient(configuration)
+        self._core_v1_api = None
+        self._apps_v1_api = None
 
     def get_core_v1_api(self):
-        """Returns a CoreV1Api client instance."""
-        return client.CoreV1Api()
+        """Returns the CoreV1Api client bound to the shared connection pool."""
+        if self._core_v1_api is None:
+            self._core_v1_api = client.CoreV1Api(self.api_client)
+        return self._core_v1_api
 
     def get_apps_v1_api(self):
-        """Returns an AppsV1Api client instance."""
-        return client.AppsV1Api()
+        """Returns the AppsV1Api client bound to the shared connection pool."""
+        if self._apps_v1_api is None:
+            self._apps_v1_api = client.AppsV1Api(self.api_client)
+        return self._apps_v1_api
+
+    def close(self) -> None:
+        """Releases pooled connections held by the underlying ApiClient."""
+        self.api_client.close()
+
+# Process-wide client registry: one KubernetesClient per kubeconfig state
+_client_lock = threading.Lock()
+_shared_client: Optional[KubernetesClient] = None
+_shared_fingerprint: Optional[tuple] = None
+
+def _kubeconfig_fingerprint() -> tuple:
+    """
+    Identifies the current kubeconfig state as (path, mtime, size) for every file
+    listed in KUBECONFIG (or the default ~/.kube/config).
+    Switching contexts rewrites the file, so a context change also changes the fingerprint.
+    """
+    paths = os.environ.get("KUBECONFIG", "~/.kube/config").split(os.pathsep)
+    fingerprint = []
+    for path in (os.path.expanduser(p) for p in paths if p):
+        try:
+            stat = os.stat(path)
+            fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            fingerprint.append((path, None, None))
+    return tuple(fingerprint)
+
+def get_kubernetes_client() -> KubernetesClient:
+    """
+    Returns the process-wide KubernetesClient.
+    Kubeconfig is loaded once and only reloaded when the kubeconfig file
+    (or its current context) changes; the connection pool stays warm in between.
+    """
+    global _shared_client, _shared_fingerprint
+    fingerprint = _kubeconfig_fingerprint()
+    with _client_lock:
+        if _shared_client is None or fingerprint != _shared_fingerprint:
+            stale = _shared_client
+            _shared_client = KubernetesClient()
+            _shared_fingerprint = fingerprint
+            if stale is not None:
+                stale.close()
+                # Cached pod snapshots belong to the previous cluster/context
+                reset_snapshot_cache()
+        return _shared_client
+
+def reset_kubernetes_client() -> None:
+    """Closes and forgets the process-wide KubernetesClient and its rate limiter."""
+    global _shared_client, _shared_fingerprint, _limiter, _limiter_config
+    with _client_lock:
+        stale, _shared_client, _shared_fingerprint = _shared_client, None, None
+        _limiter, _limiter_config = None, None
+    if stale is not None:
+        stale.close()
+
+# Priority of the API requests made in the current context (see request_priority)
+_request_priority: contextvars.ContextVar[str] = contextvars.ContextVar("kubeai_request_priority", default=INTERACTIVE)
+
+# Identical pod list requests in flight, keyed like the result cache (namespace plus selectors)
+_inflight = SingleFlight()
+
+_limiter: Optional[TokenBucket] = None
+_limiter_config: Optional[tuple] = None
+
+@contextlib.contextmanager
+def request_priority(priority: str) -> Iterator[None]:
+    """
+    Runs the block's API requests at priority ('interactive' or 'batch'). The priority is
+    a context variable, so worker threads started with a copied context and asyncio
+    tasks created inside the block inherit it.
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown request priority: {priority} (expected one of {', '.join(PRIORITIES)})")
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+def _rate_limiter() -> Optional[TokenBucket]:
+    """Returns the process-wide token bucket for API requests, or None when api_qps is 0."""
+    global _limiter, _limiter_config
+    settings = get_settings()
+    if settings.api_qps <= 0:
+        return None
+    config_key = (settings.api_qps, settings.api_burst, settings.api_batch_reserve)
+    with _client_lock:
+        if _limiter is None or _limiter_config != config_key:
+            reserve = settings.api_burst * settings.api_batch_reserve
+            _limiter, _limiter_config = TokenBucket(settings.api_qps, settings.api_burst, reserve), config_key
+        return _limiter
+
+def _throttle() -> None:
+    """Waits for the rate limiter before an API request; waiting time is counted on the current span."""
+    limiter = _rate_limiter()
+    if limiter is None:
+        return
+    waited = limiter.acquire(_request_priority.get())
+    if waited:
+        tracing.add_counter("k8s.throttle_ms", waited * 1000)
 
 # Command map: intent string -> handler function
 COMMAND_MAP = {}
+# Streaming command map: intent string -> generator handler yielding models page by page
+STREAM_COMMAND_MAP = {}
 
-def execute_command(intent: IntentModel) -> List[BaseModel]:
+def execute_command(intent: IntentModel) -> Sequence[BaseModel]:
     """
     Maps intent to handler and executes the corresponding Kubernetes command.
+    Pod intents return a PodTable, which builds each model only when it is accessed.
     Handles API and input errors robustly.
     """
     handler = COMMAND_MAP.get(intent.intent)
     if handler is None:
         raise NotImplementedError(f"No handler implemented for intent: {intent.intent}")
     try:
-        return handler(intent.entities)
+        with tracing.span("command", intent=intent.intent):
+            return handler(intent.entities)
     except (ApiException, ValueError) as e:
         # Log error, return empty list or raise custom error
         # print(f"Command execution error: {e}")
         raise CommandExecutionError(f"Failed to execute command for intent '{intent.intent}': {e}")
 
-def _extract_parameters(entities: List[EntityModel], required_params: List[str]) -> dict:
+def _wrap_stream_errors(intent: IntentModel, stream: Iterator[BaseModel]) -> Iterator[BaseModel]:
+    """Re-raises API and input errors from a handler stream as CommandExecutionError."""
+    try:
+        yield from stream
+    except (ApiException, ValueError) as e:
+        raise CommandExecutionError(f"Failed to execute command for intent '{intent.intent}': {e}")
+
+def execute_command_stream(intent: IntentModel) -> Iterator[BaseModel]:
+    """
+    Streaming variant of execute_command: returns an iterator of models that fetches
+    further pages only as it is consumed.
+    The first page is fetched eagerly, so configuration and API errors for the
+    initial request are raised here; errors on later pages surface during iteration.
+    Intents without a streaming handler fall back to COMMAND_MAP.
+    """
+    handler = STREAM_COMMAND_MAP.get(intent.intent)
+    if handler is None:
+        return iter(execute_command(intent))
+    stream = _wrap_stream_errors(intent, handler(intent.entities))
+    with tracing.span("command", intent=intent.intent, streaming=True):
+        first = next(stream, None)
+    if first is None:
+        return iter(())
+    return itertools.chain([first], stream)
+
+# Entity types passed to the API server as list selectors; repeated entities are AND-ed
+SELECTOR_PARAMS = ["label_selector", "field_selector"]
+
+def _extract_parameters(entities: List[EntityModel], required_params: List[str], optional_params: Optional[List[str]] = None) -> dict:
     """
     Extracts required parameters from entities. Raises ValueError if required param missing.
     Defaults 'namespace' to 'default' if not provided.
+    Optional parameters are included only when present; repeated selector entities
+    (label_selector, field_selector) are joined with ',' as the API server expects.
     """
     param_map = {e.type: e.value for e in entities}
     params = {}
@@ -64,69 +257,642 @@ def _extract_parameters(entities: List[EntityModel], required_params: List[str])
             params[key] = param_map[key]
         else:
             raise ValueError(f"Missing required parameter: {key}")
-    return params 
+    for key in optional_params or []:
+        if key in SELECTOR_PARAMS:
+            values = [e.value.strip() for e in entities if e.type == key and e.value.strip()]
+            if values:
+                params[key] = ",".join(values)
+        elif key in param_map:
+            params[key] = param_map[key]
+    return params
+
+# Namespace entity values that mean "every namespace"
+ALL_NAMESPACES_VALUES = ("all", "*", "all-namespaces")
 
-def _handle_get_pod_status(entities: List[EntityModel]) -> list:
+def _extract_namespaces(entities: List[EntityModel]) -> Optional[List[str]]:
     """
-    Handler for 'get_pod_status' intent. Returns list of PodStatusModel.
-    Handles API errors and input validation.
+    Returns the namespaces a command should cover, in the order they were mentioned.
+    Returns None for all namespaces (an 'all_namespaces' entity or a namespace value of 'all'/'*').
+    Defaults to ['default'] when no namespace is given.
+    """
+    namespaces = []
+    for e in entities:
+        if e.type == "all_namespaces" and e.value.strip().lower() not in ("false", "no", "0"):
+            return None
+        if e.type == "namespace":
+            value = e.value.strip()
+            if value.lower() in ALL_NAMESPACES_VALUES:
+                return None
+            if value and value not in namespaces:
+                namespaces.append(value)
+    return namespaces or ["default"]
+
+def _iter_pods(namespace: Optional[str], label_selector: Optional[str] = None, field_selector: Optional[str] = None,
+               meta: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yields a pod record (see _pod_record_from_item) for each pod in a namespace,
+    or in all namespaces (list_pod_for_all_namespaces) when namespace is None.
+    Label and field selectors are evaluated by the API server, so only matching pods are transferred.
+    Reads from the namespace's watch-backed informer when informer mode is enabled
+    and no selectors are given, otherwise pages through list_namespaced_pod with limit/continue so that only
+    one page of pods is held in memory at a time.
+    With raw_decode enabled, pages are decoded straight from the response JSON
+    instead of being deserialized into kubernetes client models.
+    If meta is given, meta['resource_version'] is set to the list's resourceVersion.
+    """
+    settings = get_settings()
+    api = get_kubernetes_client().get_core_v1_api()
+    meta = {} if meta is None else meta
+    if settings.informer_enabled and not (label_selector or field_selector):
+        informer = get_pod_informer(api, namespace, watch_timeout=settings.informer_watch_timeout)
+        meta["resource_version"] = informer.resource_version
+        for item in informer.list_pods():
+            yield _pod_record_from_item(item)
+        return
+    if namespace is None:
+        list_func, kwargs_base = api.list_pod_for_all_namespaces, {}
+    else:
+        list_func, kwargs_base = api.list_namespaced_pod, {"namespace": namespace}
+    continue_token = None
+    page_number = 0
+    while True:
+        kwargs = {**kwargs_base, "limit": settings.page_size}
+        if label_selector:
+            kwargs["label_selector"] = label_selector
+        if field_selector:
+            kwargs["field_selector"] = field_selector
+        if continue_token:
+            kwargs["_continue"] = continue_token
+        page_number += 1
+        # The span closes before the page's records are yielded, so it never leaks into the consumer
+        with tracing.span("k8s.list", namespace=namespace or "*", page=page_number) as list_span:
+            _throttle()
+            if settings.raw_decode:
+                page = _list_raw(list_func, **kwargs)
+                records = [_pod_record_from_raw(pod) for pod in page.get("items") or []]
+                continue_token = (page.get("metadata") or {}).get("continue")
+                resource_version = (page.get("metadata") or {}).get("resourceVersion")
+            else:
+                # The kubernetes client deserializes into models inside the list call
+                pod_list = list_func(**kwargs)
+                records = [_pod_record_from_item(item) for item in pod_list.items]
+                continue_token = pod_list.metadata._continue
+                resource_version = pod_list.metadata.resource_version
+            # Every page of a paginated list is served from the first page's resourceVersion
+            meta.setdefault("resource_version", resource_version)
+            list_span.add("k8s.objects", len(records))
+        yield from records
+        if not continue_token:
+            break
+
+def _list_raw(list_func, **kwargs) -> Dict[str, Any]:
+    """
+    Calls a kubernetes client list function without model deserialization
+    and returns the decoded JSON body.
     """
-    params = _extract_parameters(entities, ["namespace"])
-    k8s = KubernetesClient()
-    api = k8s.get_core_v1_api()
+    with tracing.span("k8s.request"):
+        response = list_func(_preload_content=False, **kwargs)
     try:
-        pod_list = api.list_namespaced_pod(namespace=params["namespace"])
-    except ApiException as e:
-        # print(f"Kubernetes API error: {e}")
-        raise
-    result = []
-    for item in pod_list.items:
-        restarts = 0
-        containers = []
-        if hasattr(item.status, "container_statuses") and item.status.container_statuses:
-            restarts = sum(cs.restart_count for cs in item.status.container_statuses if hasattr(cs, "restart_count"))
-            # Extract container information
-            for container in item.spec.containers:
-                containers.append({
-                    "name": container.name,
-                    "image": container.image
-                })
-        result.append(PodStatusModel(
-            name=item.metadata.name,
-            namespace=item.metadata.namespace,
-            status=item.status.phase,
-            restarts=restarts,
-            containers=containers
-        ))
-    return result
-
-def _handle_get_pod_images(entities: List[EntityModel]) -> list:
-    """
-    Handler for 'get_pod_images' intent. Returns list of PodImageModel.
-    """
-    params = _extract_parameters(entities, ["namespace"])
-    k8s = KubernetesClient()
-    api = k8s.get_core_v1_api()
+        tracing.add_counter("k8s.response_bytes", len(response.data))
+        with tracing.span("k8s.decode"):
+            return _json_loads(response.data)
+    finally:
+        response.release_conn()
+
+def _pod_record_from_item(item) -> Dict[str, Any]:
+    """
+    Extracts the fields the pod models need from a V1Pod.
+    'restarts' is None when the pod reports no container statuses yet.
+    """
+    restarts = None
+    if hasattr(item.status, "container_statuses") and item.status.container_statuses:
+        restarts = sum(cs.restart_count for cs in item.status.container_statuses if hasattr(cs, "restart_count"))
+    containers = []
+    if hasattr(item.spec, "containers") and item.spec.containers:
+        for container in item.spec.containers:
+            containers.append({
+                "name": container.name,
+                "image": container.image
+            })
+    return {
+        "name": item.metadata.name,
+        "namespace": item.metadata.namespace,
+        "phase": item.status.phase,
+        "restarts": restarts,
+        "containers": containers,
+    }
+
+def _pod_record_from_raw(pod: Dict[str, Any]) -> Dict[str, Any]:
+    """Extracts the same record as _pod_record_from_item from a decoded pod JSON object."""
+    metadata = pod.get("metadata") or {}
+    spec = pod.get("spec") or {}
+    status = pod.get("status") or {}
+    statuses = status.get("containerStatuses")
+    return {
+        "name": metadata.get("name"),
+        "namespace": metadata.get("namespace"),
+        "phase": status.get("phase"),
+        "restarts": sum(cs.get("restartCount", 0) for cs in statuses) if statuses else None,
+        "containers": [
+            {"name": c.get("name"), "image": c.get("image")}
+            for c in spec.get("containers") or []
+        ],
+    }
+
+def _pod_status_row(record: Dict[str, Any]) -> PodRow:
+    """Builds a PodStatusModel-shaped row from a pod record."""
+    # Containers are only reported once the pod has container statuses
+    has_statuses = record["restarts"] is not None
+    return PodRow(record["name"], record["namespace"], record["phase"], record["restarts"] or 0,
+                  record["containers"] if has_statuses else [])
+
+def _pod_image_row(record: Dict[str, Any]) -> PodRow:
+    """Builds a PodImageModel-shaped row from a pod record."""
+    return PodRow(record["name"], record["namespace"], containers=record["containers"])
+
+# Row builder per pod result model
+POD_ROW_BUILDERS: Dict[Type[BaseModel], Callable[[Dict[str, Any]], PodRow]] = {
+    PodStatusModel: _pod_status_row,
+    PodImageModel: _pod_image_row,
+}
+
+def _pod_status_from_record(record: Dict[str, Any]) -> PodStatusModel:
+    """Builds a PodStatusModel from a pod record."""
+    return row_model(PodStatusModel, _pod_status_row(record))
+
+def _pod_image_from_record(record: Dict[str, Any]) -> PodImageModel:
+    """Builds a PodImageModel from a pod record."""
+    return row_model(PodImageModel, _pod_image_row(record))
+
+def _describe_api_error(error: ApiException) -> str:
+    """Returns a one-line description of an ApiException (e.g., '403 Forbidden')."""
+    if error.status:
+        return f"{error.status} {error.reason}"
+    return str(error).strip().splitlines()[0]
+
+def _iter_pods_fanout(namespaces: List[str], **selectors) -> Iterator:
+    """
+    Lists several namespaces concurrently on a bounded thread pool.
+    Yields pod records grouped by namespace in the requested order; a namespace whose
+    list call fails yields a NamespaceErrorModel instead of aborting the whole command.
+    """
+    def fetch(namespace):
+        try:
+            return list(_pod_records(namespace, **selectors))
+        except ApiException as e:
+            return NamespaceErrorModel(namespace=namespace, error=_describe_api_error(e))
+
+    workers = max(1, min(get_settings().fanout_workers, len(namespaces)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kubeai-fanout") as pool:
+        # Each worker gets a copy of the caller's context, so its spans nest under the current one
+        futures = [pool.submit(contextvars.copy_context().run, fetch, namespace) for namespace in namespaces]
+        for future in futures:
+            result = future.result()
+            if isinstance(result, NamespaceErrorModel):
+                yield result
+            else:
+                yield from result
+
+def _snapshot_cache() -> Optional[SnapshotCache]:
+    """Returns the pod snapshot cache, or None when result caching is disabled."""
+    settings = get_settings()
+    if settings.result_cache_ttl <= 0 or settings.result_cache_size <= 0:
+        return None
+    return get_snapshot_cache(settings.result_cache_ttl, settings.result_cache_size)
+
+class PodRecords(list):
+    """
+    Pod records of one list request, plus the list's resourceVersion.
+    Attributes:
+        resource_version (Optional[str]): resourceVersion of the list, if known.
+    """
+    resource_version: Optional[str] = None
+
+class _AbandonedFetch(Exception):
+    """Handed to coalesced callers when the leading list was not read to the end or was too large to hold."""
+
+def _list_pod_records(namespace: Optional[str], max_records: Optional[int] = None, **selectors) -> PodRecords:
+    """
+    Reads a whole pod list into PodRecords, sharing an identical list already in flight.
+    With max_records, a longer list is dropped as soon as it passes the cap, raising
+    _AbandonedFetch, so at most max_records pods are held.
+    """
+    def fetch() -> PodRecords:
+        meta: Dict[str, Any] = {}
+        records = PodRecords()
+        for record in _iter_pods(namespace, meta=meta, **selectors):
+            records.append(record)
+            if max_records is not None and len(records) > max_records:
+                raise _AbandonedFetch()
+        records.resource_version = meta.get("resource_version")
+        return records
+    if not get_settings().api_coalesce:
+        return fetch()
     try:
-        pod_list = api.list_namespaced_pod(namespace=params["namespace"])
-    except ApiException as e:
+        return _inflight.do(_pod_query_key(namespace, selectors), fetch)
+    except _AbandonedFetch:
+        if max_records is not None:
+            raise
+        # Joined a streamed list that was dropped or too large to share
+        return fetch()
+
+def _pod_records(namespace: Optional[str], label_selector: Optional[str] = None,
+                 field_selector: Optional[str] = None, meta: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Shared fetch layer for pod-derived intents: yields the pod records of one list request.
+    Records come from a fresh snapshot in the result cache (keyed by namespace plus
+    selectors), a matching speculative fetch, or _iter_pods; a list that is read to the
+    end is stored as a snapshot, so a follow-up intent on the same pods reuses it.
+    Informer-served queries bypass the cache, since the informer is already local.
+    Concurrent identical lists are coalesced: while one caller pages through the list,
+    the others wait for its records instead of sending the same requests. Past
+    result_cache_max_records the waiting callers are released to list on their own.
+    If meta is given, meta['resource_version'] is set to the records' resourceVersion.
+    """
+    meta = {} if meta is None else meta
+    selectors = {k: v for k, v in (("label_selector", label_selector), ("field_selector", field_selector)) if v}
+    if get_settings().informer_enabled and not selectors:
+        yield from _iter_pods(namespace, meta=meta)
+        return
+    key = _pod_query_key(namespace, selectors)
+    cache = _snapshot_cache()
+    records = cache.get(key) if cache is not None else None
+    if records is not None:
+        tracing.add_counter("k8s.snapshot_hits")
+    else:
+        records = _prefetch_slot.take(key)
+        if records is not None:
+            tracing.add_counter("k8s.prefetch_hits")
+            if cache is not None and len(records) <= get_settings().result_cache_max_records:
+                cache.put(key, records)
+    if records is not None:
+        meta["resource_version"] = getattr(records, "resource_version", None)
+        yield from records
+        return
+    started = time.monotonic()
+    coalesce = get_settings().api_coalesce
+    if not coalesce and cache is None:
+        yield from _iter_pods(namespace, meta=meta, **selectors)
+        return
+    if coalesce:
+        flight, leader = _inflight.join(key)
+        if not leader:
+            tracing.add_counter("k8s.coalesced")
+            try:
+                records = flight.result()
+            except _AbandonedFetch:
+                # The leader stopped early; list independently
+                yield from _iter_pods(namespace, meta=meta, **selectors)
+                return
+            meta["resource_version"] = records.resource_version
+            yield from records
+            return
+    limit = get_settings().result_cache_max_records
+    collected: Optional[PodRecords] = PodRecords()
+    try:
+        for record in _iter_pods(namespace, meta=meta, **selectors):
+            if collected is not None:
+                collected.append(record)
+                if len(collected) > limit:
+                    # Too large to hold: waiting callers list on their own, streaming like this one
+                    collected = None
+                    if coalesce:
+                        _inflight.finish(key, error=_AbandonedFetch())
+                        # Later callers with the same key belong to a new flight
+                        coalesce = False
+            yield record
+    except GeneratorExit:
+        if coalesce:
+            _inflight.finish(key, error=_AbandonedFetch())
+        raise
+    except BaseException as e:
+        if coalesce:
+            _inflight.finish(key, error=e)
         raise
-    result = []
-    for item in pod_list.items:
-        containers = []
-        if hasattr(item.spec, "containers") and item.spec.containers:
-            for container in item.spec.containers:
-                containers.append({
-                    "name": container.name,
-                    "image": container.image
-                })
-        result.append(PodImageModel(
-            name=item.metadata.name,
-            namespace=item.metadata.namespace,
-            containers=containers
-        ))
-    return result
+    if collected is None:
+        return
+    collected.resource_version = meta.get("resource_version")
+    if coalesce:
+        _inflight.finish(key, collected)
+    if cache is not None:
+        cache.put(key, collected, fetched_at=started)
+
+# One-shot slot for the speculative pod list started before intent recognition
+_prefetch_slot = PrefetchSlot()
+_prefetch_lock = threading.Lock()
+_prefetch_pool: Optional[ThreadPoolExecutor] = None
+
+def _pod_query_key(namespace: Optional[str], selectors: Dict[str, str]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    return namespace, selectors.get("label_selector"), selectors.get("field_selector")
+
+def prefetch_pods(query: str) -> bool:
+    """
+    Speculatively starts the pod list a query is likely to need, while its intent is still
+    being recognized. Namespace and selectors are guessed from the raw text with the local
+    classifier's patterns; the list is handed to the pod handler only if the recognized
+    entities resolve to the same namespace and selectors, and discarded otherwise.
+    Returns True when a fetch was started. Multi-namespace queries, informer-served
+    queries and queries that do not look like pod queries are not prefetched.
+    """
+    global _prefetch_pool
+    settings = get_settings()
+    if not settings.prefetch_enabled:
+        return False
+    entities = guess_entities(query)
+    if entities is None:
+        return False
+    selectors = _extract_parameters(entities, [], SELECTOR_PARAMS)
+    namespaces = _extract_namespaces(entities)
+    if namespaces is not None and len(namespaces) != 1:
+        return False
+    if settings.informer_enabled and not selectors:
+        return False
+    namespace = None if namespaces is None else namespaces[0]
+    cache = _snapshot_cache()
+    if cache is not None and cache.fresh(_pod_query_key(namespace, selectors)):
+        return False
+    with _prefetch_lock:
+        if _prefetch_pool is None:
+            _prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kubeai-prefetch")
+        # A list longer than the cache cap is dropped, and the pod handler streams it instead
+        future = _prefetch_pool.submit(_list_pod_records, namespace, settings.result_cache_max_records, **selectors)
+    _prefetch_slot.put(_pod_query_key(namespace, selectors), future)
+    return True
+
+def reset_prefetch() -> None:
+    """Discards any speculative fetch and stops the prefetch thread pool."""
+    global _prefetch_pool
+    _prefetch_slot.clear()
+    with _prefetch_lock:
+        pool, _prefetch_pool = _prefetch_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _pod_record_stream(entities: List[EntityModel], meta: Optional[Dict[str, Any]] = None) -> Iterator:
+    """
+    Resolves the namespaces and selectors of a pod command and returns its pod records.
+    A single namespace is paged through directly, all namespaces use list_pod_for_all_namespaces,
+    and several namespaces are fanned out concurrently (errors reported per namespace).
+    Records come from the shared fetch layer (_pod_records), so every pod-derived
+    intent projects its results from the same cached snapshot.
+    meta receives the resourceVersion of single list requests (see _pod_records).
+    """
+    selectors = _extract_parameters(entities, [], SELECTOR_PARAMS)
+    namespaces = _extract_namespaces(entities)
+    if namespaces is not None and len(namespaces) > 1:
+        return _iter_pods_fanout(namespaces, **selectors)
+    return _pod_records(None if namespaces is None else namespaces[0], meta=meta, **selectors)
+
+def _stream_pods(entities: List[EntityModel], kind: Type[BaseModel]) -> Iterator[BaseModel]:
+    """Yields one kind model per pod as pages arrive (and NamespaceErrorModel entries in place)."""
+    to_row = POD_ROW_BUILDERS[kind]
+    for record in _pod_record_stream(entities):
+        if isinstance(record, NamespaceErrorModel):
+            yield record
+            continue
+        started = time.perf_counter()
+        model = row_model(kind, to_row(record))
+        # Counted on whichever span is current while the stream is consumed
+        tracing.add_counter("models.build_ms", (time.perf_counter() - started) * 1000)
+        tracing.add_counter("models.count")
+        yield model
+
+def _with_errors(table: PodTable, errors: List[Tuple[int, NamespaceErrorModel]]) -> List[BaseModel]:
+    """Returns the models of table with the NamespaceErrorModel entries put back at their positions."""
+    items: List[BaseModel] = []
+    start = 0
+    for position, error in errors:
+        items.extend(table[start:position])
+        items.append(error)
+        start = position
+    items.extend(table[start:])
+    return items
+
+def _collect_pod_kinds(entities: List[EntityModel], kinds: List[Type[BaseModel]]) -> List[Sequence[BaseModel]]:
+    """
+    Collects one pod list into a PodTable per kind, so several pod intents on the same
+    pods cost one list request. No model is built unless a consumer asks for it.
+    When namespaces failed, each result is a list of models with the NamespaceErrorModel entries in place.
+    """
+    tables = [(PodTable(kind), POD_ROW_BUILDERS[kind]) for kind in kinds]
+    meta: Dict[str, Any] = {}
+    errors: List[Tuple[int, NamespaceErrorModel]] = []
+    for record in _pod_record_stream(entities, meta):
+        if isinstance(record, NamespaceErrorModel):
+            errors.append((len(tables[0][0]), record))
+            continue
+        started = time.perf_counter()
+        for table, to_row in tables:
+            table.append(to_row(record))
+        tracing.add_counter("models.build_ms", (time.perf_counter() - started) * 1000)
+        tracing.add_counter("models.count", len(tables))
+    if errors:
+        return [_with_errors(table, errors) for table, _ in tables]
+    for table, _ in tables:
+        table.resource_version = meta.get("resource_version")
+    return [table for table, _ in tables]
+
+def _collect_pods(entities: List[EntityModel], kind: Type[BaseModel]) -> Sequence[BaseModel]:
+    """Collects a pod command into a PodTable (see _collect_pod_kinds)."""
+    return _collect_pod_kinds(entities, [kind])[0]
+
+def _stream_pod_status(entities: List[EntityModel]) -> Iterator[PodStatusModel]:
+    """
+    Streaming handler for 'get_pod_status' intent. Yields PodStatusModel page by page.
+    """
+    return _stream_pods(entities, PodStatusModel)
+
+def _stream_pod_images(entities: List[EntityModel]) -> Iterator[PodImageModel]:
+    """
+    Streaming handler for 'get_pod_images' intent. Yields PodImageModel page by page.
+    """
+    return _stream_pods(entities, PodImageModel)
+
+def _handle_get_pod_status(entities: List[EntityModel]) -> Sequence[PodStatusModel]:
+    """
+    Handler for 'get_pod_status' intent. Returns a PodTable of PodStatusModel.
+    Handles API errors and input validation.
+    """
+    return _collect_pods(entities, PodStatusModel)
+
+def _handle_get_pod_images(entities: List[EntityModel]) -> Sequence[PodImageModel]:
+    """
+    Handler for 'get_pod_images' intent. Returns a PodTable of PodImageModel.
+    """
+    return _collect_pods(entities, PodImageModel)
 
 # Register handler in command map
 COMMAND_MAP["get_pod_status"] = _handle_get_pod_status
-COMMAND_MAP["get_pod_images"] = _handle_get_pod_images 
\ No newline at end of file
+COMMAND_MAP["get_pod_images"] = _handle_get_pod_images
+STREAM_COMMAND_MAP["get_pod_status"] = _stream_pod_status
+STREAM_COMMAND_MAP["get_pod_images"] = _stream_pod_images 
+
+# Built-in pod handlers and their result kinds; intents mapped to them read the same pod list
+_POD_HANDLER_KINDS = {_handle_get_pod_status: PodStatusModel, _handle_get_pod_images: PodImageModel}
+
+def pod_query_key(intent: IntentModel) -> Optional[Tuple[Optional[Tuple[str, ...]], Optional[str], Optional[str]]]:
+    """
+    Returns the pod list an intent reads, as (namespaces or None for all, label selector,
+    field selector), or None when the intent is not served by a built-in pod handler.
+    Intents with the same key can be executed together with execute_pod_intents.
+    """
+    if COMMAND_MAP.get(intent.intent) not in _POD_HANDLER_KINDS:
+        return None
+    selectors = _extract_parameters(intent.entities, [], SELECTOR_PARAMS)
+    namespaces = _extract_namespaces(intent.entities)
+    return (None if namespaces is None else tuple(namespaces), selectors.get("label_selector"),
+            selectors.get("field_selector"))
+
+def execute_pod_intents(intents: List[IntentModel]) -> List[Sequence[BaseModel]]:
+    """
+    Executes pod intents that share a pod_query_key with one list request (per namespace)
+    and returns their results in order.
+    Raises CommandExecutionError on API and input errors.
+    """
+    names = ", ".join(intent.intent for intent in intents)
+    kinds = [_POD_HANDLER_KINDS[COMMAND_MAP[intent.intent]] for intent in intents]
+    try:
+        with tracing.span("command", intent=names, merged=len(intents)):
+            return _collect_pod_kinds(intents[0].entities, kinds)
+    except (ApiException, ValueError) as e:
+        raise CommandExecutionError(f"Failed to execute command for intents '{names}': {e}")
+
+# Snapshot key used for all namespaces
+ALL_NAMESPACES_KEY = "*"
+
+def _pod_list_call(api, namespace: Optional[str]) -> Tuple[Callable, Dict[str, Any]]:
+    """Returns the list function and its scoping kwargs for a namespace (None for all namespaces)."""
+    if namespace is None:
+        return api.list_pod_for_all_namespaces, {}
+    return api.list_namespaced_pod, {"namespace": namespace}
+
+def _snapshot(namespace: Optional[str], resource_version: Optional[str],
+              pods: Dict[str, Tuple[Optional[str], int]]) -> PodSnapshotModel:
+    # Built without validation: the pod map can hold tens of thousands of entries
+    return PodSnapshotModel.model_construct(
+        namespace=namespace or ALL_NAMESPACES_KEY, resource_version=resource_version or "", pods=pods)
+
+def _snapshot_entry(record: Dict[str, Any]) -> Tuple[str, Tuple[Optional[str], int]]:
+    return f"{record['namespace']}/{record['name']}", (record["phase"], record["restarts"] or 0)
+
+def snapshot_key(intent: IntentModel) -> Optional[str]:
+    """
+    Returns the session snapshot key of a pod status intent over one namespace (or '*' for
+    all namespaces) without selectors, or None if the intent cannot be diffed.
+    """
+    if intent.intent != "get_pod_status" or _extract_parameters(intent.entities, [], SELECTOR_PARAMS):
+        return None
+    namespaces = _extract_namespaces(intent.entities)
+    if namespaces is None:
+        return ALL_NAMESPACES_KEY
+    return namespaces[0] if len(namespaces) == 1 else None
+
+def take_pod_snapshot(namespace: Optional[str]) -> PodSnapshotModel:
+    """Lists the pods of a namespace (None for all namespaces) and returns their snapshot."""
+    records = _list_pod_records(namespace)
+    return _snapshot(namespace, records.resource_version, dict(_snapshot_entry(r) for r in records))
+
+def snapshot_from_result(namespace: Optional[str], data: PodTable) -> Optional[PodSnapshotModel]:
+    """Returns the snapshot of a pod status result, or None if its resourceVersion is unknown."""
+    if not data.resource_version:
+        return None
+    pods = {f"{row.namespace}/{row.name}": (row.status, row.restarts) for row in data.rows}
+    return _snapshot(namespace, data.resource_version, pods)
+
+# Markers passed from the diff watch's reader thread
+_WATCH_OPENED = object()
+_WATCH_ENDED = object()
+
+def _replay_watch(list_func: Callable, kwargs: Dict[str, Any],
+                  resource_version: str) -> Iterator[Tuple[Dict[str, Any], Optional[str]]]:
+    """
+    Yields (event, resourceVersion after the event) from a watch started at resource_version,
+    until no event arrived for diff_watch_idle seconds or diff_watch_timeout seconds passed.
+    The stream is read on a worker thread: waiting for the response headers is bounded by
+    the timeout only, and the idle gap is measured from the response or the last event.
+    Raises ApiException or urllib3 errors from the watch, and CommandExecutionError when the
+    API server did not answer within the timeout.
+    """
+    settings = get_settings()
+    timeout, idle = settings.diff_watch_timeout, settings.diff_watch_idle
+    items: queue.Queue = queue.Queue()
+    pod_watch = watch.Watch()
+
+    @functools.wraps(list_func)
+    def open_watch(*args, **call_kwargs):
+        response = list_func(*args, **call_kwargs)
+        items.put(_WATCH_OPENED)
+        return response
+
+    def read() -> None:
+        try:
+            for event in pod_watch.stream(open_watch, **kwargs, resource_version=resource_version,
+                                          timeout_seconds=timeout, allow_watch_bookmarks=True,
+                                          _request_timeout=(timeout, timeout)):
+                items.put((event, pod_watch.resource_version))
+            items.put(_WATCH_ENDED)
+        except BaseException as e:
+            items.put(e)
+
+    threading.Thread(target=read, name="kubeai-diff-watch", daemon=True).start()
+    deadline = time.monotonic() + timeout
+    last_activity = None
+    try:
+        while True:
+            until = deadline if last_activity is None else min(deadline, last_activity + idle)
+            try:
+                item = items.get(timeout=max(0.0, until - time.monotonic()))
+            except queue.Empty:
+                if last_activity is None:
+                    raise CommandExecutionError(f"The API server did not answer the watch within {timeout}s")
+                return
+            if item is _WATCH_ENDED:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            last_activity = time.monotonic()
+            if item is not _WATCH_OPENED:
+                yield item
+    finally:
+        # Unblocks the reader thread, which may be waiting for the next event
+        pod_watch.stop()
+
+def refresh_pod_snapshot(snapshot: PodSnapshotModel) -> PodSnapshotModel:
+    """
+    Brings a pod snapshot up to date by transferring only the changes since its resourceVersion.
+    A watch started at the snapshot's resourceVersion replays the pod events since then. It
+    stops at a BOOKMARK, once no event arrived for diff_watch_idle seconds (the replay is
+    done), or after diff_watch_timeout seconds (see _replay_watch). The new snapshot carries
+    the last resourceVersion the watch observed, so a replay cut short resumes there next
+    time; the snapshot itself is returned when nothing happened. If the API server no longer
+    has that resourceVersion (410 Gone), the namespace is listed again instead.
+    Raises ApiException, or CommandExecutionError on transport errors and timeouts.
+    """
+    namespace = None if snapshot.namespace == ALL_NAMESPACES_KEY else snapshot.namespace
+    api = get_kubernetes_client().get_core_v1_api()
+    list_func, kwargs = _pod_list_call(api, namespace)
+    pods = dict(snapshot.pods)
+    resource_version = None
+    try:
+        with tracing.span("k8s.watch", namespace=snapshot.namespace) as watch_span:
+            _throttle()
+            for event, resource_version in _replay_watch(list_func, kwargs, snapshot.resource_version):
+                if event["type"] == "BOOKMARK":
+                    break
+                if event["type"] in ("ADDED", "MODIFIED", "DELETED"):
+                    key, state = _snapshot_entry(_pod_record_from_item(event["object"]))
+                    if event["type"] == "DELETED":
+                        pods.pop(key, None)
+                    else:
+                        pods[key] = state
+                    watch_span.add("k8s.events")
+    except ApiException as e:
+        if e.status != 410:
+            raise
+        # The stored resourceVersion was compacted away: list again and diff against that
+        return take_pod_snapshot(namespace)
+    except HTTPError as e:
+        raise CommandExecutionError(f"Failed to watch pods in '{snapshot.namespace}': {e}")
+    if resource_version is None:
+        return snapshot
+    return _snapshot(namespace, resource_version, pods)
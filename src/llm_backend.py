@@ -0,0 +1,237 @@
+import asyncio
+import contextlib
+import contextvars
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+from google.generativeai import GenerativeModel
+from src import tracing
+from src.settings import get_settings
+
+T = TypeVar("T")
+
+# Tasks routed to a model tier: intents need a fast, small model; summaries a larger one
+TASK_INTENT = "intent"
+TASK_SUMMARY = "summary"
+
+# HTTP status codes (api_core exceptions carry them as .code) worth retrying
+RETRYABLE_CODES = (408, 429, 500, 502, 503, 504)
+
+# Upper bound of a single backoff delay, in seconds
+MAX_RETRY_DELAY = 8.0
+
+class LLMBackend(ABC):
+    """
+    Interface of an LLM backend. Calls mirror GenerativeModel.generate_content: they return
+    a response with .text (and optionally .usage_metadata), or an iterable of chunks with .text
+    when stream is True. Register implementations with register_backend; a backend missing
+    either generate method cannot be instantiated.
+    """
+    @abstractmethod
+    def generate(self, model: str, prompt: str, stream: bool = False, timeout: Optional[float] = None) -> Any:
+        """Calls model with prompt and blocks until the response (or the stream) is available."""
+
+    @abstractmethod
+    async def generate_async(self, model: str, prompt: str, stream: bool = False,
+                             timeout: Optional[float] = None) -> Any:
+        """Async variant of generate."""
+
+    def close(self) -> None:
+        """Releases clients held by the backend."""
+
+class GeminiBackend(LLMBackend):
+    """
+    Gemini through google-generativeai. One GenerativeModel is created per model name and
+    reused for every call; timeout is passed to the API as the request timeout.
+    """
+    def __init__(self):
+        self._models: Dict[str, GenerativeModel] = {}
+        self._lock = threading.Lock()
+
+    def _model(self, name: str) -> GenerativeModel:
+        with self._lock:
+            model = self._models.get(name)
+            if model is None:
+                model = self._models[name] = GenerativeModel(name)
+            return model
+
+    @staticmethod
+    def _options(stream: bool, timeout: Optional[float]) -> Dict[str, Any]:
+        options: Dict[str, Any] = {"stream": True} if stream else {}
+        if timeout:
+            options["request_options"] = {"timeout": timeout}
+        return options
+
+    def generate(self, model: str, prompt: str, stream: bool = False, timeout: Optional[float] = None) -> Any:
+        return self._model(model).generate_content(prompt, **self._options(stream, timeout))
+
+    async def generate_async(self, model: str, prompt: str, stream: bool = False,
+                             timeout: Optional[float] = None) -> Any:
+        return await self._model(model).generate_content_async(prompt, **self._options(stream, timeout))
+
+    def close(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+# Backend name (llm_backend setting) -> factory
+BACKENDS: Dict[str, Callable[[], LLMBackend]] = {"gemini": GeminiBackend}
+
+_backend_lock = threading.Lock()
+_backend: Optional[LLMBackend] = None
+_backend_name: Optional[str] = None
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+
+def register_backend(name: str, factory: Callable[[], LLMBackend]) -> None:
+    """Makes a backend selectable with KUBEAI_LLM_BACKEND=<name>."""
+    BACKENDS[name] = factory
+
+def get_backend() -> LLMBackend:
+    """Returns the process-wide backend named by the llm_backend setting, creating it on first use."""
+    global _backend, _backend_name
+    name = get_settings().llm_backend
+    with _backend_lock:
+        if _backend is None or _backend_name != name:
+            factory = BACKENDS.get(name)
+            if factory is None:
+                raise ValueError(f"Unknown LLM backend: {name} (expected one of {', '.join(BACKENDS)})")
+            if _backend is not None:
+                _backend.close()
+            _backend, _backend_name = factory(), name
+        return _backend
+
+@contextlib.contextmanager
+def use_backend(backend: LLMBackend) -> Iterator[LLMBackend]:
+    """Installs backend for the duration of the block (a local stand-in for tests and benchmarks)."""
+    global _backend, _backend_name
+    with _backend_lock:
+        previous = _backend, _backend_name
+        _backend, _backend_name = backend, get_settings().llm_backend
+    try:
+        yield backend
+    finally:
+        with _backend_lock:
+            _backend, _backend_name = previous
+
+def reset_backend() -> None:
+    """Closes and forgets the process-wide backend and the hedging threads."""
+    global _backend, _backend_name, _hedge_pool
+    with _backend_lock:
+        backend, _backend, _backend_name = _backend, None, None
+        pool, _hedge_pool = _hedge_pool, None
+    if backend is not None:
+        backend.close()
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def model_for(task: str) -> str:
+    """Model name for a task: llm_intent_model for intents, llm_summary_model otherwise."""
+    settings = get_settings()
+    return settings.llm_intent_model if task == TASK_INTENT else settings.llm_summary_model
+
+def is_retryable(error: BaseException) -> bool:
+    """True for timeouts, connection errors and API errors with a retryable status code."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return getattr(error, "code", None) in RETRYABLE_CODES
+
+def retry_delay(attempt: int) -> float:
+    """Backoff before retry attempt+1: full jitter over an exponentially growing window."""
+    window = min(MAX_RETRY_DELAY, get_settings().llm_retry_base_delay * (2 ** attempt))
+    return random.uniform(0, window)
+
+def _call_with_retries(call: Callable[[], T]) -> T:
+    retries = max(0, get_settings().llm_retries)
+    for attempt in range(retries + 1):
+        try:
+            return call()
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            tracing.add_counter("llm.retries")
+            time.sleep(retry_delay(attempt))
+
+async def _call_with_retries_async(call: Callable[[], Awaitable[T]]) -> T:
+    retries = max(0, get_settings().llm_retries)
+    for attempt in range(retries + 1):
+        try:
+            return await call()
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            tracing.add_counter("llm.retries")
+            await asyncio.sleep(retry_delay(attempt))
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _backend_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="kubeai-llm-hedge")
+        return _hedge_pool
+
+def _hedged(call: Callable[[], T], delay: float) -> T:
+    """
+    Runs call; if it has not finished after delay seconds, starts a second identical call
+    and returns whichever succeeds first. The slower call's result is discarded.
+    """
+    pool = _get_hedge_pool()
+    first = pool.submit(contextvars.copy_context().run, call)
+    try:
+        return first.result(timeout=delay)
+    except FutureTimeoutError:
+        pass
+    tracing.add_counter("llm.hedged")
+    second = pool.submit(contextvars.copy_context().run, call)
+    done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+    winner = next(iter(done))
+    if winner.exception() is None:
+        return winner.result()
+    return (second if winner is first else first).result()
+
+async def _hedged_async(call: Callable[[], Awaitable[T]], delay: float) -> T:
+    """Async variant of _hedged; the slower call is cancelled."""
+    tasks = [asyncio.ensure_future(call())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            tracing.add_counter("llm.hedged")
+            tasks.append(asyncio.ensure_future(call()))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+        return tasks[0].result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def generate(task: str, prompt: str, stream: bool = False) -> Any:
+    """
+    Calls the backend with the task's model, the llm_timeout request timeout and up to
+    llm_retries jittered retries on retryable errors. Non-streamed calls are hedged after
+    llm_hedge_delay seconds when that setting is positive. A streamed call is only retried
+    until the stream is opened.
+    """
+    settings = get_settings()
+    backend, model = get_backend(), model_for(task)
+
+    def call():
+        return backend.generate(model, prompt, stream=stream, timeout=settings.llm_timeout)
+    if not stream and settings.llm_hedge_delay > 0:
+        return _call_with_retries(lambda: _hedged(call, settings.llm_hedge_delay))
+    return _call_with_retries(call)
+
+async def generate_async(task: str, prompt: str, stream: bool = False) -> Any:
+    """Async variant of generate."""
+    settings = get_settings()
+    backend, model = get_backend(), model_for(task)
+
+    def call():
+        return backend.generate_async(model, prompt, stream=stream, timeout=settings.llm_timeout)
+    if not stream and settings.llm_hedge_delay > 0:
+        return await _call_with_retries_async(lambda: _hedged_async(call, settings.llm_hedge_delay))
+    return await _call_with_retries_async(call)
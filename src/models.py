@@ -1,5 +1,5 @@
-from typing import List, Dict, Any
-from pydantic import BaseModel
+from typing import List, Dict, Any, Optional, Tuple
+from pydantic import BaseModel, Field
 
 class EntityModel(BaseModel):
     """
@@ -21,6 +21,15 @@ class IntentModel(BaseModel):
     intent: str
     entities: List[EntityModel]
 
+class PlanModel(BaseModel):
+    """
+    Execution plan for a query that asks for several things at once
+    (e.g. "show pod status and images in prod and staging").
+    Attributes:
+        steps (List[IntentModel]): Intents to execute, in the order their results are shown.
+    """
+    steps: List[IntentModel] = Field(min_length=1)
+
 class PodStatusModel(BaseModel):
     """
     Represents the status of a Kubernetes Pod.
@@ -49,12 +58,67 @@ class PodImageModel(BaseModel):
     namespace: str
     containers: List[Dict[str, str]]
 
+class NamespaceErrorModel(BaseModel):
+    """
+    Represents a failure to query one namespace of a multi-namespace command.
+    Attributes:
+        namespace (str): Namespace that could not be queried.
+        error (str): Short description of the failure (e.g., '403 Forbidden').
+    """
+    namespace: str
+    error: str
+
+class PodSnapshotModel(BaseModel):
+    """
+    Pod phases and restart counts of a namespace as of a resourceVersion, kept per session
+    so a later "what changed" query only needs the changes since then.
+    Attributes:
+        namespace (str): Namespace of the snapshot ('*' for all namespaces).
+        resource_version (str): resourceVersion the snapshot is current as of.
+        pods (Dict[str, Tuple[Optional[str], int]]): '<namespace>/<name>' -> (phase, restarts).
+    """
+    namespace: str
+    resource_version: str
+    pods: Dict[str, Tuple[Optional[str], int]]
+
+class PodChangeModel(BaseModel):
+    """
+    Represents a pod that was added, removed, or changed phase or restart count between two snapshots.
+    Attributes:
+        name (str): Pod name.
+        namespace (str): Namespace of the pod.
+        change (str): 'added', 'removed' or 'changed'.
+        status (Optional[str]): Current phase (None for removed pods).
+        restarts (Optional[int]): Current restarts (None for removed pods).
+        previous_status (Optional[str]): Phase in the earlier snapshot (None for added pods).
+        previous_restarts (Optional[int]): Restarts in the earlier snapshot (None for added pods).
+    """
+    name: str
+    namespace: str
+    change: str
+    status: Optional[str] = None
+    restarts: Optional[int] = None
+    previous_status: Optional[str] = None
+    previous_restarts: Optional[int] = None
+
 class ConversationState(BaseModel):
     """
-    Maintains conversational context for a session.
+    Maintains conversational context for a session. src/conversation.py keeps it bounded:
+    history holds only the most recent turns, older turns are folded into digest, and the
+    entities a follow-up may refer to are kept in slots.
     Attributes:
         session_id (str): Unique session identifier.
-        history (List[Dict[str, Any]]): List of previous interactions (queries, intents, entities, etc.).
+        history (List[Dict[str, Any]]): Recent interactions (query, intent, entities, result), oldest first.
+        slots (Dict[str, str]): Resolved context of the last pod query: namespace, selectors, intent, result.
+        digest (Dict[str, int]): Turns rolled out of history, counted per '<intent> <scope>'.
+        max_turns (int): Max turns kept in history.
+        max_tokens (int): Approximate token cap for history.
+        snapshots (Dict[str, PodSnapshotModel]): Last pod snapshot per namespace ('*' for all namespaces).
     """
     session_id: str
-    history: List[Dict[str, Any]] 
\ No newline at end of file
+    history: List[Dict[str, Any]] = Field(default_factory=list)
+    slots: Dict[str, str] = Field(default_factory=dict)
+    digest: Dict[str, int] = Field(default_factory=dict)
+    max_turns: int = 6
+    max_tokens: int = 300
+    snapshots: Dict[str, PodSnapshotModel] = Field(default_factory=dict) 
\ No newline at end of file
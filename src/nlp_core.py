@@ -1,87 +1,334 @@
+import itertools
 import json
-from typing import Any, List
-from google.generativeai import GenerativeModel
-from src.models import IntentModel, PodStatusModel, PodImageModel
+import re
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+from src.models import IntentModel, PlanModel, PodStatusModel, PodImageModel, NamespaceErrorModel
+from src.intent_cache import CachedIntent, IntentCache, cache_version, get_intent_cache
+from src.intent_classifier import get_local_classifier
+from src import llm_backend, tracing
+from src.llm_backend import TASK_INTENT, TASK_SUMMARY
+from src.payload import build_summary_payload, estimate_tokens
+from src.render import render_pod_status
+from src.results import split_errors
+from src.settings import get_settings
 from pydantic import BaseModel
 
 # You will need to set your Gemini API key in the environment as per google-generativeai docs
 # Example: os.environ["GOOGLE_API_KEY"] = "..."
+# Models are chosen per task by src/llm_backend.py (llm_intent_model, llm_summary_model settings)
 
-def get_intent(query: str) -> IntentModel:
+# Intents the command layer can execute
+SUPPORTED_INTENTS = ["get_pod_status", "get_pod_images"]
+
+# Intent recognition prompt for Gemini; the user query is appended at call time
+INTENT_PROMPT = (
+    "You are an intent recognition engine for a Kubernetes CLI. "
+    "Given a user query, extract the intent and entities. "
+    "Return a JSON object with: "
+    "'intent': <intent_name>, 'entities': [ { 'type': <entity_type>, 'value': <entity_value> }, ... ]\n"
+    "\n"
+    f"Only use the following supported intent names: {', '.join(repr(i) for i in SUPPORTED_INTENTS)}.\n"
+    "If the user asks to list, show, or get pods and their status, use intent: 'get_pod_status'.\n"
+    "If the user asks about pod images, container images, or what images are running, use intent: 'get_pod_images'.\n"
+    "\n"
+    "Supported entity types: 'namespace', 'all_namespaces', 'label_selector', 'field_selector', 'resource_type'.\n"
+    "Return one 'namespace' entity per namespace mentioned. For all namespaces, return {'type': 'all_namespaces', 'value': 'true'}.\n"
+    "Use 'label_selector' for label filters in Kubernetes selector syntax (e.g. 'app=nginx', 'tier in (web,api)').\n"
+    "Use 'field_selector' for pod field filters: 'status.phase=<Pending|Running|Succeeded|Failed|Unknown>', "
+    "'spec.nodeName=<node>', 'metadata.name=<pod>'. Failing or failed pods map to 'status.phase=Failed'.\n"
+    "If the query asks for more than one intent, return {'steps': [<intent object>, ...]} with one intent object "
+    "per intent, in the order they were asked for.\n"
+    "\n"
+    "Examples:\n"
+    "User query: 'List all pods'\n"
+    "Response: {\"intent\": \"get_pod_status\", \"entities\": [{\"type\": \"resource_type\", \"value\": \"pods\"}]}\n"
+    "User query: 'Show pods in default namespace'\n"
+    "Response: {\"intent\": \"get_pod_status\", \"entities\": [{\"type\": \"namespace\", \"value\": \"default\"}]}\n"
+    "User query: 'Get pod images'\n"
+    "Response: {\"intent\": \"get_pod_images\", \"entities\": [{\"type\": \"resource_type\", \"value\": \"pods\"}]}\n"
+    "User query: 'What images are the pods using in the default namespace?'\n"
+    "Response: {\"intent\": \"get_pod_images\", \"entities\": [{\"type\": \"namespace\", \"value\": \"default\"}]}\n"
+    "User query: 'Which container images are running?'\n"
+    "Response: {\"intent\": \"get_pod_images\", \"entities\": [{\"type\": \"resource_type\", \"value\": \"pods\"}]}\n"
+    "User query: 'Show failing pods in prod'\n"
+    "Response: {\"intent\": \"get_pod_status\", \"entities\": [{\"type\": \"namespace\", \"value\": \"prod\"}, {\"type\": \"field_selector\", \"value\": \"status.phase=Failed\"}]}\n"
+    "User query: 'List pods in all namespaces'\n"
+    "Response: {\"intent\": \"get_pod_status\", \"entities\": [{\"type\": \"all_namespaces\", \"value\": \"true\"}]}\n"
+    "User query: 'Show pods in prod and staging'\n"
+    "Response: {\"intent\": \"get_pod_status\", \"entities\": [{\"type\": \"namespace\", \"value\": \"prod\"}, {\"type\": \"namespace\", \"value\": \"staging\"}]}\n"
+    "User query: 'Which pods are running on node worker-1?'\n"
+    "Response: {\"intent\": \"get_pod_status\", \"entities\": [{\"type\": \"field_selector\", \"value\": \"spec.nodeName=worker-1\"}]}\n"
+    "User query: 'What images do the app=nginx pods use in staging?'\n"
+    "Response: {\"intent\": \"get_pod_images\", \"entities\": [{\"type\": \"namespace\", \"value\": \"staging\"}, {\"type\": \"label_selector\", \"value\": \"app=nginx\"}]}\n"
+    "User query: 'Show pod status and images in prod'\n"
+    "Response: {\"steps\": [{\"intent\": \"get_pod_status\", \"entities\": [{\"type\": \"namespace\", \"value\": \"prod\"}]}, {\"intent\": \"get_pod_images\", \"entities\": [{\"type\": \"namespace\", \"value\": \"prod\"}]}]}\n"
+    "\n"
+)
+
+# Cached intents are only valid for the prompt and intent set that produced them
+INTENT_CACHE_VERSION = cache_version(INTENT_PROMPT, SUPPORTED_INTENTS)
+
+def intent_prompt(query: str, context: Optional[str] = None) -> str:
+    """Builds the Gemini intent prompt; context is the bounded conversation block of a follow-up query."""
+    if context:
+        return (INTENT_PROMPT + "Conversation so far (use it only to resolve references such as "
+                f"'those pods' or 'there'):\n{context}\n\nUser query: '{query}'")
+    return INTENT_PROMPT + f"User query: '{query}'"
+
+def resolve_intent_locally(query: str, use_cache: bool = True) -> Tuple[Optional[CachedIntent], Optional[IntentCache]]:
+    """
+    Resolves a query with the local classifier or the intent cache.
+    use_cache=False skips the cache (for follow-ups, whose intent depends on the conversation).
+    Returns (intent or cached plan, or None; the intent cache to fill after a Gemini call, or None if disabled).
+    """
+    settings = get_settings()
+    if settings.local_intent_enabled:
+        local_intent = get_local_classifier().classify(query, threshold=settings.local_intent_threshold)
+        if local_intent is not None:
+            tracing.set_attribute("source", "local")
+            return local_intent, None
+    if not use_cache or settings.intent_cache_size <= 0:
+        return None, None
+    cache = get_intent_cache(INTENT_CACHE_VERSION, settings.intent_cache_size, settings.intent_cache_path or None)
+    intent = cache.get(query)
+    if intent is not None:
+        tracing.set_attribute("source", "cache")
+    return intent, cache
+
+def record_llm_usage(llm_span: tracing.Span, prompt: str, text: str, response: Any = None) -> None:
+    """
+    Adds LLM byte and token counters to a span. Token counts come from the response's
+    usage metadata when available, otherwise they are estimated from the text.
+    """
+    llm_span.add("llm.prompt_bytes", len(prompt.encode()))
+    llm_span.add("llm.response_bytes", len(text.encode()))
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    output_tokens = getattr(usage, "candidates_token_count", None)
+    llm_span.add("llm.prompt_tokens", prompt_tokens if isinstance(prompt_tokens, int) else estimate_tokens(prompt))
+    llm_span.add("llm.output_tokens", output_tokens if isinstance(output_tokens, int) else estimate_tokens(text))
+
+def parse_plan_response(text: str) -> PlanModel:
+    """
+    Extracts and validates the JSON object in a Gemini intent response: a single intent
+    becomes a one-step plan, and plans are cut to the plan_max_steps setting.
     """
-    Uses Gemini API to extract intent and entities from a natural language query.
-    Returns a validated IntentModel.
+    # Gemini may return text, not JSON; extract JSON part
+    text = text.strip()
+    # Try to find JSON in the response
+    json_start = text.find('{')
+    json_end = text.rfind('}') + 1
+    if json_start == -1 or json_end == -1:
+        raise ValueError(f"No JSON found in Gemini response: {text}")
+    json_str = text[json_start:json_end]
+    data = json.loads(json_str)
+    if "steps" not in data:
+        return PlanModel(steps=[IntentModel(**data)])
+    plan = PlanModel(**data)
+    plan.steps = plan.steps[:max(1, get_settings().plan_max_steps)]
+    return plan
+
+def parse_intent_response(text: str) -> IntentModel:
+    """Extracts and validates the intent in a Gemini intent response (the first step of a plan)."""
+    return parse_plan_response(text).steps[0]
+
+def as_plan(intent: CachedIntent) -> PlanModel:
+    """Wraps a single intent in a one-step plan; plans are returned as-is."""
+    return intent if isinstance(intent, PlanModel) else PlanModel(steps=[intent])
+
+def cache_value(plan: PlanModel) -> CachedIntent:
+    """What the intent cache stores for a plan: the intent itself for one-step plans."""
+    return plan.steps[0] if len(plan.steps) == 1 else plan
+
+def get_intent(query: str, context: Optional[str] = None) -> IntentModel:
+    """
+    Returns the intent of a query; for a multi-intent query, the first step of its plan
+    (see get_plan).
+    """
+    return get_plan(query, context).steps[0]
+
+def get_plan(query: str, context: Optional[str] = None) -> PlanModel:
+    """
+    Uses Gemini API to extract the intents and entities of a natural language query.
+    A query asking for several things ("pod status and images in prod") yields a plan
+    of several steps from the same Gemini call; see src/planner.py to execute it.
+    Common queries are first tried against the local rule-based classifier and
+    skip Gemini entirely when it is confident; previously recognized queries are
+    served from the intent cache.
+    context (see conversation.conversation_context) is added to the Gemini prompt of a
+    follow-up query; such queries bypass the intent cache.
+    Returns a validated PlanModel.
     Raises ValueError on API or validation errors.
     """
-    # Construct prompt for Gemini with explicit few-shot examples and strict instructions
-    prompt = (
-        "You are an intent recognition engine for a Kubernetes CLI. "
-        "Given a user query, extract the intent and entities. "
-        "Return a JSON object with: "
-        "'intent': <intent_name>, 'entities': [ { 'type': <entity_type>, 'value': <entity_value> }, ... ]\n"
-        "\n"
-        "Only use the following supported intent names: 'get_pod_status', 'get_pod_images'.\n"
-        "If the user asks to list, show, or get pods and their status, use intent: 'get_pod_status'.\n"
-        "If the user asks about pod images, container images, or what images are running, use intent: 'get_pod_images'.\n"
-        "\n"
-        "Examples:\n"
-        "User query: 'List all pods'\n"
-        "Response: {\"intent\": \"get_pod_status\", \"entities\": [{\"type\": \"resource_type\", \"value\": \"pods\"}]}\n"
-        "User query: 'Show pods in default namespace'\n"
-        "Response: {\"intent\": \"get_pod_status\", \"entities\": [{\"type\": \"namespace\", \"value\": \"default\"}]}\n"
-        "User query: 'Get pod images'\n"
-        "Response: {\"intent\": \"get_pod_images\", \"entities\": [{\"type\": \"resource_type\", \"value\": \"pods\"}]}\n"
-        "User query: 'What images are the pods using in the default namespace?'\n"
-        "Response: {\"intent\": \"get_pod_images\", \"entities\": [{\"type\": \"namespace\", \"value\": \"default\"}]}\n"
-        "User query: 'Which container images are running?'\n"
-        "Response: {\"intent\": \"get_pod_images\", \"entities\": [{\"type\": \"resource_type\", \"value\": \"pods\"}]}\n"
-        "\n"
-        f"User query: '{query}'"
-    )
-    model = GenerativeModel("models/gemini-2.5-pro-preview-03-25")
-    try:
-        response = model.generate_content(prompt)
-        # Gemini may return text, not JSON; extract JSON part
-        text = response.text.strip()
-        # Try to find JSON in the response
-        json_start = text.find('{')
-        json_end = text.rfind('}') + 1
-        if json_start == -1 or json_end == -1:
-            raise ValueError(f"No JSON found in Gemini response: {text}")
-        json_str = text[json_start:json_end]
-        data = json.loads(json_str)
-        return IntentModel(**data)
-    except Exception as e:
-        raise ValueError(f"Failed to get intent from Gemini: {e}")
+    with tracing.span("intent") as intent_span:
+        intent, cache = resolve_intent_locally(query, use_cache=not context)
+        if intent is not None:
+            return as_plan(intent)
+        intent_span.set_attribute("source", "gemini")
+        # Gemini prompt: explicit few-shot examples and strict instructions, followed by the query
+        prompt = intent_prompt(query, context)
+        try:
+            with tracing.span("llm.call", model=llm_backend.model_for(TASK_INTENT)) as llm_span:
+                response = llm_backend.generate(TASK_INTENT, prompt)
+                record_llm_usage(llm_span, prompt, response.text, response)
+            plan = parse_plan_response(response.text)
+        except Exception as e:
+            raise ValueError(f"Failed to get intent from Gemini: {e}")
+        if cache is not None:
+            cache.put(query, cache_value(plan))
+        return plan
+
+def _pod_image_lines(pod: PodImageModel) -> List[str]:
+    """Formats one line per container of a PodImageModel."""
+    return [
+        f"Pod **{pod.name}** (namespace `{pod.namespace}`): container `{container['name']}` uses image `{container['image']}"
+        for container in pod.containers
+    ]
+
+def namespace_error_line(error: NamespaceErrorModel) -> str:
+    """Formats a per-namespace failure from a multi-namespace command."""
+    return f"Namespace `{error.namespace}` could not be queried: {error.error}"
+
+# Queries asking for an explanation rather than a listing; these always get a Gemini summary
+_EXPLAIN_RE = re.compile(r"\b(explain|why|summari[sz]e|summary|analy[sz]e|insights?|what'?s wrong)\b", re.IGNORECASE)
+
+def wants_explanation(query: str) -> bool:
+    """Returns True when the user explicitly asks for an explanation or summary."""
+    return bool(_EXPLAIN_RE.search(query))
+
+# Queries asking what changed since an earlier answer; answered from the session's pod snapshot
+_CHANGES_RE = re.compile(
+    r"\b(what'?s changed|what (has |have )?changed|any changes|changes since|changed since|since (the )?last( time| check)?|diff)\b",
+    re.IGNORECASE)
 
-def generate_response(data: List[BaseModel]) -> str:
+def wants_changes(query: str) -> bool:
+    """Returns True when the user asks what changed since an earlier answer."""
+    return bool(_CHANGES_RE.search(query))
+
+def local_response(data: Sequence[BaseModel], explain: bool) -> Optional[str]:
     """
-    Generates a natural language summary from a list of pydantic models using the Gemini API.
-    If the data is a list of PodImageModel, returns a concise summary of pod images only.
+    Returns the locally formatted response for data that does not need Gemini
+    (pod images, or pod status results above llm_summary_max_rows), otherwise None.
     """
+    settings = get_settings()
+    if (data and isinstance(data[0], PodStatusModel) and not explain
+            and len(data) > settings.llm_summary_max_rows):
+        return render_pod_status(data, fmt=settings.status_render_format)
     if data and isinstance(data[0], PodImageModel):
         # Directly generate a concise summary for images
-        lines = []
-        for pod in data:
-            if not pod.containers:
-                continue
-            for container in pod.containers:
-                lines.append(
-                    f"Pod **{pod.name}** (namespace `{pod.namespace}`): container `{container['name']}` uses image `{container['image']}" )
+        lines = [line for pod in data for line in _pod_image_lines(pod)]
         return "\n".join(lines) if lines else "No images found in the listed pods."
-    # Default: use Gemini for other model types
-    serializable = [item.dict() for item in data]
-    data_json = json.dumps(serializable, indent=2)
-    prompt = (
+    return None
+
+def summary_prompt(data: Sequence[BaseModel]) -> str:
+    """Builds the Gemini summarization prompt around a compact, token-budgeted payload."""
+    with tracing.span("prompt.build", rows=len(data)) as prompt_span:
+        payload = build_summary_payload(data, token_budget=get_settings().summary_token_budget)
+        prompt_span.add("prompt.payload_bytes", len(payload.encode()))
+    return (
         "You are a Kubernetes assistant. Given the following structured data, "
         "summarize it in clear, user-friendly natural language. "
         "Include container names and images in your summary. "
         "If the list is empty, say 'No resources found.'\n"
-        "Data:\n" + data_json
+        "The data is CSV: containers are written as <container>=<image id> (see the images table), "
+        "and the totals cover every row, including any marked as omitted.\n"
+        "Data:\n" + payload
     )
+
+def generate_response(data: Sequence[BaseModel], explain: bool = False) -> str:
+    """
+    Generates a natural language summary from a list of pydantic models using the Gemini API.
+    If the data is a list of PodImageModel, returns a concise summary of pod images only.
+    PodStatusModel results larger than llm_summary_max_rows are rendered locally
+    (grouped by phase, with restart hot-spots) unless explain is True.
+    NamespaceErrorModel entries are reported locally after the summary.
+    """
+    data, errors = split_errors(data)
+    if errors:
+        summary = generate_response(data, explain=explain) if data else "No resources found."
+        return "\n".join([summary] + [namespace_error_line(e) for e in errors])
+    with tracing.span("summary", rows=len(data)) as summary_span:
+        local = local_response(data, explain)
+        if local is not None:
+            summary_span.set_attribute("source", "local")
+            return local
+        summary_span.set_attribute("source", "gemini")
+        try:
+            prompt = summary_prompt(data)
+            with tracing.span("llm.call", model=llm_backend.model_for(TASK_SUMMARY)) as llm_span:
+                response = llm_backend.generate(TASK_SUMMARY, prompt)
+                record_llm_usage(llm_span, prompt, response.text, response)
+            return response.text
+        except Exception as e:
+            raise ValueError(f"Failed to generate summary from Gemini: {e}")
+
+def _stream_summary(data: Sequence[BaseModel]) -> Iterator[str]:
+    """
+    Yields the Gemini summary as it is generated (stream=True), for a low time-to-first-token.
+    Closing the generator stops reading the stream, which is how the CLI cancels a summary.
+    Raises ValueError on API errors.
+    """
+    llm_span = None
+    received = []
     try:
-        model = GenerativeModel("models/gemini-2.5-pro-preview-03-25")
-        response = model.generate_content(prompt)
-        return response.text
+        prompt = summary_prompt(data)
+        # Not a context manager: the span would otherwise become current for the consumer between yields
+        llm_span = tracing.start_span("llm.call", model=llm_backend.model_for(TASK_SUMMARY), stream=True)
+        response = llm_backend.generate(TASK_SUMMARY, prompt, stream=True)
+        ends_with_newline = True
+        for chunk in response:
+            text = chunk.text
+            if text:
+                if not received:
+                    llm_span.set_attribute("first_chunk_ms", round(llm_span.elapsed_ms(), 1))
+                received.append(text)
+                ends_with_newline = text.endswith("\n")
+                yield text
     except Exception as e:
-        raise ValueError(f"Failed to generate summary from Gemini: {e}") 
\ No newline at end of file
+        raise ValueError(f"Failed to generate summary from Gemini: {e}")
+    finally:
+        if llm_span is not None:
+            record_llm_usage(llm_span, prompt, "".join(received))
+            llm_span.end()
+    if not ends_with_newline:
+        yield "\n"
+
+def generate_response_stream(data: Iterable[BaseModel], explain: bool = False) -> Iterator[str]:
+    """
+    Streaming variant of generate_response for model iterators such as execute_command_stream.
+    Yields text chunks to be printed as-is; locally formatted lines end with a newline.
+    PodImageModel results are formatted locally and yielded line by line as pages arrive;
+    Gemini summaries are streamed chunk by chunk as they are generated.
+    """
+    items = iter(data)
+    errors = []
+    first = None
+    for item in items:
+        if not isinstance(item, NamespaceErrorModel):
+            first = item
+            break
+        errors.append(item)
+    if not isinstance(first, PodImageModel):
+        collected = [] if first is None else [first, *items]
+        errors += [item for item in collected if isinstance(item, NamespaceErrorModel)]
+        collected = [item for item in collected if not isinstance(item, NamespaceErrorModel)]
+        local = "No resources found." if errors and not collected else local_response(collected, explain)
+        if local is not None:
+            yield local + "\n"
+        else:
+            yield from _stream_summary(collected)
+        for error in errors:
+            yield namespace_error_line(error) + "\n"
+        return
+    found = False
+    for error in errors:
+        yield namespace_error_line(error) + "\n"
+    for pod in itertools.chain([first], items):
+        if isinstance(pod, NamespaceErrorModel):
+            yield namespace_error_line(pod) + "\n"
+            continue
+        for line in _pod_image_lines(pod):
+            found = True
+            yield line + "\n"
+    if not found:
+        yield "No images found in the listed pods.\n"
@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+from collections import Counter
+from typing import Any, Dict, List, Sequence, Tuple
+from pydantic import BaseModel
+from src.models import PodStatusModel, PodImageModel
+from src.render import PHASE_ORDER, restart_hotspots
+from src.results import pod_rows
+
+# Rough characters-per-token ratio used to keep payloads inside the token budget
+CHARS_PER_TOKEN = 4
+
+# A CSV row plus the image ids it references
+_Row = Tuple[str, List[str]]
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for prompt budgeting."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def _csv_line(values: Sequence[Any]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="").writerow(values)
+    return buffer.getvalue()
+
+def _phase_rank(status: str) -> int:
+    return PHASE_ORDER.index(status) if status in PHASE_ORDER else len(PHASE_ORDER)
+
+def _pod_rows(data: Sequence[Any], image_ids: Dict[str, str], include_namespace: bool,
+              statuses: bool) -> Tuple[str, List[_Row]]:
+    """
+    Encodes pods (models or PodTable rows) as CSV. Containers are written as
+    name=<image id>, with ids assigned in image_ids, so a repeated image is sent once.
+    Status rows are ordered problem phases first, then by restarts.
+    """
+    if statuses:
+        data = sorted(data, key=lambda pod: (_phase_rank(pod.status), -pod.restarts))
+    header = ["name"] + (["namespace"] if include_namespace else [])
+    header += ["status", "restarts", "containers"] if statuses else ["containers"]
+    rows = []
+    for pod in data:
+        refs = []
+        cells = []
+        for container in pod.containers:
+            image = container.get("image", "")
+            ref = image_ids.setdefault(image, f"i{len(image_ids)}")
+            refs.append(ref)
+            cells.append(f"{container.get('name', '')}={ref}")
+        row = [pod.name] + ([pod.namespace] if include_namespace else [])
+        if statuses:
+            row += [pod.status, pod.restarts]
+        row.append(";".join(cells))
+        rows.append((_csv_line(row), refs))
+    return _csv_line(header), rows
+
+def _generic_rows(data: Sequence[BaseModel]) -> Tuple[str, List[_Row]]:
+    """Encodes arbitrary models as CSV; nested fields are written as compact JSON."""
+    dumped = [item.model_dump() for item in data]
+    fields = list(dumped[0].keys())
+    rows = [
+        (_csv_line([json.dumps(values[f], separators=(",", ":")) if isinstance(values[f], (dict, list)) else values[f]
+                    for f in fields]), [])
+        for values in dumped
+    ]
+    return _csv_line(fields), rows
+
+def _aggregates(data: Sequence[Any], top_n: int, statuses: bool) -> List[str]:
+    """Exact totals over all rows, including any that are omitted for budget."""
+    lines = [f"total: {len(data)}"]
+    if statuses:
+        counts = Counter(pod.status for pod in data)
+        ordered = sorted(counts, key=lambda phase: (_phase_rank(phase), phase))
+        lines.append("by_status: " + ", ".join(f"{phase}={counts[phase]}" for phase in ordered))
+        hotspots = restart_hotspots(data, limit=top_n)
+        if hotspots:
+            lines.append("top_restarts: " + ", ".join(f"{p.namespace}/{p.name}={p.restarts}" for p in hotspots))
+    return lines
+
+def build_summary_payload(data: Sequence[BaseModel], token_budget: int = 2000, top_n: int = 5) -> str:
+    """
+    Builds a compact text payload for the summarization prompt.
+    The payload has exact aggregates (total, counts per phase, top-N restarts), a
+    deduplicated image table and the rows as CSV. Rows are added while the estimated
+    size stays within token_budget; the rest are replaced by an "N more omitted" note.
+    A single namespace is hoisted into a header line instead of repeated per row.
+    """
+    if not data:
+        return "total: 0"
+    first = data[0]
+    statuses = isinstance(first, PodStatusModel)
+    # PodTable results are read row by row, without building models
+    data = pod_rows(data)
+    lines = _aggregates(data, top_n, statuses)
+    image_ids: Dict[str, str] = {}
+    if isinstance(first, (PodStatusModel, PodImageModel)):
+        namespaces = {pod.namespace for pod in data}
+        if len(namespaces) == 1:
+            lines.append(f"namespace: {next(iter(namespaces))}")
+        header, rows = _pod_rows(data, image_ids, include_namespace=len(namespaces) > 1, statuses=statuses)
+    else:
+        header, rows = _generic_rows(data)
+    images = {ref: image for image, ref in image_ids.items()}
+    used = estimate_tokens("\n".join(lines + ["images:", "rows:", header]))
+    kept: List[str] = []
+    referenced: Dict[str, None] = {}
+    for line, refs in rows:
+        new_refs = [ref for ref in dict.fromkeys(refs) if ref not in referenced]
+        cost = estimate_tokens(line) + sum(estimate_tokens(f"{ref}={images[ref]}") for ref in new_refs)
+        # Always keep at least one row so the model sees the shape of the data
+        if kept and used + cost > token_budget:
+            break
+        kept.append(line)
+        referenced.update(dict.fromkeys(new_refs))
+        used += cost
+    if referenced:
+        lines.append("images:")
+        lines.extend(f"{ref}={images[ref]}" for ref in sorted(referenced, key=lambda ref: int(ref[1:])))
+    lines.append("rows:")
+    lines.append(header)
+    lines.extend(kept)
+    omitted = len(rows) - len(kept)
+    if omitted:
+        lines.append(f"... {omitted} more omitted (counted in the totals above)")
+    return "\n".join(lines)
@@ -0,0 +1,55 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Hashable, List, Sequence
+from pydantic import BaseModel
+from src import tracing
+from src.k8s_client import execute_command, execute_pod_intents, pod_query_key
+from src.models import IntentModel, PlanModel
+from src.settings import get_settings
+
+def _merge_key(step: IntentModel) -> Hashable:
+    """Steps with the same key share their API calls: pod intents on the same pods, or identical steps."""
+    key = pod_query_key(step)
+    if key is not None:
+        return "pods", key
+    return step.intent, tuple((e.type, e.value) for e in step.entities)
+
+def merge_steps(plan: PlanModel) -> List[List[int]]:
+    """Groups the step indices of a plan by the API calls they need, in order of first use."""
+    groups: Dict[Hashable, List[int]] = {}
+    for index, step in enumerate(plan.steps):
+        groups.setdefault(_merge_key(step), []).append(index)
+    return list(groups.values())
+
+def _run_group(plan: PlanModel, indices: List[int]) -> Dict[int, Sequence[BaseModel]]:
+    """Executes one group of merged steps; steps with the same intent share one result."""
+    intents: Dict[str, IntentModel] = {}
+    for index in indices:
+        intents.setdefault(plan.steps[index].intent, plan.steps[index])
+    if len(intents) == 1:
+        results = {name: execute_command(intent) for name, intent in intents.items()}
+    else:
+        results = dict(zip(intents, execute_pod_intents(list(intents.values()))))
+    return {index: results[plan.steps[index].intent] for index in indices}
+
+def execute_plan(plan: PlanModel) -> List[Sequence[BaseModel]]:
+    """
+    Executes every step of a plan and returns their results in step order.
+    Steps that read the same pods (e.g. status and images in one namespace) are merged
+    into one list request; the remaining groups run concurrently on up to plan_workers threads.
+    Raises the first error in step order (CommandExecutionError, NotImplementedError) once all groups finished.
+    """
+    groups = merge_steps(plan)
+    with tracing.span("plan", steps=len(plan.steps), groups=len(groups)):
+        if len(groups) == 1:
+            outputs = [_run_group(plan, groups[0])]
+        else:
+            workers = max(1, min(get_settings().plan_workers, len(groups)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kubeai-plan") as pool:
+                # Each worker gets a copy of the caller's context, so its spans nest under the plan span
+                futures = [pool.submit(contextvars.copy_context().run, _run_group, plan, group) for group in groups]
+            outputs = [future.result() for future in futures]
+    results: Dict[int, Sequence[BaseModel]] = {}
+    for output in outputs:
+        results.update(output)
+    return [results[index] for index in range(len(plan.steps))]
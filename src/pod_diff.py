@@ -0,0 +1,71 @@
+from typing import List, Optional, Sequence, Tuple
+from pydantic import BaseModel
+from kubernetes.client.rest import ApiException
+from src.k8s_client import (
+    ALL_NAMESPACES_KEY, CommandExecutionError, refresh_pod_snapshot, snapshot_from_result, snapshot_key,
+)
+from src.models import ConversationState, IntentModel, PodChangeModel, PodSnapshotModel
+from src.results import PodTable
+
+# Order of change kinds in a diff: pods that went away first, then new pods, then changed ones
+CHANGE_ORDER = ("removed", "added", "changed")
+
+def diff_snapshots(old: PodSnapshotModel, new: PodSnapshotModel) -> List[PodChangeModel]:
+    """Returns the pods added, removed, or with a different phase or restart count in new."""
+    changes = []
+    for key in old.pods.keys() | new.pods.keys():
+        before, after = old.pods.get(key), new.pods.get(key)
+        if before == after:
+            continue
+        namespace, name = key.split("/", 1)
+        change = "added" if before is None else "removed" if after is None else "changed"
+        changes.append(PodChangeModel(
+            name=name,
+            namespace=namespace,
+            change=change,
+            status=after[0] if after else None,
+            restarts=after[1] if after else None,
+            previous_status=before[0] if before else None,
+            previous_restarts=before[1] if before else None,
+        ))
+    changes.sort(key=lambda c: (CHANGE_ORDER.index(c.change), c.namespace, c.name))
+    return changes
+
+def remember_pods(state: ConversationState, intent: IntentModel, data: Sequence[BaseModel]) -> bool:
+    """
+    Stores the snapshot of a pod status result in the session, as the baseline for a later
+    "what changed" query. Returns True if a snapshot was stored.
+    """
+    key = snapshot_key(intent)
+    if key is None or not isinstance(data, PodTable):
+        return False
+    snapshot = snapshot_from_result(None if key == ALL_NAMESPACES_KEY else key, data)
+    if snapshot is None:
+        return False
+    state.snapshots[key] = snapshot
+    return True
+
+def pod_changes(state: ConversationState, intent: IntentModel) -> Optional[Tuple[PodSnapshotModel, List[PodChangeModel]]]:
+    """
+    Answers a "what changed" query from the session's stored snapshot: fetches only the
+    changes since its resourceVersion and returns (updated snapshot, changed pods).
+    The updated snapshot replaces the stored one. Returns None when the intent has no
+    stored snapshot to compare with (the query is then answered in full).
+    Raises CommandExecutionError on API errors.
+    """
+    key = snapshot_key(intent)
+    previous = state.snapshots.get(key) if key is not None else None
+    if previous is None:
+        return None
+    try:
+        current = refresh_pod_snapshot(previous)
+    except ApiException as e:
+        raise CommandExecutionError(f"Failed to fetch pod changes for '{key}': {e}")
+    state.snapshots[key] = current
+    return current, diff_snapshots(previous, current)
+
+def no_changes_line(snapshot: PodSnapshotModel) -> str:
+    """Response for a "what changed" query without changes."""
+    scope = "all namespaces" if snapshot.namespace == ALL_NAMESPACES_KEY else f"namespace `{snapshot.namespace}`"
+    noun = "pod" if len(snapshot.pods) == 1 else "pods"
+    return f"No pod changes in {scope} since the last check ({len(snapshot.pods)} {noun})."
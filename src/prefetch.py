@@ -0,0 +1,79 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Hashable, List, Optional
+from src.intent_classifier import get_local_classifier
+from src.models import EntityModel
+
+# Speculative results older than this (seconds since the fetch started) are discarded
+PREFETCH_MAX_AGE = 30.0
+
+def guess_entities(query: str) -> Optional[List[EntityModel]]:
+    """
+    Cheaply guesses the entities of a pod query from its raw text, before intent recognition.
+    Uses the local classifier's entity patterns regardless of its confidence.
+    Returns None when the query does not look like a pod query.
+    """
+    intent, entities, _ = get_local_classifier().score(query)
+    return entities if intent is not None else None
+
+class PrefetchSlot:
+    """
+    One-shot slot for a speculative fetch, keyed by its request parameters.
+    A new put replaces (and, if not yet running, cancels) the previous fetch. take
+    hands the result over only when the key matches; otherwise the fetch is discarded.
+    Attributes:
+        max_age (float): Seconds after which a pending or finished fetch is considered stale.
+        hits (int): Speculative fetches handed over to a take.
+        misses (int): Speculative fetches discarded (key mismatch, stale or failed).
+    """
+    def __init__(self, max_age: float = PREFETCH_MAX_AGE):
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._key: Optional[Hashable] = None
+        self._future: Optional[Future] = None
+        self._started = 0.0
+
+    def put(self, key: Hashable, future: Future) -> None:
+        """Stores a started fetch for key, replacing any previous one."""
+        with self._lock:
+            if self._future is not None:
+                self._future.cancel()
+            self._key, self._future, self._started = key, future, time.monotonic()
+
+    def take(self, key: Hashable) -> Optional[Any]:
+        """
+        Empties the slot and returns the fetch result if it was started for key,
+        waiting for it to finish. Returns None on a key mismatch, a stale or failed fetch,
+        so the caller fetches normally (and reports errors from its own request).
+        """
+        with self._lock:
+            stored_key, future, started = self._key, self._future, self._started
+            self._key, self._future = None, None
+        if future is None:
+            return None
+        result = None
+        if stored_key == key and time.monotonic() - started <= self.max_age:
+            try:
+                result = future.result()
+            except Exception:
+                result = None
+        else:
+            future.cancel()
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def clear(self) -> None:
+        """Discards any pending fetch and zeroes the counters."""
+        with self._lock:
+            if self._future is not None:
+                self._future.cancel()
+            self._key, self._future = None, None
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,77 @@
+from collections import defaultdict
+from typing import Dict, List, Sequence
+from src.models import PodStatusModel
+from src.results import pod_rows
+
+# Phases listed first need attention; unknown phases are appended in name order
+PHASE_ORDER = ["Failed", "Unknown", "Pending", "Running", "Succeeded"]
+
+RENDER_FORMATS = ("table", "markdown")
+
+def _phase_groups(pods: Sequence[PodStatusModel]) -> Dict[str, List[PodStatusModel]]:
+    """Groups pods by phase, ordered by PHASE_ORDER."""
+    groups: Dict[str, List[PodStatusModel]] = defaultdict(list)
+    for pod in pods:
+        groups[pod.status or "Unknown"].append(pod)
+    ordered = [p for p in PHASE_ORDER if p in groups] + sorted(p for p in groups if p not in PHASE_ORDER)
+    return {phase: groups[phase] for phase in ordered}
+
+def _images(pod: PodStatusModel) -> str:
+    return ", ".join(c.get("image", "") for c in pod.containers) or "-"
+
+def restart_hotspots(pods: Sequence[PodStatusModel], limit: int = 5, min_restarts: int = 1) -> List[PodStatusModel]:
+    """Returns up to limit pods with the most restarts (at least min_restarts), highest first."""
+    candidates = [pod for pod in pods if pod.restarts >= min_restarts]
+    return sorted(candidates, key=lambda pod: (-pod.restarts, pod.namespace, pod.name))[:limit]
+
+def phase_counts_line(pods: Sequence[PodStatusModel]) -> str:
+    """Returns a one-line summary such as '12 pods: 1 Failed, 2 Pending, 9 Running'."""
+    if not pods:
+        return "No resources found."
+    phases = ", ".join(f"{len(group)} {phase}" for phase, group in _phase_groups(pods).items())
+    noun = "pod" if len(pods) == 1 else "pods"
+    return f"{len(pods)} {noun}: {phases}"
+
+def _table(headers: List[str], rows: List[List[str]], indent: str = "  ") -> List[str]:
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    fmt = indent + "  ".join(f"{{:<{w}}}" for w in widths)
+    return [fmt.format(*headers).rstrip()] + [fmt.format(*row).rstrip() for row in rows]
+
+def _markdown_table(headers: List[str], rows: List[List[str]]) -> List[str]:
+    lines = ["| " + " | ".join(headers) + " |", "|" + "|".join("---" for _ in headers) + "|"]
+    lines += ["| " + " | ".join(str(cell) for cell in row) + " |" for row in rows]
+    return lines
+
+def render_pod_status(pods: Sequence[PodStatusModel], fmt: str = "table", hotspot_limit: int = 5) -> str:
+    """
+    Renders PodStatusModel results locally, without an LLM round trip.
+    Pods are grouped by phase (problem phases first) and the pods with the most
+    restarts are listed as hot-spots.
+    fmt is 'table' (aligned plain text) or 'markdown'.
+    Raises ValueError for an unknown format.
+    """
+    if fmt not in RENDER_FORMATS:
+        raise ValueError(f"Unknown render format: {fmt} (expected one of {', '.join(RENDER_FORMATS)})")
+    if not pods:
+        return "No resources found."
+    pods = pod_rows(pods)
+    markdown = fmt == "markdown"
+    headers = ["NAME", "NAMESPACE", "RESTARTS", "IMAGES"]
+    lines = [f"**{phase_counts_line(pods)}**" if markdown else phase_counts_line(pods)]
+    for phase, group in _phase_groups(pods).items():
+        rows = [[pod.name, pod.namespace, str(pod.restarts), _images(pod)] for pod in group]
+        lines.append("")
+        if markdown:
+            lines.append(f"### {phase} ({len(group)})")
+            lines.extend(_markdown_table(headers, rows))
+        else:
+            lines.append(f"{phase} ({len(group)})")
+            lines.extend(_table(headers, rows))
+    hotspots = restart_hotspots(pods, limit=hotspot_limit)
+    if hotspots:
+        lines.append("")
+        lines.append("### Restart hot-spots" if markdown else "Restart hot-spots:")
+        for pod in hotspots:
+            entry = f"{pod.name} ({pod.namespace}): {pod.restarts} restarts"
+            lines.append(f"- **{entry}**" if markdown else f"  ! {entry}")
+    return "\n".join(lines)
@@ -0,0 +1,112 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Request priorities: interactive queries are served before batch traffic
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one: the first caller (the leader)
+    does the work, and callers arriving while it is in flight wait for its result
+    (or its error) instead of repeating the request. Nothing is kept after the call ends.
+    Attributes:
+        coalesced (int): Calls served by another caller's in-flight call.
+    """
+    def __init__(self):
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, Future] = {}
+
+    def join(self, key: Hashable) -> Tuple[Future, bool]:
+        """
+        Returns (future, leader). A leader must call finish(key, ...) exactly once;
+        other callers wait on future.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = Future()
+            return flight, True
+
+    def finish(self, key: Hashable, result: Any = None, error: Optional[BaseException] = None) -> None:
+        """Ends the leader's call and hands result (or error) to the waiting callers."""
+        with self._lock:
+            flight = self._flights.pop(key, None)
+        if flight is None:
+            return
+        if error is not None:
+            flight.set_exception(error)
+        else:
+            flight.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Returns fn(), or the result of an identical call already in flight."""
+        flight, leader = self.join(key)
+        if not leader:
+            return flight.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, error=e)
+            raise
+        self.finish(key, result)
+        return result
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: rate requests per second on average, in bursts of up to
+    burst requests. Interactive requests come first: a batch request waits while an
+    interactive one is waiting, and only takes a token while more than reserve tokens
+    are left, so a batch burst cannot starve an interactive query.
+    Attributes:
+        rate (float): Tokens added per second.
+        burst (float): Bucket size.
+        reserve (float): Tokens kept for interactive requests.
+        throttled (int): Requests that had to wait for a token.
+    """
+    def __init__(self, rate: float, burst: float, reserve: float = 0.0):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.reserve = max(0.0, min(reserve, self.burst - 1))
+        self.throttled = 0
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._interactive_waiting = 0
+        self._cond = threading.Condition()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority: str = INTERACTIVE) -> float:
+        """Blocks until a token is available for a request of priority; returns the seconds waited."""
+        interactive = priority != BATCH
+        floor = 1.0 if interactive else 1.0 + self.reserve
+        started = None
+        with self._cond:
+            if interactive:
+                self._interactive_waiting += 1
+            try:
+                while True:
+                    self._refill()
+                    if self._tokens >= floor and (interactive or not self._interactive_waiting):
+                        self._tokens -= 1
+                        return 0.0 if started is None else time.monotonic() - started
+                    if started is None:
+                        started = time.monotonic()
+                        self.throttled += 1
+                    # Sleeps until enough tokens accrue; a batch request blocked by an interactive
+                    # one is woken when that request leaves
+                    needed = floor - self._tokens
+                    self._cond.wait((needed if needed > 0 else 1.0) / self.rate)
+            finally:
+                if interactive:
+                    self._interactive_waiting -= 1
+                    self._cond.notify_all()
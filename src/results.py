@@ -0,0 +1,107 @@
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+from pydantic import BaseModel
+from src.models import NamespaceErrorModel
+
+class PodRow:
+    """
+    One pod of a PodTable. Has the same attribute names as PodStatusModel and
+    PodImageModel, so renderers and payload builders can read rows directly.
+    Attributes:
+        name (str): Pod name.
+        namespace (str): Namespace of the pod.
+        status (Optional[str]): Pod phase (None for image results).
+        restarts (int): Total container restarts.
+        containers (List[Dict[str, str]]): Containers with their names and images.
+    """
+    __slots__ = ("name", "namespace", "status", "restarts", "containers")
+
+    def __init__(self, name: str, namespace: str, status: Optional[str] = None, restarts: int = 0,
+                 containers: Optional[List[Dict[str, str]]] = None):
+        self.name = name
+        self.namespace = namespace
+        self.status = status
+        self.restarts = restarts
+        self.containers = containers if containers is not None else []
+
+def row_model(kind: Type[BaseModel], row: PodRow) -> BaseModel:
+    """Builds a kind model from a row without validation (rows come from API objects with known types)."""
+    return kind.model_construct(**{field: getattr(row, field) for field in kind.model_fields})
+
+class PodTable(Sequence):
+    """
+    Compact command result for pod intents: rows are filled without per-row validation,
+    and a pydantic model (kind) is only built when an item is accessed, then reused.
+    Behaves as a read-only sequence of models, so callers that index, iterate or
+    compare it with a list keep working.
+    Attributes:
+        kind (Type[BaseModel]): Model type of the items (PodStatusModel or PodImageModel).
+        rows (List[PodRow]): The rows, in result order.
+        resource_version (Optional[str]): resourceVersion of the list the rows came from, if known.
+    """
+    __slots__ = ("kind", "rows", "resource_version", "_models")
+
+    def __init__(self, kind: Type[BaseModel], rows: Optional[List[PodRow]] = None,
+                 resource_version: Optional[str] = None):
+        self.kind = kind
+        self.rows: List[PodRow] = rows if rows is not None else []
+        self.resource_version = resource_version
+        self._models: Dict[int, BaseModel] = {}
+
+    def append(self, row: PodRow) -> None:
+        self.rows.append(row)
+
+    def _model(self, index: int) -> BaseModel:
+        model = self._models.get(index)
+        if model is None:
+            model = row_model(self.kind, self.rows[index])
+            self._models[index] = model
+        return model
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._model(i) for i in range(*index.indices(len(self.rows)))]
+        if index < 0:
+            index += len(self.rows)
+        if not 0 <= index < len(self.rows):
+            raise IndexError("PodTable index out of range")
+        return self._model(index)
+
+    def __iter__(self) -> Iterator[BaseModel]:
+        for index in range(len(self.rows)):
+            yield self._model(index)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (PodTable, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PodTable({self.kind.__name__}, {len(self.rows)} rows)"
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Returns the rows as dicts, like model_dump() on every item, without building models."""
+        fields = tuple(self.kind.model_fields)
+        return [{field: getattr(row, field) for field in fields} for row in self.rows]
+
+def pod_rows(data: Sequence) -> Sequence:
+    """Returns the rows of a PodTable, or data itself (models have the same attributes)."""
+    return data.rows if isinstance(data, PodTable) else data
+
+def split_errors(data: Sequence[BaseModel]) -> Tuple[Sequence[BaseModel], List[NamespaceErrorModel]]:
+    """Separates NamespaceErrorModel entries from a command result; a PodTable has none."""
+    if isinstance(data, PodTable):
+        return data, []
+    errors = [item for item in data if isinstance(item, NamespaceErrorModel)]
+    if not errors:
+        return data, []
+    return [item for item in data if not isinstance(item, NamespaceErrorModel)], errors
+
+def dump_results(data: Sequence[BaseModel]) -> List[Dict[str, Any]]:
+    """model_dump() of every item; PodTable rows are dumped without building models."""
+    if isinstance(data, PodTable):
+        return data.to_dicts()
+    return [item.model_dump() for item in data]
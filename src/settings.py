@@ -0,0 +1,124 @@
+import os
+from typing import Optional
+from pydantic import BaseModel
+
+ENV_PREFIX = "KUBEAI_"
+
+class Settings(BaseModel):
+    """
+    Runtime tuning options for kubeai.
+    Every field can be overridden with an environment variable named KUBEAI_<FIELD_NAME>
+    (e.g., KUBEAI_POOL_MAXSIZE=32).
+    Attributes:
+        pool_maxsize (int): Max connections kept in the shared Kubernetes API connection pool.
+        tcp_keepalive (bool): Enable TCP keep-alive probes on Kubernetes API connections.
+        informer_enabled (bool): Serve pod queries from a watch-backed in-memory informer cache.
+        informer_watch_timeout (int): Seconds before an informer watch stream is restarted.
+        page_size (int): Pods requested per list call (limit/continue pagination).
+        raw_decode (bool): Decode list responses straight from JSON, skipping kubernetes client models.
+        fanout_workers (int): Max namespaces queried concurrently by multi-namespace commands.
+        api_qps (float): Client-side limit on Kubernetes API requests per second (0 disables).
+        api_burst (int): Requests allowed in a burst above api_qps.
+        api_batch_reserve (float): Fraction of api_burst that batch traffic leaves for interactive queries.
+        api_coalesce (bool): Share one pod list between concurrent identical requests (same namespace and selectors).
+        plan_max_steps (int): Max steps kept from a multi-intent plan; extra steps are dropped.
+        plan_workers (int): Max plan steps (after merging) executed concurrently.
+        local_intent_enabled (bool): Try the local rule-based classifier before calling Gemini.
+        local_intent_threshold (float): Confidence (0-1) the local classifier needs to skip Gemini.
+        intent_cache_size (int): Max recognized intents kept in memory (0 disables the cache).
+        intent_cache_path (Optional[str]): sqlite file persisting recognized intents across runs.
+        llm_backend (str): LLM backend registered in src/llm_backend.py ('gemini').
+        llm_intent_model (str): Fast, small model used for intent recognition.
+        llm_summary_model (str): Larger model used only for summaries.
+        llm_timeout (float): Request timeout of a single LLM call in seconds (0 uses the client default).
+        llm_retries (int): Retries of an LLM call after a timeout, connection error, 429 or 5xx.
+        llm_retry_base_delay (float): First retry backoff window in seconds; doubles per retry, with full jitter.
+        llm_hedge_delay (float): Seconds before a slow non-streamed LLM call is duplicated, first answer wins (0 disables).
+        llm_summary_max_rows (int): Largest pod status result summarized by Gemini; larger results are rendered locally.
+        status_render_format (str): Local renderer format for pod status results: 'table' or 'markdown'.
+        summary_token_budget (int): Approximate token budget for the data sent to Gemini for summaries.
+        intent_timeout (float): Seconds the async pipeline waits for intent recognition (0 disables).
+        command_timeout (float): Seconds the async pipeline waits for the Kubernetes command (0 disables).
+        prefetch_enabled (bool): Start the likely pod list while the intent is being recognized.
+        result_cache_ttl (float): Seconds a fetched pod list is reused by later pod queries (0 disables).
+        result_cache_size (int): Max pod list snapshots (namespace plus selectors) kept in the result cache.
+        result_cache_max_records (int): Lists with more pods than this are streamed without being kept.
+        trace_exporter (Optional[str]): Export per-query trace spans: 'log' (JSON log records) or 'otel' (OpenTelemetry).
+        summary_timeout (float): Seconds the async pipeline waits for the first and each next summary chunk (0 disables).
+        diff_watch_timeout (int): Max seconds a "what changed" query follows the watch from the stored resourceVersion.
+        diff_watch_idle (float): Seconds without a watch event after which the replay counts as caught up.
+        conversation_max_turns (int): Recent turns a session keeps verbatim; older turns are folded into a digest.
+        conversation_token_budget (int): Approximate token cap for a session's recent turns.
+    """
+    pool_maxsize: int = 16
+    tcp_keepalive: bool = True
+    informer_enabled: bool = False
+    informer_watch_timeout: int = 300
+    page_size: int = 500
+    raw_decode: bool = False
+    fanout_workers: int = 8
+    api_qps: float = 20.0
+    api_burst: int = 40
+    api_batch_reserve: float = 0.25
+    api_coalesce: bool = True
+    plan_max_steps: int = 4
+    plan_workers: int = 4
+    local_intent_enabled: bool = True
+    local_intent_threshold: float = 0.8
+    intent_cache_size: int = 512
+    intent_cache_path: Optional[str] = None
+    llm_backend: str = "gemini"
+    llm_intent_model: str = "models/gemini-2.0-flash-lite"
+    llm_summary_model: str = "models/gemini-2.5-pro-preview-03-25"
+    llm_timeout: float = 30.0
+    llm_retries: int = 2
+    llm_retry_base_delay: float = 0.5
+    llm_hedge_delay: float = 0.0
+    llm_summary_max_rows: int = 25
+    status_render_format: str = "table"
+    summary_token_budget: int = 2000
+    intent_timeout: float = 30.0
+    command_timeout: float = 60.0
+    summary_timeout: float = 60.0
+    prefetch_enabled: bool = True
+    result_cache_ttl: float = 5.0
+    result_cache_size: int = 32
+    result_cache_max_records: int = 5000
+    trace_exporter: Optional[str] = None
+    diff_watch_timeout: int = 2
+    diff_watch_idle: float = 0.3
+    conversation_max_turns: int = 6
+    conversation_token_budget: int = 300
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Builds Settings from defaults overridden by KUBEAI_* environment variables."""
+        overrides = {}
+        for name in cls.model_fields:
+            value = os.environ.get(ENV_PREFIX + name.upper())
+            if value is not None:
+                overrides[name] = value
+        return cls(**overrides)
+
+_settings: Optional[Settings] = None
+
+def get_settings() -> Settings:
+    """Returns the process-wide Settings, reading the environment on first use."""
+    global _settings
+    if _settings is None:
+        _settings = Settings.from_env()
+    return _settings
+
+def configure(**overrides) -> Settings:
+    """
+    Replaces the process-wide Settings with a copy updated by the given overrides.
+    Raises ValueError (pydantic ValidationError) on invalid values.
+    """
+    global _settings
+    _settings = Settings(**{**get_settings().model_dump(), **overrides})
+    return _settings
+
+def reset_settings() -> None:
+    """Drops the cached Settings so the next get_settings() re-reads the environment."""
+    global _settings
+    _settings = None
@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+class SnapshotCache:
+    """
+    Short-lived LRU cache of list results (e.g., pod records), keyed by the request
+    parameters (namespace plus selectors). Entries expire ttl seconds after they were
+    fetched; at most max_entries snapshots are kept.
+    Cached lists are shared between callers and must be treated as read-only.
+    Attributes:
+        ttl (float): Seconds a snapshot stays valid.
+        max_entries (int): Max snapshots kept.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that found no fresh snapshot.
+    """
+    def __init__(self, ttl: float = 5.0, max_entries: int = 32):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[List[Dict[str, Any]]]:
+        """Returns the fresh snapshot for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def fresh(self, key: Hashable) -> bool:
+        """Returns True if a fresh snapshot exists for key, without counting a lookup."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and time.monotonic() - entry[0] <= self.ttl
+
+    def put(self, key: Hashable, records: List[Dict[str, Any]], fetched_at: Optional[float] = None) -> None:
+        """
+        Stores a snapshot for key. fetched_at (time.monotonic()) defaults to now; pass the
+        time the fetch started so a slow fetch does not extend the snapshot's lifetime.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() if fetched_at is None else fetched_at, records)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drops all snapshots."""
+        with self._lock:
+            self._entries.clear()
+
+_cache_lock = threading.Lock()
+_cache: Optional[SnapshotCache] = None
+
+def get_snapshot_cache(ttl: float = 5.0, max_entries: int = 32) -> SnapshotCache:
+    """Returns the process-wide SnapshotCache, replacing it when the ttl or size changes."""
+    global _cache
+    with _cache_lock:
+        if _cache is None or (_cache.ttl, _cache.max_entries) != (ttl, max_entries):
+            _cache = SnapshotCache(ttl=ttl, max_entries=max_entries)
+        return _cache
+
+def reset_snapshot_cache() -> None:
+    """Forgets the process-wide SnapshotCache."""
+    global _cache
+    with _cache_lock:
+        _cache = None
@@ -0,0 +1,233 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from src.settings import get_settings
+
+try:
+    # Optional: export spans to OpenTelemetry when the API package is installed
+    from opentelemetry import trace as _otel_trace
+except ImportError:
+    _otel_trace = None
+
+TRACE_EXPORTERS = ("log", "otel")
+
+class Span:
+    """
+    A timed stage of a query. Spans nest: a span started while another is current
+    becomes its child. Counters (e.g., bytes, tokens, objects) are summed over a
+    span's subtree when profiled.
+    Attributes:
+        name (str): Stage name, e.g. 'intent', 'k8s.list', 'llm.call'.
+        attributes (Dict[str, Any]): Descriptive attributes (namespace, intent, source, ...).
+        counters (Dict[str, float]): Numeric counters added while the span was current.
+        parent (Optional[Span]): Enclosing span, or None for a root span.
+        children (List[Span]): Child spans in start order.
+        trace_id (str): Shared by all spans of one root.
+        span_id (str): Unique id of this span.
+        start_ns (int): Wall-clock start (time.time_ns), for exporters.
+        duration_ms (Optional[float]): Elapsed milliseconds, None while the span is open.
+    """
+    def __init__(self, name: str, parent: Optional["Span"] = None, **attributes):
+        self.name = name
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self.counters: Dict[str, float] = {}
+        self.parent = parent
+        self.children: List["Span"] = []
+        self.span_id = os.urandom(8).hex()
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.start_ns = time.time_ns()
+        self.duration_ms: Optional[float] = None
+        self._start = time.perf_counter()
+        if parent is not None:
+            parent.children.append(self)
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the span started."""
+        return (time.perf_counter() - self._start) * 1000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add(self, counter: str, amount: float = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def end(self) -> None:
+        """Closes the span; a closed root span is handed to the exporters."""
+        if self.duration_ms is not None:
+            return
+        self.duration_ms = self.elapsed_ms()
+        if self.parent is None:
+            _export(self)
+
+    def totals(self) -> Dict[str, float]:
+        """Counters summed over this span and its descendants."""
+        totals = dict(self.counters)
+        for child in self.children:
+            for key, value in child.totals().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent is not None else None,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": None if self.duration_ms is None else round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "counters": self.counters,
+        }
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("kubeai_span", default=None)
+
+def current_span() -> Optional[Span]:
+    """Returns the span current in this context (thread or asyncio task), if any."""
+    return _current.get()
+
+def start_span(name: str, **attributes) -> Span:
+    """
+    Starts a child of the current span without making it current; call end() when done.
+    Use this for stages that span generator yields, where a context manager would leak
+    the span into the consumer's context.
+    """
+    return Span(name, parent=_current.get(), **attributes)
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """Times the enclosed block as a span that is current while it runs."""
+    new_span = start_span(name, **attributes)
+    token = _current.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.set_attribute("error", type(e).__name__)
+        raise
+    finally:
+        _current.reset(token)
+        new_span.end()
+
+def add_counter(counter: str, amount: float = 1) -> None:
+    """Adds to a counter on the current span; a no-op outside any span."""
+    current = _current.get()
+    if current is not None:
+        current.add(counter, amount)
+
+def set_attribute(key: str, value: Any) -> None:
+    """Sets an attribute on the current span; a no-op outside any span."""
+    current = _current.get()
+    if current is not None:
+        current.set_attribute(key, value)
+
+class LoggingExporter:
+    """Writes every span of a finished trace as one JSON log record (logger 'kubeai.trace')."""
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger("kubeai.trace")
+
+    def export(self, root: Span) -> None:
+        stack = [root]
+        while stack:
+            item = stack.pop()
+            self.logger.info(json.dumps(item.to_dict(), default=str))
+            stack.extend(reversed(item.children))
+
+class OpenTelemetryExporter:
+    """
+    Replays finished traces into an OpenTelemetry tracer, keeping the recorded timings
+    and parent/child structure. Requires the opentelemetry-api package; configure the
+    SDK and span processors as usual for your collector.
+    """
+    def __init__(self, tracer=None):
+        if _otel_trace is None:
+            raise ImportError("OpenTelemetryExporter requires the 'opentelemetry-api' package")
+        self.tracer = tracer or _otel_trace.get_tracer("kubeai")
+
+    def export(self, root: Span) -> None:
+        self._replay(root, None)
+
+    def _replay(self, item: Span, context) -> None:
+        attributes = {k: v for k, v in {**item.attributes, **item.counters}.items()
+                      if isinstance(v, (str, bool, int, float))}
+        otel_span = self.tracer.start_span(item.name, context=context, start_time=item.start_ns, attributes=attributes)
+        child_context = _otel_trace.set_span_in_context(otel_span)
+        for child in item.children:
+            self._replay(child, child_context)
+        otel_span.end(end_time=item.start_ns + int((item.duration_ms or 0) * 1_000_000))
+
+_exporters_lock = threading.Lock()
+_exporters: List[Any] = []
+_exporters_configured = False
+
+def add_exporter(exporter) -> None:
+    """Registers an exporter (any object with export(root_span)) for finished traces."""
+    with _exporters_lock:
+        _exporters.append(exporter)
+
+def remove_exporter(exporter) -> None:
+    with _exporters_lock:
+        if exporter in _exporters:
+            _exporters.remove(exporter)
+
+def _configure_from_settings() -> None:
+    """Installs the exporter named by the trace_exporter setting ('log' or 'otel'), once."""
+    global _exporters_configured
+    with _exporters_lock:
+        if _exporters_configured:
+            return
+        _exporters_configured = True
+    name = get_settings().trace_exporter
+    if not name:
+        return
+    if name not in TRACE_EXPORTERS:
+        raise ValueError(f"Unknown trace exporter: {name} (expected one of {', '.join(TRACE_EXPORTERS)})")
+    add_exporter(LoggingExporter() if name == "log" else OpenTelemetryExporter())
+
+def _export(root: Span) -> None:
+    try:
+        _configure_from_settings()
+    except Exception as e:
+        logging.getLogger("kubeai.trace").warning("Trace exporter setup failed: %s", e)
+    with _exporters_lock:
+        exporters = list(_exporters)
+    for exporter in exporters:
+        try:
+            exporter.export(root)
+        except Exception as e:
+            # Tracing must never fail a query
+            logging.getLogger("kubeai.trace").warning("Trace exporter %r failed: %s", exporter, e)
+
+def reset_tracing() -> None:
+    """Removes all exporters; the trace_exporter setting is read again on the next export."""
+    global _exporters_configured
+    with _exporters_lock:
+        _exporters.clear()
+        _exporters_configured = False
+
+def _format_counter(key: str, value: float) -> str:
+    return f"{key}={value:.1f}" if isinstance(value, float) and not value.is_integer() else f"{key}={int(value)}"
+
+def format_profile(root: Span) -> str:
+    """Renders a per-stage breakdown of a trace, e.g. for the CLI's --profile flag."""
+    lines = []
+    total = root.duration_ms or 0.0
+
+    def walk(item: Span, depth: int) -> None:
+        duration = item.duration_ms or 0.0
+        share = f"{duration / total * 100:5.1f}%" if total else "     -"
+        details = [f"{k}={v}" for k, v in item.attributes.items()]
+        details += [_format_counter(k, v) for k, v in sorted(item.counters.items())]
+        label = "  " * depth + item.name
+        lines.append(f"{label:<32} {duration:9.1f} ms {share}" + (f"  {' '.join(details)}" if details else ""))
+        for child in item.children:
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    totals = root.totals()
+    if totals:
+        lines.append("totals: " + " ".join(_format_counter(k, v) for k, v in sorted(totals.items())))
+    return "\n".join(lines)
@@ -0,0 +1,29 @@
+import pytest
+from src.informer import stop_all_informers
+from src.intent_cache import reset_intent_cache
+from src.intent_classifier import get_local_classifier
+from src.k8s_client import reset_kubernetes_client, reset_prefetch
+from src.llm_backend import reset_backend
+from src.settings import reset_settings
+from src.snapshot_cache import reset_snapshot_cache
+from src.tracing import reset_tracing
+
+@pytest.fixture(autouse=True)
+def reset_shared_state():
+    # Process-wide registries must not leak mocks between tests
+    reset_kubernetes_client()
+    reset_settings()
+    get_local_classifier().reset_stats()
+    reset_intent_cache()
+    reset_backend()
+    reset_prefetch()
+    reset_snapshot_cache()
+    reset_tracing()
+    yield
+    reset_prefetch()
+    reset_tracing()
+    stop_all_informers()
+    reset_intent_cache()
+    reset_backend()
+    reset_kubernetes_client()
+    reset_settings()
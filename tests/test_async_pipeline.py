@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from src.models import IntentModel, EntityModel, PodStatusModel, PodImageModel, NamespaceErrorModel
+from src.async_pipeline import (StageTimeoutError, get_intent_async, execute_command_async,
+                                generate_response_async, generate_response_stream_async)
+from src.settings import configure
+
+class _Chunks:
+    """Async iterable standing in for a streamed Gemini response."""
+    def __init__(self, texts, delay=0):
+        self.texts = texts
+        self.delay = delay
+
+    async def __aiter__(self):
+        for text in self.texts:
+            await asyncio.sleep(self.delay)
+            yield MagicMock(text=text)
+
+def _status_pod():
+    return PodStatusModel(name="nginx", namespace="default", status="Running", restarts=0, containers=[])
+
+@patch('src.llm_backend.GenerativeModel')
+def test_get_intent_async_local_fast_path_skips_gemini(mock_model):
+    intent = asyncio.run(get_intent_async("list pods in kube-system"))
+    assert intent.entities == [EntityModel(type="namespace", value="kube-system")]
+    mock_model.assert_not_called()
+
+@patch('src.llm_backend.GenerativeModel')
+def test_get_intent_async_calls_gemini_and_caches(mock_model):
+    configure(local_intent_enabled=False)
+    mock_model.return_value.generate_content_async = AsyncMock(
+        return_value=MagicMock(text='{"intent": "get_pod_status", "entities": []}'))
+    assert asyncio.run(get_intent_async("how are things")).intent == "get_pod_status"
+    assert asyncio.run(get_intent_async("how are things")).intent == "get_pod_status"
+    assert mock_model.return_value.generate_content_async.await_count == 1
+
+@patch('src.llm_backend.GenerativeModel')
+def test_get_intent_async_timeout(mock_model):
+    configure(local_intent_enabled=False)
+    async def slow(prompt, **kwargs):
+        await asyncio.sleep(1)
+    mock_model.return_value.generate_content_async = slow
+    with pytest.raises(StageTimeoutError) as excinfo:
+        asyncio.run(get_intent_async("how are things", timeout=0.01))
+    assert excinfo.value.stage == "intent"
+
+@patch('src.async_pipeline.execute_command', side_effect=TimeoutError("read timed out"))
+def test_timeouts_inside_a_stage_are_not_reported_as_stage_timeouts(mock_execute):
+    intent = IntentModel(intent="get_pod_status", entities=[])
+    with pytest.raises(TimeoutError, match="read timed out") as excinfo:
+        asyncio.run(execute_command_async(intent, timeout=5))
+    assert not isinstance(excinfo.value, StageTimeoutError)
+
+@patch('src.async_pipeline.execute_command')
+def test_execute_command_async_runs_in_thread(mock_execute):
+    mock_execute.return_value = [_status_pod()]
+    intent = IntentModel(intent="get_pod_status", entities=[])
+    async def both():
+        # Two commands run concurrently rather than back to back
+        return await asyncio.gather(execute_command_async(intent), execute_command_async(intent))
+    assert asyncio.run(both()) == [[_status_pod()], [_status_pod()]]
+
+@patch('src.llm_backend.GenerativeModel')
+def test_generate_response_stream_async_streams_chunks(mock_model):
+    mock_model.return_value.generate_content_async = AsyncMock(return_value=_Chunks(["one pod ", "running"]))
+    async def collect():
+        data = [_status_pod(), NamespaceErrorModel(namespace="prod", error="403 Forbidden")]
+        return [chunk async for chunk in generate_response_stream_async(data)]
+    assert asyncio.run(collect()) == ["one pod ", "running", "\n", "Namespace `prod` could not be queried: 403 Forbidden\n"]
+    assert mock_model.return_value.generate_content_async.call_args.kwargs == {"stream": True, "request_options": {"timeout": 30.0}}
+
+@patch('src.llm_backend.GenerativeModel')
+def test_generate_response_stream_async_chunk_timeout(mock_model):
+    mock_model.return_value.generate_content_async = AsyncMock(return_value=_Chunks(["slow"], delay=1))
+    with pytest.raises(StageTimeoutError, match="summary stage timed out"):
+        asyncio.run(generate_response_async([_status_pod()], timeout=0.01))
+
+@patch('src.llm_backend.GenerativeModel')
+def test_generate_response_async_formats_images_locally(mock_model):
+    data = [PodImageModel(name="a", namespace="prod", containers=[{"name": "app", "image": "app:1"}])]
+    assert "uses image `app:1" in asyncio.run(generate_response_async(data))
+    mock_model.assert_not_called()
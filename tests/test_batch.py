@@ -0,0 +1,72 @@
+import io
+import json
+from unittest.mock import patch, MagicMock, AsyncMock
+from src.batch import read_queries, run_batch
+from src.k8s_client import COMMAND_MAP, CommandExecutionError, _handle_get_pod_images, _handle_get_pod_status
+from src.models import PodImageModel
+
+PLAN_JSON = ('{"steps": [{"intent": "get_pod_status", "entities": [{"type": "namespace", "value": "prod"}]},'
+             ' {"intent": "get_pod_images", "entities": [{"type": "namespace", "value": "prod"}]}]}')
+
+def _run(queries, **kwargs):
+    out = io.StringIO()
+    failures = run_batch(queries, out, **kwargs)
+    return failures, [json.loads(line) for line in out.getvalue().splitlines()]
+
+def test_read_queries_skips_blanks_and_comments():
+    assert read_queries(io.StringIO("list pods\n\n# nightly\n  pod images in prod  \n")) == ["list pods", "pod images in prod"]
+
+@patch('src.async_pipeline.execute_command')
+def test_run_batch_deduplicates_identical_intents(mock_execute):
+    mock_execute.return_value = [PodImageModel(name="a", namespace="prod", containers=[{"name": "app", "image": "app:1"}])]
+    failures, records = _run(["pod images in prod", "show pod images in prod", "pod images in dev"], concurrency=2)
+    assert failures == 0
+    assert [r["index"] for r in records] == [0, 1, 2]
+    assert [r["deduplicated"] for r in records] == [False, True, False]
+    assert mock_execute.call_count == 2
+    assert "uses image `app:1" in records[1]["response"]
+    assert set(records[0]["timings_ms"]) == {"intent", "command", "summary", "total"}
+
+@patch('src.async_pipeline.execute_command')
+def test_run_batch_without_summary_outputs_data(mock_execute):
+    mock_execute.return_value = [PodImageModel(name="a", namespace="prod", containers=[])]
+    _, records = _run(["pod images in prod"], summarize=False)
+    assert records[0]["data"] == [{"name": "a", "namespace": "prod", "containers": []}]
+    assert "response" not in records[0]
+
+@patch('src.async_pipeline.execute_command', side_effect=CommandExecutionError("forbidden"))
+def test_run_batch_reports_errors_per_query(mock_execute):
+    failures, records = _run(["list pods in prod"])
+    assert failures == 1
+    assert records[0]["error"] == {"stage": "command", "type": "CommandExecutionError", "message": "forbidden"}
+
+def _list_pods(namespace, **kwargs):
+    pod = MagicMock()
+    pod.metadata.name = "web"
+    pod.metadata.namespace = namespace
+    pod.status.phase = "Running"
+    pod.status.container_statuses = []
+    container = MagicMock()
+    container.name = "app"
+    container.image = "app:1"
+    pod.spec.containers = [container]
+    pod_list = MagicMock()
+    pod_list.items = [pod]
+    pod_list.metadata._continue = None
+    pod_list.metadata.resource_version = "1"
+    return pod_list
+
+def test_run_batch_runs_every_step_of_a_multi_intent_query():
+    builtins = {"get_pod_status": _handle_get_pod_status, "get_pod_images": _handle_get_pod_images}
+    with patch("src.llm_backend.GenerativeModel") as mock_model, patch.dict(COMMAND_MAP, builtins), \
+            patch("src.k8s_client.KubernetesClient") as mock_client:
+        mock_model.return_value.generate_content_async = AsyncMock(return_value=MagicMock(text=PLAN_JSON))
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.side_effect = _list_pods
+        failures, records = _run(["how do the prod workloads look, and what do they run"], summarize=False)
+    assert failures == 0
+    steps = records[0]["steps"]
+    assert [(s["intent"], s["count"]) for s in steps] == [("get_pod_status", 1), ("get_pod_images", 1)]
+    assert steps[1]["data"][0]["containers"] == [{"name": "app", "image": "app:1"}]
+    # Both steps read the same pods, so the plan costs one list request
+    assert api.list_namespaced_pod.call_count == 1
@@ -0,0 +1,29 @@
+from benchmarks.bench_suite import compare, percentile, run_scenario
+
+FAST = {"pods": 30, "iterations": 3, "warmup": 1, "k8s_latency": 0.0,
+        "llm_latency": 0.0, "tokens_per_sec": 0.0, "output_tokens": 20}
+
+def test_percentile_interpolates():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50.5
+    assert percentile(samples, 99) == 99.01
+    assert percentile([7.0], 95) == 7.0
+
+def test_compare_reports_only_growth_beyond_threshold():
+    baseline = {"scenarios": {"pipeline": {"p50_ms": 100.0, "llm_prompt_tokens": 1000, "k8s_requests": 1.0}}}
+    current = {"scenarios": {"pipeline": {"p50_ms": 110.0, "llm_prompt_tokens": 1500, "k8s_requests": 1.0},
+                             "new_scenario": {"p50_ms": 1.0}}}
+    assert compare(baseline, current, threshold=0.2) == ["pipeline.llm_prompt_tokens: 1000 -> 1500 (+50%)"]
+
+def test_execute_command_scenario_hits_fake_api_once_per_iteration():
+    result = run_scenario("execute_command", FAST)
+    assert result["iterations"] == 3
+    assert result["k8s_requests"] == 1.0
+    assert result["llm_calls"] == 0
+    assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+
+def test_pipeline_scenario_summarizes_with_fake_llm():
+    result = run_scenario("pipeline", FAST)
+    assert result["k8s_requests"] == 1.0
+    assert result["llm_calls"] >= 1
+    assert result["llm_prompt_tokens"] > 0
@@ -0,0 +1,89 @@
+from unittest.mock import patch, MagicMock
+from src.conversation import (
+    compact, conversation_context, is_follow_up, record_turn, resolve_follow_up, result_summary,
+)
+from src.models import ConversationState, EntityModel, IntentModel, PodStatusModel
+from src.nlp_core import get_intent, intent_prompt
+from src.results import PodRow, PodTable
+
+def _intent(name, *entities):
+    return IntentModel(intent=name, entities=[EntityModel(type=t, value=v) for t, v in entities])
+
+def _table(*phases):
+    return PodTable(PodStatusModel, [PodRow(f"pod-{i}", "prod", phase) for i, phase in enumerate(phases)])
+
+def test_is_follow_up():
+    assert is_follow_up("what images do those use?")
+    assert is_follow_up("any restarts in the same namespace")
+    assert is_follow_up("what changed?")
+    assert is_follow_up("what are their images?")
+    assert not is_follow_up("list pods in prod")
+    assert not is_follow_up("are there failing pods?")
+
+def test_record_turn_stores_compact_turn_and_slots():
+    state = ConversationState(session_id="s")
+    intent = _intent("get_pod_status", ("namespace", "prod"), ("label_selector", "app=web"), ("resource_type", "pods"))
+    record_turn(state, "show the web pods in prod " + "x" * 200, intent, _table("Running", "Failed"))
+    turn = state.history[0]
+    assert len(turn["query"]) == 80
+    assert turn["entities"] == [{"type": "namespace", "value": "prod"}, {"type": "label_selector", "value": "app=web"}]
+    assert turn["result"] == "2 pods: 1 Failed, 1 Running"
+    assert state.slots == {"intent": "get_pod_status", "namespace": "prod", "label_selector": "app=web",
+                           "result": "2 pods: 1 Failed, 1 Running"}
+    assert result_summary(iter([])) is None
+
+def test_resolve_follow_up_inherits_namespace_and_selectors():
+    state = ConversationState(session_id="s")
+    record_turn(state, "web pods in prod", _intent("get_pod_status", ("namespace", "prod"), ("label_selector", "app=web")))
+    resolved = resolve_follow_up(state, "what images do those use?", _intent("get_pod_images"))
+    assert [(e.type, e.value) for e in resolved.entities] == [("namespace", "prod"), ("label_selector", "app=web")]
+    # An explicit namespace, or a query that is not a follow-up, is left alone
+    explicit = _intent("get_pod_images", ("namespace", "staging"))
+    assert resolve_follow_up(state, "and those in staging?", explicit) is explicit
+    assert resolve_follow_up(state, "list pod images", _intent("get_pod_images")).entities == []
+
+def test_history_is_bounded_and_older_turns_go_to_digest():
+    state = ConversationState(session_id="s", max_turns=3, max_tokens=10_000)
+    for i in range(20):
+        record_turn(state, f"pods in ns-{i % 7}", _intent("get_pod_status", ("namespace", f"ns-{i % 7}")))
+    assert [turn["query"] for turn in state.history] == ["pods in ns-3", "pods in ns-4", "pods in ns-5"]
+    assert len(state.digest) <= 5
+    assert state.slots["namespace"] == "ns-5"
+    # The token budget applies as well, but the latest turn is always kept
+    state.max_tokens = 1
+    compact(state)
+    assert [turn["query"] for turn in state.history] == ["pods in ns-5"]
+
+def test_conversation_context_stays_constant_size():
+    state = ConversationState(session_id="s", max_turns=4, max_tokens=10_000)
+    assert conversation_context(state, "what about those?") is None
+    sizes = []
+    for i in range(30):
+        record_turn(state, f"failing pods in namespace-{i}",
+                    _intent("get_pod_status", ("namespace", f"namespace-{i}"), ("field_selector", "status.phase=Failed")),
+                    _table("Failed"))
+        sizes.append(len(conversation_context(state, "what about those?")))
+    # Only the digits of the namespace names differ once the window is full
+    assert max(sizes) < sizes[9] * 1.05
+    assert conversation_context(state, "list pods in prod") is None
+
+def test_get_intent_with_context_adds_it_to_prompt_and_skips_cache():
+    with patch("src.llm_backend.GenerativeModel") as mock_model:
+        mock_model.return_value.generate_content.return_value = MagicMock(
+            text='{"intent": "get_pod_images", "entities": []}')
+        get_intent("what do those run", context="Current: namespace=prod")
+        get_intent("what do those run", context="Current: namespace=prod")
+    prompt = mock_model.return_value.generate_content.call_args[0][0]
+    assert prompt == intent_prompt("what do those run", "Current: namespace=prod")
+    assert "Current: namespace=prod" in prompt and prompt.endswith("User query: 'what do those run'")
+    assert mock_model.return_value.generate_content.call_count == 2
+
+def test_follow_ups_are_not_prefetched():
+    import app
+    state = ConversationState(session_id="s")
+    with patch("src.k8s_client.prefetch_pods") as mock_prefetch, \
+            patch("src.nlp_core.get_plan", side_effect=ValueError("offline")):
+        app.answer("what images do those pods use?", state)
+        mock_prefetch.assert_not_called()
+        app.answer("are there failing pods?", state)
+        mock_prefetch.assert_called_once_with("are there failing pods?")
@@ -0,0 +1,71 @@
+import asyncio
+import socket
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from src.daemon import start_daemon, _remove_stale_socket
+from src.daemon_client import query_daemon, request_daemon, default_socket_path, main
+from src.models import PodImageModel
+
+def _serving(path, client_call):
+    """Runs client_call (blocking) in a thread against a daemon listening on path."""
+    async def scenario():
+        server = await start_daemon(path)
+        async with server:
+            return await asyncio.to_thread(client_call)
+    return asyncio.run(scenario())
+
+@patch('src.async_pipeline.execute_command')
+def test_daemon_answers_queries_over_unix_socket(mock_execute, tmp_path):
+    mock_execute.return_value = [PodImageModel(name="a", namespace="prod", containers=[{"name": "app", "image": "app:1"}])]
+    path = str(tmp_path / "kubeai.sock")
+    record = _serving(path, lambda: query_daemon("pod images in prod", path=path))
+    assert record["intent"] == "get_pod_images"
+    assert "uses image `app:1" in record["response"]
+
+@patch('src.async_pipeline.execute_plan')
+def test_daemon_answers_every_step_of_a_multi_intent_query(mock_execute_plan, tmp_path, capsys):
+    mock_execute_plan.return_value = [
+        [PodImageModel(name="a", namespace="prod", containers=[{"name": "app", "image": "app:1"}])],
+        [PodImageModel(name="b", namespace="dev", containers=[{"name": "db", "image": "db:2"}])],
+    ]
+    plan = ('{"steps": [{"intent": "get_pod_images", "entities": [{"type": "namespace", "value": "prod"}]},'
+            ' {"intent": "get_pod_images", "entities": [{"type": "namespace", "value": "dev"}]}]}')
+    path = str(tmp_path / "kubeai.sock")
+    with patch("src.llm_backend.GenerativeModel") as mock_model:
+        mock_model.return_value.generate_content_async = AsyncMock(return_value=MagicMock(text=plan))
+        record = _serving(path, lambda: query_daemon("what runs in prod, and what about dev", path=path))
+        assert _serving(path, lambda: main(["what runs in prod, and what about dev", "--socket", path])) == 0
+    assert [step["intent"] for step in record["steps"]] == ["get_pod_images", "get_pod_images"]
+    assert "uses image `app:1" in record["steps"][0]["response"]
+    assert "uses image `db:2" in record["steps"][1]["response"]
+    output = capsys.readouterr().out
+    assert output.count("[get_pod_images]") == 2 and "db:2" in output
+
+def test_daemon_ping_and_invalid_request(tmp_path):
+    path = str(tmp_path / "kubeai.sock")
+    replies = _serving(path, lambda: [request_daemon({"op": "ping"}, path=path), request_daemon({}, path=path)])
+    assert replies[0]["ok"] is True
+    assert replies[1]["error"]["stage"] == "request"
+
+def test_remove_stale_socket(tmp_path):
+    path = tmp_path / "kubeai.sock"
+    # A socket bound by a process that never listened (or has exited) refuses connections
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(str(path))
+    _remove_stale_socket(str(path))
+    assert not path.exists()
+
+def test_remove_stale_socket_keeps_other_files(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("keep me")
+    with pytest.raises(RuntimeError, match="is not a socket"):
+        _remove_stale_socket(str(path))
+    assert path.read_text() == "keep me"
+
+def test_default_socket_path_env(monkeypatch):
+    monkeypatch.setenv("KUBEAI_DAEMON_SOCKET", "/run/kubeai/test.sock")
+    assert default_socket_path() == "/run/kubeai/test.sock"
+
+def test_client_reports_missing_daemon(tmp_path, capsys):
+    assert main(["list", "pods", "--socket", str(tmp_path / "missing.sock")]) == 2
+    assert "Could not reach kubeai daemon" in capsys.readouterr().err
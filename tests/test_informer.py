@@ -0,0 +1,71 @@
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+from kubernetes.client.rest import ApiException
+from src.informer import PodInformer, get_pod_informer
+
+def _pod(name, namespace="prod", resource_version="1"):
+    pod = MagicMock()
+    pod.metadata.name = name
+    pod.metadata.namespace = namespace
+    pod.metadata.resource_version = resource_version
+    return pod
+
+def _api(pods, resource_version="10"):
+    api = MagicMock()
+    pod_list = MagicMock()
+    pod_list.items = pods
+    pod_list.metadata.resource_version = resource_version
+    api.list_namespaced_pod.return_value = pod_list
+    return api
+
+def test_informer_initial_list_builds_index():
+    api = _api([_pod("web-b"), _pod("web-a")])
+    informer = PodInformer(api, "prod").start(background=False)
+    api.list_namespaced_pod.assert_called_once_with(namespace="prod")
+    assert [p.metadata.name for p in informer.list_pods()] == ["web-a", "web-b"]
+    assert informer.resource_version == "10"
+    assert informer.get_pod("web-a").metadata.name == "web-a"
+
+def test_informer_initial_list_error_propagates():
+    api = MagicMock()
+    api.list_namespaced_pod.side_effect = ApiException(status=403, reason="Forbidden")
+    with pytest.raises(ApiException):
+        PodInformer(api, "prod").start(background=False)
+
+def _watch_response(*events):
+    """A streamed watch response as the API server sends it: one JSON event per line."""
+    resp = MagicMock()
+    resp.status = 200
+    resp.stream.return_value = iter([json.dumps(e).encode() + b"\n" for e in events])
+    return resp
+
+def _pod_event(kind, name, resource_version):
+    return {"type": kind, "object": {"apiVersion": "v1", "kind": "Pod", "metadata": {
+        "name": name, "namespace": "prod", "resourceVersion": resource_version}}}
+
+def test_informer_applies_watch_events_from_resource_version():
+    api = _api([_pod("web-a")])
+    informer = PodInformer(api, "prod").start(background=False)
+    calls = []
+
+    def list_namespaced_pod(**kwargs):
+        """:rtype: V1PodList"""
+        calls.append(kwargs)
+        # A real bookmark carries only the resourceVersion; the client leaves its object a dict
+        return _watch_response(
+            _pod_event("ADDED", "web-b", "11"), _pod_event("DELETED", "web-a", "12"),
+            {"type": "BOOKMARK", "object": {"kind": "Pod", "apiVersion": "v1", "metadata": {"resourceVersion": "13"}}})
+    api.list_namespaced_pod = list_namespaced_pod
+    informer._watch_once()
+    assert calls[0]["resource_version"] == "10" and calls[0]["watch"] is True
+    assert [p.metadata.name for p in informer.list_pods()] == ["web-b"]
+    assert informer.resource_version == "13"
+
+def test_get_pod_informer_reuses_running_informer():
+    api = _api([_pod("web-a")])
+    with patch("src.informer.watch.Watch"):
+        first = get_pod_informer(api, "prod")
+        second = get_pod_informer(api, "prod")
+    assert first is second
+    assert api.list_namespaced_pod.call_count >= 1
@@ -0,0 +1,46 @@
+from src.intent_cache import IntentCache, cache_version, normalize_query
+from src.models import IntentModel, EntityModel
+
+def _intent(namespace="prod"):
+    return IntentModel(intent="get_pod_status", entities=[EntityModel(type="namespace", value=namespace)])
+
+def test_normalize_query_collapses_case_whitespace_and_punctuation():
+    assert normalize_query("  Show   PODS in Prod?! ") == "show pods in prod"
+    assert normalize_query("pods with app=Nginx.") == "pods with app=Nginx"
+
+def test_cache_version_changes_with_prompt_and_intents():
+    base = cache_version("prompt", ["a", "b"])
+    assert base == cache_version("prompt", ["b", "a"])
+    assert base != cache_version("prompt v2", ["a", "b"])
+    assert base != cache_version("prompt", ["a", "b", "c"])
+
+def test_intent_cache_hit_on_normalized_query():
+    cache = IntentCache("v1")
+    cache.put("Show pods in prod", _intent())
+    assert cache.get("show   pods in PROD?") == _intent()
+    assert cache.get("show pods in staging") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_intent_cache_evicts_least_recently_used():
+    cache = IntentCache("v1", max_entries=2)
+    cache.put("a", _intent("a"))
+    cache.put("b", _intent("b"))
+    cache.get("a")
+    cache.put("c", _intent("c"))
+    assert cache.get("b") is None
+    assert cache.get("a") == _intent("a")
+
+def test_intent_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "intents.db")
+    first = IntentCache("v1", path=path)
+    first.put("show pods in prod", _intent())
+    first.close()
+    assert IntentCache("v1", path=path).get("show pods in prod") == _intent()
+
+def test_intent_cache_drops_entries_from_other_versions(tmp_path):
+    path = str(tmp_path / "intents.db")
+    first = IntentCache("v1", path=path)
+    first.put("show pods in prod", _intent())
+    first.close()
+    assert IntentCache("v2", path=path).get("show pods in prod") is None
+    assert IntentCache("v1", path=path).get("show pods in prod") is None
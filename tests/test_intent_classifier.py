@@ -0,0 +1,70 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from src.intent_classifier import LocalIntentClassifier
+from src.nlp_core import get_intent
+
+@pytest.mark.parametrize("query,intent,entities", [
+    ("list pods in kube-system", "get_pod_status", [("namespace", "kube-system")]),
+    ("What images are the pods using in the default namespace?", "get_pod_images", [("namespace", "default")]),
+    ("Which container images do the pods use?", "get_pod_images", [("resource_type", "pods")]),
+    ("show failing pods in prod", "get_pod_status", [("namespace", "prod"), ("field_selector", "status.phase=Failed")]),
+    ("which pods are failing in prod", "get_pod_status", [("namespace", "prod"), ("field_selector", "status.phase=Failed")]),
+    ("pods in prod and staging", "get_pod_status", [("namespace", "prod"), ("namespace", "staging")]),
+    ("pods in all namespaces", "get_pod_status", [("all_namespaces", "true")]),
+    ("pods on node worker-1", "get_pod_status", [("field_selector", "spec.nodeName=worker-1")]),
+    ("pod images with app=Nginx in staging", "get_pod_images", [("namespace", "staging"), ("label_selector", "app=Nginx")]),
+    ("list pods in ns kube-system", "get_pod_status", [("namespace", "kube-system")]),
+    ("pods with status.phase=Failed in prod", "get_pod_status", [("namespace", "prod"), ("field_selector", "status.phase=Failed")]),
+    ("list pods with spec.nodeName=node-1", "get_pod_status", [("field_selector", "spec.nodeName=node-1")]),
+])
+def test_classifier_resolves_common_queries(query, intent, entities):
+    result = LocalIntentClassifier().classify(query)
+    assert result is not None
+    assert result.intent == intent
+    assert [(e.type, e.value) for e in result.entities] == entities
+
+@pytest.mark.parametrize("query", [
+    "list nodes",
+    "why is my pod crashing",
+    "how many pods are in the cluster",
+    "show pod status and images in prod",
+    "tell me something interesting about pods and the weather",
+    "list pods not in kube-system",
+    "list all pods except those in kube-system",
+    "show pods in json",
+    "list pods in order",
+    "show pods in prod in detail",
+    "pods in prod from yesterday",
+    "Which container images are running?",
+    "list pods in prod and their images",
+    "show pods in staging and images",
+    "list pods in prod and status",
+])
+def test_classifier_defers_uncertain_queries(query):
+    assert LocalIntentClassifier().classify(query) is None
+
+def test_classifier_does_not_trust_invalid_namespace_names():
+    _, entities, confidence = LocalIntentClassifier().score("pods in " + "a" * 64)
+    assert entities[0].type == "namespace"
+    assert confidence < 0.8
+
+@patch("src.llm_backend.GenerativeModel")
+def test_negated_scope_goes_to_gemini(mock_model):
+    mock_model.return_value.generate_content.return_value = MagicMock(text='{"intent": "get_pod_status", "entities": []}')
+    assert get_intent("list pods not in kube-system").entities == []
+    assert mock_model.return_value.generate_content.call_count == 1
+
+def test_classifier_counts_hits_and_misses():
+    classifier = LocalIntentClassifier()
+    classifier.classify("list pods in prod")
+    classifier.classify("list nodes")
+    classifier.classify("list nodes")
+    assert classifier.stats() == {"hits": 1, "misses": 2}
+    classifier.reset_stats()
+    assert classifier.stats() == {"hits": 0, "misses": 0}
+
+def test_classifier_threshold_is_respected():
+    classifier = LocalIntentClassifier()
+    _, _, confidence = classifier.score("pods in prod")
+    assert 0 < confidence < 1
+    assert classifier.classify("pods in prod", threshold=confidence + 0.01) is None
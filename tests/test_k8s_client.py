@@ -1,7 +1,8 @@
+from collections.abc import Sequence
 import pytest
 from unittest.mock import patch, MagicMock
 from kubernetes.config.config_exception import ConfigException
-from src.k8s_client import KubernetesClient, KubeconfigError, execute_command, CommandExecutionError, COMMAND_MAP, _extract_parameters, _handle_get_pod_status, _handle_get_pod_images
+from src.k8s_client import KubernetesClient, KubeconfigError, execute_command, execute_command_stream, CommandExecutionError, COMMAND_MAP, _extract_parameters, _handle_get_pod_status, _handle_get_pod_images, get_kubernetes_client
 from src.models import IntentModel, EntityModel, PodStatusModel, PodImageModel
 from pydantic import BaseModel
 
@@ -25,6 +26,36 @@ def test_kubernetes_client_api_methods(mock_load):
     assert isinstance(client.get_core_v1_api(), CoreV1Api)
     assert isinstance(client.get_apps_v1_api(), AppsV1Api)
 
+@patch('k8s_client.config.load_kube_config')
+def test_kubernetes_client_apis_share_connection_pool(mock_load):
+    client = KubernetesClient(pool_maxsize=7)
+    assert client.get_core_v1_api() is client.get_core_v1_api()
+    assert client.get_core_v1_api().api_client is client.get_apps_v1_api().api_client
+    assert client.api_client.configuration.connection_pool_maxsize == 7
+    assert client.api_client.configuration.socket_options
+
+@patch('k8s_client.config.load_kube_config')
+def test_get_kubernetes_client_loads_config_once(mock_load, tmp_path, monkeypatch):
+    kubeconfig = tmp_path / "config"
+    kubeconfig.write_text("current-context: a")
+    monkeypatch.setenv("KUBECONFIG", str(kubeconfig))
+    first = get_kubernetes_client()
+    assert get_kubernetes_client() is first
+    assert mock_load.call_count == 1
+
+@patch('k8s_client.config.load_kube_config')
+def test_get_kubernetes_client_reloads_on_kubeconfig_change(mock_load, tmp_path, monkeypatch):
+    import os
+    kubeconfig = tmp_path / "config"
+    kubeconfig.write_text("current-context: a")
+    monkeypatch.setenv("KUBECONFIG", str(kubeconfig))
+    first = get_kubernetes_client()
+    kubeconfig.write_text("current-context: b")
+    os.utime(kubeconfig, ns=(0, 0))
+    second = get_kubernetes_client()
+    assert second is not first
+    assert mock_load.call_count == 2
+
 def test_execute_command_unknown_intent():
     intent = IntentModel(intent="unknown_intent", entities=[])
     with pytest.raises(NotImplementedError, match="No handler implemented for intent"):
@@ -61,11 +92,12 @@ def test_handle_get_pod_status_calls_api():
         mock_pod.status.container_statuses = [cs1, cs2]
         mock_pod_list = MagicMock()
         mock_pod_list.items = [mock_pod]
+        mock_pod_list.metadata._continue = None
         mock_api.get_core_v1_api.return_value = mock_api
         mock_api.list_namespaced_pod.return_value = mock_pod_list
         mock_client.return_value.get_core_v1_api.return_value = mock_api
         result = _handle_get_pod_status(entities)
-        mock_api.list_namespaced_pod.assert_called_once_with(namespace="test-ns")
+        mock_api.list_namespaced_pod.assert_called_once_with(namespace="test-ns", limit=500)
         assert len(result) == 1
         pod = result[0]
         assert pod.name == "nginx"
@@ -89,11 +121,12 @@ def test_handle_get_pod_status_returns_models():
         mock_pod.status.container_statuses = [cs1, cs2]
         mock_pod_list = MagicMock()
         mock_pod_list.items = [mock_pod]
+        mock_pod_list.metadata._continue = None
         mock_api.get_core_v1_api.return_value = mock_api
         mock_api.list_namespaced_pod.return_value = mock_pod_list
         mock_client.return_value.get_core_v1_api.return_value = mock_api
         result = _handle_get_pod_status(entities)
-        assert isinstance(result, list)
+        assert isinstance(result, Sequence)
         assert isinstance(result[0], PodStatusModel)
         assert result[0].name == "nginx"
         assert result[0].namespace == "test-ns"
@@ -144,6 +177,7 @@ def test_handle_get_pod_images_returns_models():
         mock_pod.spec.containers = [c1]
         mock_pod_list = MagicMock()
         mock_pod_list.items = [mock_pod]
+        mock_pod_list.metadata._continue = None
         mock_client.return_value.get_core_v1_api.return_value.list_namespaced_pod.return_value = mock_pod_list
         result = _handle_get_pod_images(entities)
         assert isinstance(result[0], PodImageModel)
@@ -165,6 +199,7 @@ def test_handle_get_pod_images_multiple_containers():
         mock_pod.spec.containers = [c1, c2]
         mock_pod_list = MagicMock()
         mock_pod_list.items = [mock_pod]
+        mock_pod_list.metadata._continue = None
         mock_client.return_value.get_core_v1_api.return_value.list_namespaced_pod.return_value = mock_pod_list
         result = _handle_get_pod_images(entities)
         assert len(result[0].containers) == 2
@@ -177,6 +212,7 @@ def test_handle_get_pod_images_empty():
         mock_api = MagicMock()
         mock_pod_list = MagicMock()
         mock_pod_list.items = []
+        mock_pod_list.metadata._continue = None
         mock_client.return_value.get_core_v1_api.return_value.list_namespaced_pod.return_value = mock_pod_list
         result = _handle_get_pod_images(entities)
         assert result == []
@@ -189,4 +225,263 @@ def test_execute_command_get_pod_images():
     result = execute_command(intent)
     assert isinstance(result, list)
     assert isinstance(result[0], PodImageModel)
-    assert result[0].containers[0]["image"] == "nginx:1.14.2" 
\ No newline at end of file
+    assert result[0].containers[0]["image"] == "nginx:1.14.2" 
+def test_handle_get_pod_status_reads_from_informer_when_enabled():
+    from src.settings import configure
+    configure(informer_enabled=True)
+    entities = [EntityModel(type="namespace", value="test-ns")]
+    mock_pod = MagicMock()
+    mock_pod.metadata.name = "nginx"
+    mock_pod.metadata.namespace = "test-ns"
+    mock_pod.status.phase = "Running"
+    mock_pod.status.container_statuses = []
+    with patch("src.k8s_client.KubernetesClient") as mock_client, \
+         patch("src.k8s_client.get_pod_informer") as mock_informer:
+        mock_informer.return_value.list_pods.return_value = [mock_pod]
+        result = _handle_get_pod_status(entities)
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.assert_not_called()
+        assert mock_informer.call_args.args[1] == "test-ns"
+        assert result[0].name == "nginx"
+
+def _pod_page(names, continue_token=None):
+    page = MagicMock()
+    page.items = []
+    for name in names:
+        pod = MagicMock()
+        pod.metadata.name = name
+        pod.metadata.namespace = "test-ns"
+        c1 = MagicMock()
+        c1.name = "app"
+        c1.image = "app:1.0"
+        pod.spec.containers = [c1]
+        page.items.append(pod)
+    page.metadata._continue = continue_token
+    return page
+
+def test_handle_get_pod_images_pages_with_continue_token():
+    from src.settings import configure
+    configure(page_size=2)
+    entities = [EntityModel(type="namespace", value="test-ns")]
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.side_effect = [_pod_page(["a", "b"], "tok"), _pod_page(["c"])]
+        result = _handle_get_pod_images(entities)
+        assert [p.name for p in result] == ["a", "b", "c"]
+        assert api.list_namespaced_pod.call_args_list[0].kwargs == {"namespace": "test-ns", "limit": 2}
+        assert api.list_namespaced_pod.call_args_list[1].kwargs == {"namespace": "test-ns", "limit": 2, "_continue": "tok"}
+
+def test_execute_command_stream_fetches_pages_lazily():
+    intent = IntentModel(intent="get_pod_images", entities=[EntityModel(type="namespace", value="test-ns")])
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.side_effect = [_pod_page(["a"], "tok"), _pod_page(["b"])]
+        stream = execute_command_stream(intent)
+        assert api.list_namespaced_pod.call_count == 1
+        assert next(stream).name == "a"
+        assert [p.name for p in stream] == ["b"]
+        assert api.list_namespaced_pod.call_count == 2
+
+def test_execute_command_stream_raises_first_page_errors_eagerly():
+    from kubernetes.client.rest import ApiException
+    intent = IntentModel(intent="get_pod_images", entities=[EntityModel(type="namespace", value="test-ns")])
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.side_effect = ApiException("forbidden")
+        with pytest.raises(CommandExecutionError, match="forbidden"):
+            execute_command_stream(intent)
+
+def test_handle_get_pod_status_raw_decode_skips_model_deserialization():
+    import json
+    from src.settings import configure
+    configure(raw_decode=True)
+    body = {
+        "metadata": {"continue": ""},
+        "items": [{
+            "metadata": {"name": "nginx", "namespace": "test-ns"},
+            "spec": {"containers": [{"name": "nginx", "image": "nginx:1.14.2"}]},
+            "status": {"phase": "Running", "containerStatuses": [{"restartCount": 2}, {"restartCount": 1}]},
+        }, {
+            "metadata": {"name": "pending", "namespace": "test-ns"},
+            "spec": {"containers": [{"name": "app", "image": "app:1"}]},
+            "status": {"phase": "Pending"},
+        }],
+    }
+    entities = [EntityModel(type="namespace", value="test-ns")]
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.return_value.data = json.dumps(body).encode()
+        result = _handle_get_pod_status(entities)
+        assert api.list_namespaced_pod.call_args.kwargs["_preload_content"] is False
+        api.list_namespaced_pod.return_value.release_conn.assert_called_once()
+    assert result[0] == PodStatusModel(name="nginx", namespace="test-ns", status="Running", restarts=3,
+                                       containers=[{"name": "nginx", "image": "nginx:1.14.2"}])
+    assert result[1].restarts == 0
+    assert result[1].containers == []
+
+def test_extract_parameters_joins_selector_entities():
+    entities = [
+        EntityModel(type="namespace", value="prod"),
+        EntityModel(type="label_selector", value="app=nginx"),
+        EntityModel(type="label_selector", value="tier=web"),
+        EntityModel(type="field_selector", value="status.phase=Failed"),
+    ]
+    params = _extract_parameters(entities, ["namespace"], ["label_selector", "field_selector"])
+    assert params == {"namespace": "prod", "label_selector": "app=nginx,tier=web", "field_selector": "status.phase=Failed"}
+
+def test_extract_parameters_omits_missing_optional():
+    params = _extract_parameters([], ["namespace"], ["label_selector", "field_selector"])
+    assert params == {"namespace": "default"}
+
+def test_handle_get_pod_status_passes_selectors_to_api():
+    entities = [EntityModel(type="namespace", value="prod"), EntityModel(type="field_selector", value="status.phase=Failed")]
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.return_value = _pod_page([])
+        _handle_get_pod_status(entities)
+        api.list_namespaced_pod.assert_called_once_with(namespace="prod", limit=500, field_selector="status.phase=Failed")
+
+def test_extract_namespaces():
+    from src.k8s_client import _extract_namespaces
+    assert _extract_namespaces([]) == ["default"]
+    assert _extract_namespaces([EntityModel(type="namespace", value="prod"), EntityModel(type="namespace", value="staging"),
+                                EntityModel(type="namespace", value="prod")]) == ["prod", "staging"]
+    assert _extract_namespaces([EntityModel(type="all_namespaces", value="true")]) is None
+    assert _extract_namespaces([EntityModel(type="namespace", value="all")]) is None
+
+def test_handle_get_pod_status_all_namespaces_uses_cluster_wide_list():
+    entities = [EntityModel(type="all_namespaces", value="true")]
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_pod_for_all_namespaces.return_value = _pod_page(["a"])
+        result = _handle_get_pod_images(entities)
+        api.list_pod_for_all_namespaces.assert_called_once_with(limit=500)
+        api.list_namespaced_pod.assert_not_called()
+        assert [p.name for p in result] == ["a"]
+
+def test_handle_get_pod_images_fans_out_namespaces_in_stable_order():
+    import time
+    from kubernetes.client.rest import ApiException
+    from src.models import NamespaceErrorModel
+    def list_namespaced_pod(namespace, **kwargs):
+        if namespace == "forbidden":
+            raise ApiException(status=403, reason="Forbidden")
+        if namespace == "slow":
+            time.sleep(0.05)
+        return _pod_page([f"{namespace}-pod"])
+    entities = [EntityModel(type="namespace", value=ns) for ns in ("slow", "forbidden", "fast")]
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.side_effect = list_namespaced_pod
+        result = _handle_get_pod_images(entities)
+    assert [p.name for p in result if isinstance(p, PodImageModel)] == ["slow-pod", "fast-pod"]
+    assert result[1] == NamespaceErrorModel(namespace="forbidden", error="403 Forbidden")
+
+def test_prefetch_pods_is_handed_to_matching_handler():
+    from src.k8s_client import prefetch_pods
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.return_value = _pod_page(["a"])
+        assert prefetch_pods("show me the pods in test-ns") is True
+        result = _handle_get_pod_images([EntityModel(type="namespace", value="test-ns")])
+    assert [pod.name for pod in result] == ["a"]
+    api.list_namespaced_pod.assert_called_once_with(namespace="test-ns", limit=500)
+
+def test_prefetch_pods_discarded_when_entities_disagree():
+    from src.k8s_client import prefetch_pods, _prefetch_slot
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.side_effect = lambda namespace, **kwargs: _pod_page([namespace])
+        assert prefetch_pods("list pods in prod") is True
+        result = _handle_get_pod_images([EntityModel(type="namespace", value="staging")])
+    assert [pod.name for pod in result] == ["staging"]
+    assert _prefetch_slot.misses == 1
+
+def test_prefetch_drops_lists_over_the_record_cap():
+    from src.k8s_client import _prefetch_slot, _pod_query_key, prefetch_pods
+    from src.settings import configure
+    from src.snapshot_cache import get_snapshot_cache
+    configure(result_cache_max_records=2)
+    entities = [EntityModel(type="namespace", value="test-ns")]
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.return_value = _pod_page(["a", "b", "c"])
+        assert prefetch_pods("show me the pods in test-ns") is True
+        result = _handle_get_pod_images(entities)
+    assert [pod.name for pod in result] == ["a", "b", "c"]
+    # The prefetch was dropped at the cap, so the handler listed (and streamed) on its own
+    assert _prefetch_slot.misses == 1
+    assert api.list_namespaced_pod.call_count == 2
+    assert get_snapshot_cache(5.0, 32).get(_pod_query_key("test-ns", {})) is None
+
+def test_prefetch_pods_skips_unlikely_queries():
+    from src.k8s_client import prefetch_pods
+    from src.settings import configure
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        assert prefetch_pods("restart the nginx deployment") is False
+        assert prefetch_pods("list pods in prod and staging") is False
+        configure(prefetch_enabled=False)
+        assert prefetch_pods("list pods in prod") is False
+    mock_client.assert_not_called()
+
+def _status_page(names):
+    page = _pod_page(names)
+    for pod in page.items:
+        pod.status.phase = "Running"
+        pod.status.container_statuses = []
+    return page
+
+def test_pod_status_and_images_share_one_cached_list():
+    entities = [EntityModel(type="namespace", value="test-ns")]
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.return_value = _status_page(["a", "b"])
+        statuses = _handle_get_pod_status(entities)
+        images = _handle_get_pod_images(entities)
+        other = _handle_get_pod_images([EntityModel(type="namespace", value="other")])
+    assert [p.name for p in statuses] == [p.name for p in images] == ["a", "b"]
+    assert images[0].containers == [{"name": "app", "image": "app:1.0"}]
+    assert len(other) == 2
+    # The second namespace is a different key and is fetched separately
+    assert api.list_namespaced_pod.call_count == 2
+
+def test_result_cache_disabled_with_zero_ttl():
+    from src.settings import configure
+    configure(result_cache_ttl=0)
+    entities = [EntityModel(type="namespace", value="test-ns")]
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.return_value = _pod_page(["a"])
+        _handle_get_pod_images(entities)
+        _handle_get_pod_images(entities)
+    assert api.list_namespaced_pod.call_count == 2
+
+def test_partially_read_stream_is_not_cached():
+    entities = [EntityModel(type="namespace", value="test-ns")]
+    intent = IntentModel(intent="get_pod_images", entities=entities)
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.side_effect = lambda **kwargs: _pod_page(["a"], "tok") if "_continue" not in kwargs else _pod_page(["b"])
+        stream = execute_command_stream(intent)
+        next(stream)
+        del stream
+        assert [p.name for p in _handle_get_pod_images(entities)] == ["a", "b"]
+    assert api.list_namespaced_pod.call_count == 3
+
+def test_lists_over_the_record_cap_are_streamed_without_being_cached():
+    from src.settings import configure
+    configure(api_coalesce=False, result_cache_max_records=2)
+    entities = [EntityModel(type="namespace", value="test-ns")]
+    intent = IntentModel(intent="get_pod_images", entities=entities)
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.side_effect = lambda **kwargs: _pod_page(["a", "b"], "tok") if "_continue" not in kwargs else _pod_page(["c"])
+        assert [p.name for p in execute_command_stream(intent)] == ["a", "b", "c"]
+        assert [p.name for p in execute_command_stream(intent)] == ["a", "b", "c"]
+        assert api.list_namespaced_pod.call_count == 4
+        # A list within the cap is still kept
+        api.list_namespaced_pod.side_effect = None
+        api.list_namespaced_pod.return_value = _pod_page(["a", "b"])
+        _handle_get_pod_images(entities)
+        _handle_get_pod_images(entities)
+    assert api.list_namespaced_pod.call_count == 5
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch, MagicMock
+import pytest
+from src import llm_backend
+from src.llm_backend import LLMBackend, TASK_INTENT, TASK_SUMMARY, generate, generate_async, get_backend, use_backend
+from src.models import PodStatusModel
+from src.nlp_core import generate_response, get_intent
+from src.settings import configure
+
+class _StandIn(LLMBackend):
+    """Local backend answering from a list of outcomes (exceptions are raised, delays are slept)."""
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _next(self, model, prompt):
+        with self._lock:
+            self.calls.append((model, prompt))
+            return self.outcomes.pop(0)
+
+    def generate(self, model, prompt, stream=False, timeout=None):
+        delay, outcome = self._next(model, prompt)
+        time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return MagicMock(text=outcome)
+
+    async def generate_async(self, model, prompt, stream=False, timeout=None):
+        delay, outcome = self._next(model, prompt)
+        await asyncio.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return MagicMock(text=outcome)
+
+def _api_error(code):
+    error = Exception(f"{code} error")
+    error.code = code
+    return error
+
+@patch("src.llm_backend.GenerativeModel")
+def test_tasks_are_routed_to_model_tiers_and_clients_reused(mock_model):
+    configure(local_intent_enabled=False, intent_cache_size=0, llm_intent_model="small", llm_summary_model="large")
+    mock_model.return_value.generate_content.return_value = MagicMock(text='{"intent": "get_pod_status", "entities": []}')
+    get_intent("how are things")
+    get_intent("how are things")
+    generate_response([PodStatusModel(name="web", namespace="prod", status="Running", restarts=0, containers=[])])
+    assert [c.args[0] for c in mock_model.call_args_list] == ["small", "large"]
+    assert mock_model.return_value.generate_content.call_args.kwargs == {"request_options": {"timeout": 30.0}}
+
+def test_retries_retryable_errors_with_backoff():
+    configure(llm_retries=2, llm_retry_base_delay=0)
+    backend = _StandIn([(0, TimeoutError()), (0, _api_error(503)), (0, "ok")])
+    with use_backend(backend):
+        assert generate(TASK_SUMMARY, "p").text == "ok"
+    assert len(backend.calls) == 3
+    backend = _StandIn([(0, _api_error(400)), (0, "ok")])
+    with use_backend(backend), pytest.raises(Exception, match="400 error"):
+        generate(TASK_SUMMARY, "p")
+    assert len(backend.calls) == 1
+
+def test_retries_give_up_after_llm_retries():
+    configure(llm_retries=1, llm_retry_base_delay=0)
+    backend = _StandIn([(0, _api_error(429)), (0, _api_error(429)), (0, "ok")])
+    with use_backend(backend), pytest.raises(Exception, match="429 error"):
+        asyncio.run(generate_async(TASK_INTENT, "p"))
+    assert len(backend.calls) == 2
+
+def test_hedged_call_returns_the_faster_answer():
+    configure(llm_hedge_delay=0.05, llm_intent_model="small")
+    backend = _StandIn([(1.0, "slow"), (0, "fast")])
+    started = time.monotonic()
+    with use_backend(backend):
+        assert generate(TASK_INTENT, "p").text == "fast"
+    assert time.monotonic() - started < 0.5
+    assert backend.calls == [("small", "p"), ("small", "p")]
+
+def test_hedged_async_call_returns_the_faster_answer_and_skips_fast_calls():
+    configure(llm_hedge_delay=0.05)
+    backend = _StandIn([(1.0, "slow"), (0, "fast"), (0, "quick")])
+    with use_backend(backend):
+        assert asyncio.run(generate_async(TASK_INTENT, "p")).text == "fast"
+        assert asyncio.run(generate_async(TASK_INTENT, "p")).text == "quick"
+    assert len(backend.calls) == 3
+
+def test_unknown_backend():
+    configure(llm_backend="nope")
+    with pytest.raises(ValueError, match="Unknown LLM backend: nope"):
+        get_backend()
+    llm_backend.register_backend("nope", lambda: _StandIn([]))
+    try:
+        assert isinstance(get_backend(), _StandIn)
+    finally:
+        del llm_backend.BACKENDS["nope"]
+
+def test_backend_missing_a_method_fails_when_created():
+    class SyncOnly(LLMBackend):
+        def generate(self, model, prompt, stream=False, timeout=None):
+            return MagicMock(text="ok")
+    with pytest.raises(TypeError, match="generate_async"):
+        SyncOnly()
@@ -63,4 +63,10 @@ def test_pod_image_model_valid():
 
 def test_pod_image_model_invalid():
     with pytest.raises(ValidationError):
-        PodImageModel(name=123, namespace=None, containers="notalist") 
\ No newline at end of file
+        PodImageModel(name=123, namespace=None, containers="notalist") 
+# NamespaceErrorModel tests
+def test_namespace_error_model_valid():
+    from src.models import NamespaceErrorModel
+    m = NamespaceErrorModel(namespace="prod", error="403 Forbidden")
+    assert m.namespace == "prod"
+    assert m.error == "403 Forbidden"
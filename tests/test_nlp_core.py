@@ -1,20 +1,24 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from src.models import IntentModel, PodStatusModel
-from src.nlp_core import get_intent, generate_response
+from src.models import IntentModel, PodStatusModel, PodImageModel
+from src.nlp_core import get_intent, generate_response, generate_response_stream
+from src.settings import configure
 
-@patch('src.nlp_core.GenerativeModel')
+@patch('src.llm_backend.GenerativeModel')
 def test_get_intent_valid(mock_model):
     # Mock Gemini response with valid JSON
     mock_response = MagicMock()
     mock_response.text = '{"intent": "get_pod_status", "entities": [{"type": "namespace", "value": "default"}]}'
     mock_model.return_value.generate_content.return_value = mock_response
+    # The local classifier would answer this query without Gemini
+    configure(local_intent_enabled=False)
     result = get_intent("show me pods in default")
     assert result.intent == "get_pod_status"
     assert result.entities[0].type == "namespace"
     assert result.entities[0].value == "default"
+    mock_model.return_value.generate_content.assert_called_once()
 
-@patch('src.nlp_core.GenerativeModel')
+@patch('src.llm_backend.GenerativeModel')
 def test_get_intent_malformed_json(mock_model):
     # Mock Gemini response with no JSON
     mock_response = MagicMock()
@@ -23,7 +27,7 @@ def test_get_intent_malformed_json(mock_model):
     with pytest.raises(ValueError, match="Failed to get intent from Gemini: No JSON found"):
         get_intent("invalid response")
 
-@patch('src.nlp_core.GenerativeModel')
+@patch('src.llm_backend.GenerativeModel')
 def test_get_intent_invalid_model(mock_model):
     # Mock Gemini response with invalid JSON for IntentModel
     mock_response = MagicMock()
@@ -32,14 +36,14 @@ def test_get_intent_invalid_model(mock_model):
     with pytest.raises(ValueError, match="Failed to get intent"):
         get_intent("bad model data")
 
-@patch('src.nlp_core.GenerativeModel')
+@patch('src.llm_backend.GenerativeModel')
 def test_get_intent_api_error(mock_model):
     # Simulate Gemini API error
     mock_model.return_value.generate_content.side_effect = Exception("API error")
     with pytest.raises(ValueError, match="Failed to get intent"):
         get_intent("api error")
 
-@patch('src.nlp_core.GenerativeModel')
+@patch('src.llm_backend.GenerativeModel')
 def test_generate_response_serialization(mock_model):
     data = [PodStatusModel(name="nginx", namespace="default", status="Running", restarts=2, containers=[{"name": "nginx", "image": "nginx:1.14.2"}])]
     mock_response = MagicMock()
@@ -48,7 +52,7 @@ def test_generate_response_serialization(mock_model):
     result = generate_response(data)
     assert result == "summary"
 
-@patch('src.nlp_core.GenerativeModel')
+@patch('src.llm_backend.GenerativeModel')
 def test_generate_response_prompt(mock_model):
     data = [PodStatusModel(name="nginx", namespace="default", status="Running", restarts=2, containers=[{"name": "nginx", "image": "nginx:1.14.2"}])]
     mock_response = MagicMock()
@@ -57,7 +61,7 @@ def test_generate_response_prompt(mock_model):
     result = generate_response(data)
     assert result == "summary"
 
-@patch('src.nlp_core.GenerativeModel')
+@patch('src.llm_backend.GenerativeModel')
 def test_generate_response_success(mock_model):
     mock_response = MagicMock()
     mock_response.text = "There is 1 pod named nginx running in default."
@@ -66,7 +70,7 @@ def test_generate_response_success(mock_model):
     result = generate_response(data)
     assert "nginx" in result
 
-@patch('src.nlp_core.GenerativeModel')
+@patch('src.llm_backend.GenerativeModel')
 def test_generate_response_empty_list(mock_model):
     mock_response = MagicMock()
     mock_response.text = "No resources found."
@@ -74,9 +78,112 @@ def test_generate_response_empty_list(mock_model):
     result = generate_response([])
     assert result == "No resources found."
 
-@patch('src.nlp_core.GenerativeModel')
+@patch('src.llm_backend.GenerativeModel')
 def test_generate_response_gemini_error(mock_model):
     mock_model.return_value.generate_content.side_effect = Exception("API error")
     data = [PodStatusModel(name="nginx", namespace="default", status="Running", restarts=2, containers=[{"name": "nginx", "image": "nginx:1.14.2"}])]
     with pytest.raises(ValueError, match="Failed to generate summary from Gemini: API error"):
-        generate_response(data) 
\ No newline at end of file
+        generate_response(data) 
+
+def test_generate_response_stream_yields_image_lines_incrementally():
+    def pods():
+        yield PodImageModel(name="a", namespace="default", containers=[{"name": "app", "image": "app:1"}])
+        raise RuntimeError("second page not requested yet")
+    stream = generate_response_stream(pods())
+    assert "app:1" in next(stream)
+
+@patch('src.llm_backend.GenerativeModel')
+def test_generate_response_stream_summarizes_status_models(mock_model):
+    mock_model.return_value.generate_content.return_value = iter([MagicMock(text="one pod "), MagicMock(text="running")])
+    data = iter([PodStatusModel(name="nginx", namespace="default", status="Running", restarts=0, containers=[])])
+    assert list(generate_response_stream(data)) == ["one pod ", "running", "\n"]
+    assert mock_model.return_value.generate_content.call_args.kwargs == {"stream": True, "request_options": {"timeout": 30.0}}
+
+@patch('src.llm_backend.GenerativeModel')
+def test_generate_response_stream_close_stops_reading_gemini(mock_model):
+    read = []
+    def chunks():
+        for text in ["first ", "second ", "third"]:
+            read.append(text)
+            yield MagicMock(text=text)
+    mock_model.return_value.generate_content.return_value = chunks()
+    data = [PodStatusModel(name="nginx", namespace="default", status="Running", restarts=0, containers=[])]
+    stream = generate_response_stream(data)
+    assert next(stream) == "first "
+    stream.close()
+    assert read == ["first "]
+
+@patch('src.llm_backend.GenerativeModel')
+def test_generate_response_stream_gemini_error(mock_model):
+    mock_model.return_value.generate_content.side_effect = Exception("API error")
+    data = [PodStatusModel(name="nginx", namespace="default", status="Running", restarts=0, containers=[])]
+    with pytest.raises(ValueError, match="Failed to generate summary from Gemini: API error"):
+        list(generate_response_stream(data))
+
+def test_generate_response_reports_namespace_errors_locally():
+    from src.models import NamespaceErrorModel
+    data = [
+        PodImageModel(name="a", namespace="prod", containers=[{"name": "app", "image": "app:1"}]),
+        NamespaceErrorModel(namespace="staging", error="403 Forbidden"),
+    ]
+    result = generate_response(data)
+    assert "app:1" in result
+    assert "Namespace `staging` could not be queried: 403 Forbidden" in result
+    assert list(generate_response_stream(iter(data)))[-1].startswith("Namespace `staging`")
+
+@patch('src.llm_backend.GenerativeModel')
+def test_get_intent_local_fast_path_skips_gemini(mock_model):
+    result = get_intent("list pods in kube-system")
+    assert result.intent == "get_pod_status"
+    assert result.entities[0].value == "kube-system"
+    mock_model.assert_not_called()
+
+@patch('src.llm_backend.GenerativeModel')
+def test_get_intent_uses_gemini_when_local_classifier_disabled(mock_model):
+    from src.settings import configure
+    configure(local_intent_enabled=False)
+    mock_model.return_value.generate_content.return_value.text = '{"intent": "get_pod_images", "entities": []}'
+    result = get_intent("list pods in kube-system")
+    assert result.intent == "get_pod_images"
+    mock_model.return_value.generate_content.assert_called_once()
+
+@patch('src.llm_backend.GenerativeModel')
+def test_get_intent_cache_hit_skips_gemini(mock_model):
+    mock_model.return_value.generate_content.return_value.text = '{"intent": "get_pod_status", "entities": []}'
+    first = get_intent("what is going on with my workloads?")
+    second = get_intent("What is going on with my   workloads")
+    assert first == second
+    mock_model.return_value.generate_content.assert_called_once()
+
+def _status_pods(count):
+    return [PodStatusModel(name=f"web-{i}", namespace="prod", status="Running", restarts=0, containers=[]) for i in range(count)]
+
+@patch('src.llm_backend.GenerativeModel')
+def test_generate_response_renders_large_status_results_locally(mock_model):
+    from src.settings import configure
+    configure(llm_summary_max_rows=3)
+    result = generate_response(_status_pods(4))
+    assert result.startswith("4 pods: 4 Running")
+    mock_model.assert_not_called()
+
+@patch('src.llm_backend.GenerativeModel')
+def test_generate_response_explain_uses_gemini_for_large_results(mock_model):
+    from src.settings import configure
+    configure(llm_summary_max_rows=3)
+    mock_model.return_value.generate_content.return_value.text = "summary"
+    assert generate_response(_status_pods(4), explain=True) == "summary"
+
+def test_wants_explanation():
+    from src.nlp_core import wants_explanation
+    assert wants_explanation("explain the pods in prod")
+    assert wants_explanation("Why are pods failing?")
+    assert not wants_explanation("list pods in prod")
+
+@patch('src.llm_backend.GenerativeModel')
+def test_generate_response_sends_compact_payload(mock_model):
+    mock_model.return_value.generate_content.return_value = MagicMock(text="summary")
+    data = [PodStatusModel(name="nginx", namespace="default", status="Running", restarts=2, containers=[{"name": "nginx", "image": "nginx:1.14.2"}])]
+    generate_response(data)
+    prompt = mock_model.return_value.generate_content.call_args[0][0]
+    assert "i0=nginx:1.14.2" in prompt
+    assert "nginx,Running,2,nginx=i0" in prompt
@@ -0,0 +1,39 @@
+from src.models import PodStatusModel, PodImageModel, NamespaceErrorModel
+from src.payload import build_summary_payload, estimate_tokens
+
+def _pod(name, status="Running", restarts=0, namespace="prod", image="app:1"):
+    return PodStatusModel(name=name, namespace=namespace, status=status, restarts=restarts,
+                          containers=[{"name": "app", "image": image}, {"name": "proxy", "image": "envoy:1.30"}])
+
+def test_payload_dedupes_images_and_hoists_namespace():
+    payload = build_summary_payload([_pod("web-1"), _pod("web-2", "Failed", restarts=4)])
+    lines = payload.splitlines()
+    assert lines[:4] == ["total: 2", "by_status: Failed=1, Running=1", "top_restarts: prod/web-2=4", "namespace: prod"]
+    assert payload.count("envoy:1.30") == 1
+    assert "i0=app:1" in lines and "i1=envoy:1.30" in lines
+    # Problem pods come first and namespace is not repeated per row
+    assert lines[lines.index("rows:") + 1:] == ["name,status,restarts,containers",
+                                                "web-2,Failed,4,app=i0;proxy=i1",
+                                                "web-1,Running,0,app=i0;proxy=i1"]
+
+def test_payload_keeps_namespace_column_for_multiple_namespaces():
+    payload = build_summary_payload([PodImageModel(name="a", namespace="prod", containers=[{"name": "c", "image": "x:1"}]),
+                                     PodImageModel(name="b", namespace="dev", containers=[{"name": "c", "image": "x:1"}])])
+    assert "name,namespace,containers" in payload
+    assert "b,dev,c=i0" in payload
+    assert "namespace: " not in payload
+
+def test_payload_truncates_to_budget_with_exact_totals():
+    pods = [_pod(f"web-{i}", image=f"app:{i}") for i in range(200)]
+    payload = build_summary_payload(pods, token_budget=300)
+    assert estimate_tokens(payload) <= 320
+    assert payload.startswith("total: 200\nby_status: Running=200")
+    kept = sum(1 for line in payload.splitlines() if line.startswith("web-"))
+    assert payload.splitlines()[-1] == f"... {200 - kept} more omitted (counted in the totals above)"
+    # Only images referenced by the kept rows are listed
+    assert "app:199" not in payload
+
+def test_payload_generic_models_and_empty():
+    payload = build_summary_payload([NamespaceErrorModel(namespace="prod", error="Forbidden")])
+    assert payload.splitlines()[-2:] == ["namespace,error", "prod,Forbidden"]
+    assert build_summary_payload([]) == "total: 0"
@@ -0,0 +1,95 @@
+from unittest.mock import patch, MagicMock
+import pytest
+from src.intent_cache import IntentCache
+from src.k8s_client import (
+    COMMAND_MAP, CommandExecutionError, _handle_get_pod_images, _handle_get_pod_status,
+)
+from src.models import EntityModel, IntentModel, PlanModel, PodImageModel, PodStatusModel
+from src.nlp_core import get_intent, get_plan, parse_plan_response
+from src.planner import execute_plan, merge_steps
+from src.settings import configure
+
+# Other test modules replace the pod handlers; the planner only merges the built-in ones
+BUILTIN_HANDLERS = {"get_pod_status": _handle_get_pod_status, "get_pod_images": _handle_get_pod_images}
+
+PLAN_JSON = ('{"steps": [{"intent": "get_pod_status", "entities": [{"type": "namespace", "value": "prod"}]},'
+             ' {"intent": "get_pod_images", "entities": [{"type": "namespace", "value": "prod"}]}]}')
+
+def _step(name, *namespaces):
+    return IntentModel(intent=name, entities=[EntityModel(type="namespace", value=ns) for ns in namespaces])
+
+def _pod(name, namespace):
+    pod = MagicMock()
+    pod.metadata.name = name
+    pod.metadata.namespace = namespace
+    pod.status.phase = "Running"
+    pod.status.container_statuses = []
+    container = MagicMock()
+    container.name = "app"
+    container.image = "app:1"
+    pod.spec.containers = [container]
+    return pod
+
+def _list_pods(namespace, **kwargs):
+    pod_list = MagicMock()
+    pod_list.items = [_pod(f"{namespace}-web", namespace)]
+    pod_list.metadata._continue = None
+    pod_list.metadata.resource_version = "1"
+    return pod_list
+
+def test_parse_plan_response():
+    assert [s.intent for s in parse_plan_response(PLAN_JSON).steps] == ["get_pod_status", "get_pod_images"]
+    single = parse_plan_response('{"intent": "get_pod_images", "entities": []}')
+    assert [s.intent for s in single.steps] == ["get_pod_images"]
+    configure(plan_max_steps=1)
+    assert len(parse_plan_response(PLAN_JSON).steps) == 1
+
+def test_merge_steps_groups_steps_reading_the_same_pods():
+    plan = PlanModel(steps=[
+        _step("get_pod_status", "prod"), _step("get_pod_images", "prod"),
+        _step("get_pod_status", "staging"), _step("get_pod_images", "staging", "prod"),
+        _step("get_deployments", "prod"), _step("get_deployments", "prod"),
+    ])
+    with patch.dict(COMMAND_MAP, BUILTIN_HANDLERS):
+        assert merge_steps(plan) == [[0, 1], [2], [3], [4, 5]]
+
+def test_execute_plan_merges_list_calls_and_keeps_step_order():
+    configure(result_cache_ttl=0)
+    plan = PlanModel(steps=[
+        _step("get_pod_status", "prod"), _step("get_pod_images", "prod"),
+        _step("get_pod_status", "staging"), _step("get_pod_images", "staging"),
+    ])
+    with patch.dict(COMMAND_MAP, BUILTIN_HANDLERS), patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.side_effect = _list_pods
+        results = execute_plan(plan)
+    assert api.list_namespaced_pod.call_count == 2
+    assert [type(r[0]) for r in results] == [PodStatusModel, PodImageModel, PodStatusModel, PodImageModel]
+    assert [r[0].name for r in results] == ["prod-web", "prod-web", "staging-web", "staging-web"]
+    assert results[1][0].containers == [{"name": "app", "image": "app:1"}]
+
+def test_execute_plan_raises_command_errors():
+    plan = PlanModel(steps=[_step("get_pod_status", "prod"), _step("get_pod_images", "prod")])
+    with patch.dict(COMMAND_MAP, BUILTIN_HANDLERS), patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.side_effect = ValueError("bad selector")
+        with pytest.raises(CommandExecutionError, match="get_pod_status, get_pod_images"):
+            execute_plan(plan)
+
+@patch("src.llm_backend.GenerativeModel")
+def test_get_plan_uses_one_gemini_call_and_caches_the_plan(mock_model):
+    mock_model.return_value.generate_content.return_value = MagicMock(text=PLAN_JSON)
+    query = "how do the prod workloads look, and what do they run"
+    assert len(get_plan(query).steps) == 2
+    assert len(get_plan(query).steps) == 2
+    assert get_intent(query).intent == "get_pod_status"
+    assert mock_model.return_value.generate_content.call_count == 1
+
+def test_intent_cache_persists_plans(tmp_path):
+    path = str(tmp_path / "intents.db")
+    cache = IntentCache("v1", path=path)
+    cache.put("status and images", parse_plan_response(PLAN_JSON))
+    cache.close()
+    reopened = IntentCache("v1", path=path)
+    assert reopened.get("status and images") == parse_plan_response(PLAN_JSON)
+    reopened.close()
@@ -0,0 +1,197 @@
+import threading
+import time
+from unittest.mock import patch, MagicMock
+import pytest
+from kubernetes.client.rest import ApiException
+from urllib3.exceptions import MaxRetryError
+from src.k8s_client import CommandExecutionError, refresh_pod_snapshot, snapshot_key
+from src.models import ConversationState, EntityModel, IntentModel, PodSnapshotModel
+from src.nlp_core import wants_changes
+from src.pod_diff import diff_snapshots, no_changes_line, pod_changes, remember_pods
+
+def _pod(name, phase, restarts=0, resource_version="1"):
+    pod = MagicMock()
+    pod.metadata.name = name
+    pod.metadata.namespace = "prod"
+    pod.metadata.resource_version = resource_version
+    pod.status.phase = phase
+    status = MagicMock()
+    status.restart_count = restarts
+    pod.status.container_statuses = [status]
+    pod.spec.containers = []
+    return pod
+
+def _list(pods, resource_version):
+    pod_list = MagicMock()
+    pod_list.items = pods
+    pod_list.metadata._continue = None
+    pod_list.metadata.resource_version = resource_version
+    return pod_list
+
+def _snapshot(pods, resource_version="100"):
+    return PodSnapshotModel(namespace="prod", resource_version=resource_version,
+                            pods={f"prod/{name}": state for name, state in pods.items()})
+
+def _intent(*entities):
+    return IntentModel(intent="get_pod_status", entities=[EntityModel(type=t, value=v) for t, v in entities])
+
+def _watch_events(events, resource_versions):
+    """
+    A Watch stand-in yielding events and tracking resource_version like the real client.
+    It opens the response with the list function it is given, and after the last event the
+    stream stays open until the watch is stopped or the server closes it after timeout_seconds.
+    """
+    pod_watch = MagicMock()
+    stopped = threading.Event()
+    pod_watch.stop.side_effect = stopped.set
+
+    def stream(func, **kwargs):
+        func(**kwargs)
+        pod_watch.resource_version = kwargs["resource_version"]
+        for event, rv in zip(events, resource_versions):
+            pod_watch.resource_version = rv
+            yield event
+        stopped.wait(kwargs["timeout_seconds"])
+    pod_watch.stream.side_effect = stream
+    return pod_watch
+
+def test_wants_changes():
+    assert wants_changes("what changed in prod?")
+    assert wants_changes("any changes in prod since last time")
+    assert not wants_changes("show pod status in prod")
+
+def test_snapshot_key_only_for_unselected_pod_status_queries():
+    assert snapshot_key(_intent(("namespace", "prod"))) == "prod"
+    assert snapshot_key(_intent(("all_namespaces", "true"))) == "*"
+    assert snapshot_key(_intent(("namespace", "prod"), ("label_selector", "app=web"))) is None
+    assert snapshot_key(_intent(("namespace", "a"), ("namespace", "b"))) is None
+    assert snapshot_key(IntentModel(intent="get_pod_images", entities=[])) is None
+
+def test_diff_snapshots_reports_added_removed_and_changed_pods():
+    old = _snapshot({"web": ("Running", 0), "job": ("Running", 0), "db": ("Running", 1), "gone": ("Running", 0)})
+    new = _snapshot({"web": ("Running", 0), "job": ("Succeeded", 0), "db": ("Running", 3), "new": ("Pending", 0)})
+    changes = diff_snapshots(old, new)
+    assert [(c.change, c.name) for c in changes] == [("removed", "gone"), ("added", "new"), ("changed", "db"), ("changed", "job")]
+    db = changes[2]
+    assert (db.previous_restarts, db.restarts, db.status) == (1, 3, "Running")
+    assert diff_snapshots(old, old) == []
+
+def test_refresh_keeps_the_snapshot_when_the_watch_stays_idle():
+    snapshot = _snapshot({"web": ("Running", 0)}, resource_version="100")
+    with patch("src.k8s_client.KubernetesClient") as mock_client, \
+            patch("src.k8s_client.watch.Watch", return_value=_watch_events([], [])):
+        api = mock_client.return_value.get_core_v1_api.return_value
+        assert refresh_pod_snapshot(snapshot) is snapshot
+    # The only request is the watch itself, with no list before it
+    assert api.list_namespaced_pod.call_count == 1
+    assert api.list_namespaced_pod.call_args.kwargs["resource_version"] == "100"
+
+def test_refresh_applies_watch_events_since_the_stored_resource_version():
+    from src.settings import configure
+    configure(diff_watch_timeout=3)
+    snapshot = _snapshot({"web": ("Running", 0), "old": ("Running", 0)}, resource_version="100")
+    events = [
+        {"type": "MODIFIED", "object": _pod("web", "Running", restarts=2)},
+        {"type": "DELETED", "object": _pod("old", "Running")},
+        {"type": "ADDED", "object": _pod("new", "Pending")},
+    ]
+    pod_watch = _watch_events(events, ["101", "102", "105"])
+    with patch("src.k8s_client.KubernetesClient"), patch("src.k8s_client.watch.Watch", return_value=pod_watch):
+        refreshed = refresh_pod_snapshot(snapshot)
+    assert pod_watch.stream.call_args.kwargs == {
+        "namespace": "prod", "resource_version": "100", "timeout_seconds": 3, "allow_watch_bookmarks": True,
+        "_request_timeout": (3, 3)}
+    assert refreshed.resource_version == "105"
+    assert refreshed.pods == {"prod/web": ("Running", 2), "prod/new": ("Pending", 0)}
+    assert snapshot.pods == {"prod/web": ("Running", 0), "prod/old": ("Running", 0)}
+
+def test_refresh_returns_after_the_replay_when_the_cluster_version_is_ahead():
+    from src.settings import configure
+    configure(diff_watch_timeout=3)
+    snapshot = _snapshot({"web": ("Running", 0)}, resource_version="100")
+    # Other namespaces moved the cluster to 900; this namespace's last event is 150
+    pod_watch = _watch_events([{"type": "MODIFIED", "object": _pod("web", "Failed")}], ["150"])
+    with patch("src.k8s_client.KubernetesClient") as mock_client, patch("src.k8s_client.watch.Watch", return_value=pod_watch):
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.return_value = _list([], "900")
+        started = time.monotonic()
+        refreshed = refresh_pod_snapshot(snapshot)
+    assert time.monotonic() - started < 1
+    assert refreshed.resource_version == "150"
+    assert refreshed.pods == {"prod/web": ("Failed", 0)}
+
+def test_refresh_stops_at_a_bookmark_and_keeps_the_observed_version_on_timeout():
+    from src.settings import configure
+    bookmark = {"type": "BOOKMARK", "object": MagicMock()}
+    pod_watch = _watch_events([bookmark, {"type": "ADDED", "object": _pod("late", "Running")}], ["120", "130"])
+    with patch("src.k8s_client.KubernetesClient"), patch("src.k8s_client.watch.Watch", return_value=pod_watch):
+        refreshed = refresh_pod_snapshot(_snapshot({}, resource_version="100"))
+    assert (refreshed.resource_version, refreshed.pods) == ("120", {})
+    # A replay cut off by the timeout is stamped with the last event seen, not a later version
+    configure(diff_watch_timeout=1, diff_watch_idle=5)
+    pod_watch = _watch_events([{"type": "ADDED", "object": _pod("new", "Pending")}], ["110"])
+    with patch("src.k8s_client.KubernetesClient"), patch("src.k8s_client.watch.Watch", return_value=pod_watch):
+        refreshed = refresh_pod_snapshot(_snapshot({}, resource_version="100"))
+    assert (refreshed.resource_version, refreshed.pods) == ("110", {"prod/new": ("Pending", 0)})
+
+def test_refresh_waits_for_slow_response_headers_before_counting_idle_time():
+    from src.settings import configure
+    configure(diff_watch_timeout=3)
+    pod_watch = _watch_events([{"type": "MODIFIED", "object": _pod("web", "Failed")}], ["101"])
+    with patch("src.k8s_client.KubernetesClient") as mock_client, patch("src.k8s_client.watch.Watch", return_value=pod_watch):
+        api = mock_client.return_value.get_core_v1_api.return_value
+        # The API server takes longer than diff_watch_idle to send the response headers
+        api.list_namespaced_pod.side_effect = lambda **kwargs: time.sleep(0.6)
+        refreshed = refresh_pod_snapshot(_snapshot({"web": ("Running", 0)}, resource_version="100"))
+    assert (refreshed.resource_version, refreshed.pods) == ("101", {"prod/web": ("Failed", 0)})
+
+def test_refresh_reports_transport_errors_and_unanswered_watches():
+    from src.settings import configure
+    configure(diff_watch_timeout=1)
+    failing = MagicMock()
+    failing.stream.side_effect = MaxRetryError(None, "/api/v1/namespaces/prod/pods", "Read timed out")
+    with patch("src.k8s_client.KubernetesClient") as mock_client, \
+            patch("src.k8s_client.watch.Watch", side_effect=[failing, _watch_events([], [])]):
+        with pytest.raises(CommandExecutionError, match="Failed to watch pods in 'prod'"):
+            refresh_pod_snapshot(_snapshot({}, resource_version="100"))
+        # No response at all within the timeout is an error, not "no changes"
+        mock_client.return_value.get_core_v1_api.return_value.list_namespaced_pod.side_effect = lambda **kwargs: time.sleep(2)
+        with pytest.raises(CommandExecutionError, match="did not answer"):
+            refresh_pod_snapshot(_snapshot({}, resource_version="100"))
+
+def test_refresh_lists_again_when_the_resource_version_is_gone():
+    snapshot = _snapshot({"web": ("Running", 0)}, resource_version="100")
+    pod_watch = MagicMock()
+    pod_watch.stream.side_effect = ApiException(status=410, reason="Gone")
+    with patch("src.k8s_client.KubernetesClient") as mock_client, patch("src.k8s_client.watch.Watch", return_value=pod_watch):
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.return_value = _list([_pod("web", "Failed")], "900")
+        refreshed = refresh_pod_snapshot(snapshot)
+    assert refreshed.resource_version == "900"
+    assert refreshed.pods == {"prod/web": ("Failed", 0)}
+
+def test_session_remembers_status_results_and_answers_with_changes_only():
+    from src.k8s_client import _handle_get_pod_status
+    state = ConversationState(session_id="s", history=[])
+    intent = _intent(("namespace", "prod"))
+    with patch("src.k8s_client.KubernetesClient") as mock_client, \
+            patch("src.k8s_client.watch.Watch", return_value=_watch_events(
+                [{"type": "MODIFIED", "object": _pod("db", "Failed")}], ["207"])):
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.return_value = _list([_pod("web", "Running"), _pod("db", "Running")], "200")
+        assert pod_changes(state, intent) is None
+        assert remember_pods(state, intent, _handle_get_pod_status(intent.entities))
+        assert state.snapshots["prod"].resource_version == "200"
+        snapshot, changes = pod_changes(state, intent)
+    assert [(c.name, c.previous_status, c.status) for c in changes] == [("db", "Running", "Failed")]
+    assert state.snapshots["prod"] is snapshot
+    assert no_changes_line(snapshot) == "No pod changes in namespace `prod` since the last check (2 pods)."
+
+def test_pod_changes_wraps_api_errors():
+    state = ConversationState(session_id="s", history=[])
+    state.snapshots["prod"] = _snapshot({}, resource_version="1")
+    pod_watch = MagicMock()
+    pod_watch.stream.side_effect = ApiException(status=403, reason="Forbidden")
+    with patch("src.k8s_client.KubernetesClient"), patch("src.k8s_client.watch.Watch", return_value=pod_watch):
+        with pytest.raises(CommandExecutionError):
+            pod_changes(state, _intent(("namespace", "prod")))
@@ -0,0 +1,34 @@
+import pytest
+from src.models import PodStatusModel
+from src.render import render_pod_status, restart_hotspots, phase_counts_line
+
+def _pod(name, status="Running", restarts=0, namespace="prod"):
+    return PodStatusModel(name=name, namespace=namespace, status=status, restarts=restarts,
+                          containers=[{"name": "app", "image": "app:1"}])
+
+def test_phase_counts_line_orders_problem_phases_first():
+    pods = [_pod("a"), _pod("b", "Failed"), _pod("c", "Pending"), _pod("d")]
+    assert phase_counts_line(pods) == "4 pods: 1 Failed, 1 Pending, 2 Running"
+    assert phase_counts_line([]) == "No resources found."
+
+def test_restart_hotspots_sorted_and_limited():
+    pods = [_pod("a", restarts=1), _pod("b", restarts=9), _pod("c"), _pod("d", restarts=4)]
+    assert [p.name for p in restart_hotspots(pods, limit=2)] == ["b", "d"]
+
+def test_render_pod_status_table_groups_by_phase():
+    pods = [_pod("web-1"), _pod("web-2", "Failed", restarts=7)]
+    text = render_pod_status(pods)
+    assert text.splitlines()[0] == "2 pods: 1 Failed, 1 Running"
+    assert text.index("Failed (1)") < text.index("Running (1)")
+    assert "web-2 (prod): 7 restarts" in text
+    assert "app:1" in text
+
+def test_render_pod_status_markdown():
+    text = render_pod_status([_pod("web-1", restarts=2)], fmt="markdown")
+    assert "### Running (1)" in text
+    assert "| web-1 | prod | 2 | app:1 |" in text
+    assert "### Restart hot-spots" in text
+
+def test_render_pod_status_unknown_format():
+    with pytest.raises(ValueError, match="Unknown render format"):
+        render_pod_status([_pod("a")], fmt="html")
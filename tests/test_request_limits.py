@@ -0,0 +1,150 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+import pytest
+from src.k8s_client import (
+    _handle_get_pod_images, _handle_get_pod_status, _inflight, _request_priority, execute_command_stream,
+    request_priority,
+)
+from src.request_limits import BATCH, INTERACTIVE, SingleFlight, TokenBucket
+from src.settings import configure
+
+def test_single_flight_shares_one_call_and_its_error():
+    flights = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return "pods"
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: flights.do("prod", fetch), range(4)))
+    assert results == ["pods"] * 4
+    assert len(calls) == 1 and flights.coalesced == 3
+
+    def fail():
+        time.sleep(0.1)
+        raise ValueError("forbidden")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(flights.do, "prod", fail) for _ in range(2)]
+    for future in futures:
+        with pytest.raises(ValueError, match="forbidden"):
+            future.result()
+    # Nothing is kept once the call is over
+    assert flights.do("prod", lambda: "fresh") == "fresh"
+
+def test_token_bucket_allows_bursts_then_throttles():
+    bucket = TokenBucket(rate=50, burst=2)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() > 0.01
+    assert bucket.throttled == 1
+
+def test_token_bucket_keeps_reserve_for_interactive_requests():
+    bucket = TokenBucket(rate=20, burst=4, reserve=2)
+    bucket.acquire(BATCH)
+    # Three tokens left: interactive requests may use them, batch requests only above the reserve
+    assert bucket.acquire(INTERACTIVE) == 0.0
+    assert bucket.acquire(BATCH) > 0.01
+
+def test_token_bucket_serves_waiting_interactive_requests_first():
+    bucket = TokenBucket(rate=20, burst=1)
+    bucket.acquire()
+    order = []
+
+    def take(priority):
+        bucket.acquire(priority)
+        order.append(priority)
+    batch = threading.Thread(target=take, args=(BATCH,))
+    batch.start()
+    time.sleep(0.01)
+    interactive = threading.Thread(target=take, args=(INTERACTIVE,))
+    interactive.start()
+    batch.join()
+    interactive.join()
+    assert order == [INTERACTIVE, BATCH]
+
+def test_request_priority_context():
+    assert _request_priority.get() == INTERACTIVE
+    with request_priority(BATCH):
+        assert _request_priority.get() == BATCH
+    assert _request_priority.get() == INTERACTIVE
+    with pytest.raises(ValueError, match="Unknown request priority"):
+        with request_priority("urgent"):
+            pass
+
+def _slow_list(namespace, **kwargs):
+    time.sleep(0.1)
+    pod = MagicMock()
+    pod.metadata.name = "web"
+    pod.metadata.namespace = namespace
+    pod.status.phase = "Running"
+    pod.status.container_statuses = []
+    pod.spec.containers = []
+    pod_list = MagicMock()
+    pod_list.items = [pod]
+    pod_list.metadata._continue = None
+    pod_list.metadata.resource_version = "7"
+    return pod_list
+
+def _entities(namespace):
+    from src.models import EntityModel
+    return [EntityModel(type="namespace", value=namespace)]
+
+def test_concurrent_identical_pod_lists_are_coalesced():
+    configure(result_cache_ttl=0)
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.side_effect = _slow_list
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(_handle_get_pod_status, [_entities("prod")] * 3 + [_entities("staging")]))
+    assert api.list_namespaced_pod.call_count == 2
+    assert [r[0].namespace for r in results] == ["prod", "prod", "prod", "staging"]
+    assert all(r.resource_version == "7" for r in results)
+
+def test_coalescing_can_be_disabled():
+    configure(result_cache_ttl=0, api_coalesce=False)
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.side_effect = _slow_list
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(_handle_get_pod_status, [_entities("prod")] * 2))
+    assert api.list_namespaced_pod.call_count == 2
+
+def _page(names, continue_token=None):
+    pods = []
+    for name in names:
+        pod = MagicMock()
+        pod.metadata.name = name
+        pod.metadata.namespace = "prod"
+        pod.spec.containers = []
+        pods.append(pod)
+    pod_list = MagicMock()
+    pod_list.items = pods
+    pod_list.metadata._continue = continue_token
+    pod_list.metadata.resource_version = "7"
+    return pod_list
+
+def test_large_coalesced_list_releases_waiting_callers_and_keeps_streaming():
+    from src.models import IntentModel
+    configure(result_cache_ttl=0, result_cache_max_records=1)
+    intent = IntentModel(intent="get_pod_images", entities=_entities("prod"))
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        api = mock_client.return_value.get_core_v1_api.return_value
+        api.list_namespaced_pod.side_effect = lambda **kwargs: _page(["a", "b"], "tok") if "_continue" not in kwargs else _page(["c"])
+        stream = execute_command_stream(intent)
+        # The leader yields its first record before the list is complete
+        assert next(stream).name == "a"
+        waiting, coalesced = [], _inflight.coalesced
+        follower = threading.Thread(target=lambda: waiting.append(_handle_get_pod_images(_entities("prod"))))
+        follower.start()
+        while _inflight.coalesced == coalesced:
+            time.sleep(0.001)
+        # Past the record cap the follower is released and lists on its own, while the leader is paused
+        assert next(stream).name == "b"
+        follower.join(timeout=2)
+        assert not follower.is_alive()
+        assert [p.name for p in waiting[0]] == ["a", "b", "c"]
+        assert [p.name for p in stream] == ["c"]
+    assert api.list_namespaced_pod.call_count == 4
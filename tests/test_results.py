@@ -0,0 +1,53 @@
+import pytest
+from src.models import PodStatusModel, PodImageModel, NamespaceErrorModel
+from src.payload import build_summary_payload
+from src.render import render_pod_status
+from src.results import PodRow, PodTable, dump_results, pod_rows, split_errors
+
+def _table():
+    return PodTable(PodStatusModel, [
+        PodRow("web-1", "prod", "Running", 0, [{"name": "web", "image": "nginx:1.25"}]),
+        PodRow("web-2", "prod", "Failed", 4, [{"name": "web", "image": "nginx:1.25"}]),
+        PodRow("job-1", "prod", "Pending", 0, []),
+    ])
+
+def _models():
+    return [PodStatusModel(name=r.name, namespace=r.namespace, status=r.status, restarts=r.restarts,
+                           containers=r.containers) for r in _table().rows]
+
+def test_pod_table_builds_models_lazily_and_reuses_them():
+    table = _table()
+    assert len(table) == 3
+    assert table._models == {}
+    first = table[0]
+    assert isinstance(first, PodStatusModel)
+    assert first.name == "web-1" and first.containers == [{"name": "web", "image": "nginx:1.25"}]
+    assert table[0] is first
+    assert list(table._models) == [0]
+
+def test_pod_table_compares_equal_to_validated_models():
+    assert _table() == _models()
+    assert _table()[-1] == _models()[-1]
+    assert _table()[1:] == _models()[1:]
+    assert PodTable(PodImageModel) == []
+    with pytest.raises(IndexError):
+        _table()[3]
+
+def test_dump_results_matches_model_dump_without_building_models():
+    table = _table()
+    assert dump_results(table) == [model.model_dump() for model in _models()]
+    assert table._models == {}
+
+def test_split_errors_and_pod_rows():
+    table = _table()
+    assert split_errors(table) == (table, [])
+    assert pod_rows(table) is table.rows
+    error = NamespaceErrorModel(namespace="dev", error="403 Forbidden")
+    data, errors = split_errors([_models()[0], error])
+    assert data == [_models()[0]] and errors == [error]
+
+def test_render_and_payload_read_rows_like_models():
+    table = _table()
+    assert render_pod_status(table) == render_pod_status(_models())
+    assert build_summary_payload(table) == build_summary_payload(_models())
+    assert len(table._models) == 1  # only the first item is inspected for its type
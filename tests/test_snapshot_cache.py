@@ -0,0 +1,33 @@
+from unittest.mock import patch
+from src.snapshot_cache import SnapshotCache, get_snapshot_cache
+
+def test_snapshot_cache_expires_after_ttl():
+    cache = SnapshotCache(ttl=5, max_entries=4)
+    with patch("src.snapshot_cache.time.monotonic", return_value=100.0):
+        cache.put(("prod", None, None), [{"name": "a"}])
+    with patch("src.snapshot_cache.time.monotonic", return_value=104.0):
+        assert cache.fresh(("prod", None, None))
+        assert cache.get(("prod", None, None)) == [{"name": "a"}]
+    with patch("src.snapshot_cache.time.monotonic", return_value=106.0):
+        assert cache.get(("prod", None, None)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_snapshot_cache_fetched_at_bounds_lifetime():
+    cache = SnapshotCache(ttl=5)
+    with patch("src.snapshot_cache.time.monotonic", return_value=110.0):
+        cache.put("key", [], fetched_at=100.0)
+        assert cache.get("key") is None
+
+def test_snapshot_cache_evicts_least_recently_used():
+    cache = SnapshotCache(ttl=60, max_entries=2)
+    cache.put("a", [])
+    cache.put("b", [])
+    cache.get("a")
+    cache.put("c", [])
+    assert cache.get("b") is None
+    assert cache.get("a") == [] and cache.get("c") == []
+
+def test_get_snapshot_cache_replaced_on_settings_change():
+    first = get_snapshot_cache(5, 32)
+    assert get_snapshot_cache(5, 32) is first
+    assert get_snapshot_cache(10, 32) is not first
@@ -0,0 +1,7 @@
+from benchmarks.bench_startup import heavy_imports, import_profile
+
+# The import time budget is wall-clock sensitive and is checked by benchmarks/bench_startup.py instead
+
+def test_heavy_dependencies_are_not_loaded_at_startup():
+    assert heavy_imports(import_profile()) == []
+    assert heavy_imports(import_profile(("app.py", "--help"))) == []
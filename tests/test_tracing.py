@@ -0,0 +1,83 @@
+import json
+import logging
+import pytest
+from unittest.mock import patch, MagicMock
+from src import tracing
+from src.models import EntityModel
+from src.settings import configure
+
+class _Collector:
+    def __init__(self):
+        self.roots = []
+
+    def export(self, root):
+        self.roots.append(root)
+
+def test_spans_nest_and_export_roots():
+    collector = _Collector()
+    tracing.add_exporter(collector)
+    with tracing.span("query") as root:
+        with tracing.span("intent", source="local"):
+            tracing.add_counter("llm.prompt_tokens", 10)
+        with tracing.span("command"):
+            tracing.add_counter("k8s.objects", 3)
+            tracing.add_counter("k8s.objects", 2)
+    assert collector.roots == [root]
+    assert [child.name for child in root.children] == ["intent", "command"]
+    assert root.children[1].trace_id == root.trace_id
+    assert root.totals() == {"llm.prompt_tokens": 10, "k8s.objects": 5}
+    assert tracing.current_span() is None
+
+def test_span_records_errors():
+    with pytest.raises(RuntimeError):
+        with tracing.span("command") as failed:
+            raise RuntimeError("boom")
+    assert failed.attributes["error"] == "RuntimeError"
+    assert failed.duration_ms is not None
+
+def test_start_span_is_not_made_current():
+    with tracing.span("query") as root:
+        pending = tracing.start_span("llm.call")
+        assert tracing.current_span() is root
+        pending.end()
+    assert root.children == [pending]
+
+def test_format_profile_lists_stages_and_totals():
+    with tracing.span("query") as root:
+        with tracing.span("k8s.list", namespace="prod"):
+            tracing.add_counter("k8s.objects", 7)
+    profile = tracing.format_profile(root)
+    assert profile.splitlines()[0].startswith("query")
+    assert "  k8s.list" in profile and "namespace=prod" in profile
+    assert profile.splitlines()[-1] == "totals: k8s.objects=7"
+
+def test_logging_exporter_from_settings(caplog):
+    configure(trace_exporter="log")
+    with caplog.at_level(logging.INFO, logger="kubeai.trace"):
+        with tracing.span("query"):
+            with tracing.span("intent"):
+                pass
+    records = [json.loads(r.getMessage()) for r in caplog.records]
+    assert [r["name"] for r in records] == ["query", "intent"]
+    assert records[1]["parent_id"] == records[0]["span_id"]
+
+def test_failing_exporter_does_not_fail_the_query():
+    exporter = MagicMock()
+    exporter.export.side_effect = RuntimeError("collector down")
+    tracing.add_exporter(exporter)
+    with tracing.span("query"):
+        pass
+    exporter.export.assert_called_once()
+
+def test_pod_list_is_instrumented():
+    from src.k8s_client import _handle_get_pod_images
+    page = MagicMock()
+    page.items = []
+    page.metadata._continue = None
+    with patch("src.k8s_client.KubernetesClient") as mock_client:
+        mock_client.return_value.get_core_v1_api.return_value.list_namespaced_pod.return_value = page
+        with tracing.span("query") as root:
+            _handle_get_pod_images([EntityModel(type="namespace", value="prod")])
+    [list_span] = root.children
+    assert (list_span.name, list_span.attributes) == ("k8s.list", {"namespace": "prod", "page": 1})
+    assert list_span.counters == {"k8s.objects": 0}